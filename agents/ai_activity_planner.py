@@ -6,20 +6,16 @@ import random
 from models.schemas import Activity
 from models.activity_definitions import ActivityDefinitions
 from models.activity_definitions import ActivityDefinitions
+from agents.llm import get_llm
+from services.cache_manager import get_cache
+from utils.catalog_store import get_catalog_store
 
 class AIActivityPlanner:
-    def __init__(self):
-        self.llm = OllamaLLM(
-            model="qwen:0.5b",
-            temperature=0.3,  # Lower temperature for faster, more focused responses
-            num_ctx=256,      # Smaller context window
-            num_predict=128,  # Shorter predictions
-            repeat_penalty=1.1,
-            top_k=10,        # Limit token choices for faster sampling
-            top_p=0.8,       # Limit token choices for faster sampling
-            system="You are an expert travel activity planner. Generate engaging and realistic activities that match the destination's culture and the traveler's preferences."
-        )
+    def __init__(self, llm: Optional[OllamaLLM] = None):
+        # The process-wide activities LLM (model from Settings.ACTIVITY_LLM_MODEL) unless one is given
+        self.llm = llm or get_llm("activities")
         self.activity_definitions = ActivityDefinitions()
+        self.cache = get_cache("llm")
 
     async def generate_activities(
         self,
@@ -35,6 +31,11 @@ class AIActivityPlanner:
         Generate activities for the entire trip using AI.
         Returns a list of daily activities that match the mood and destination.
         """
+        destinations = get_catalog_store().destinations
+        # Planned for the canonical place name, so the cached activities (and their
+        # locations) are right for every spelling that shares the cache key
+        destination = destinations.canonical_name(destination)
+
         prompt = ChatPromptTemplate.from_messages([
             SystemMessagePromptTemplate.from_template(
                 """Generate a {days}-day schedule for a {mood} trip to {destination}.
@@ -79,7 +80,47 @@ class AIActivityPlanner:
             available_activities=", ".join(available_activities)
         )
 
-        response = await self.llm.ainvoke(messages[0].content)
+        # Identical concurrent requests share one LLM generation; successful ones are cached
+        cache_key = (
+            f"activities_{self.llm.model}_{destinations.canonical_key(destination)}_{mood}_"
+            f"{round(budget, 2)}_{days}_{activities_per_day}"
+        )
+
+        async def generate():
+            response = await self.llm.ainvoke(messages[0].content)
+            activities = self._parse_activities(response, destination, mood, budget_per_activity)
+            if activities is None:
+                return None
+            return [
+                {"day": day["day"], "activities": [activity.model_dump() for activity in day["activities"]]}
+                for day in activities
+            ]
+
+        daily_activities = await self.cache.get_or_fetch(cache_key, generate)
+        if not daily_activities:
+            return self._generate_fallback_activities(
+                destination=destination,
+                mood=mood,
+                budget_per_activity=budget_per_activity,
+                days=days,
+                activities_per_day=activities_per_day
+            )
+        return [
+            {"day": day["day"], "activities": [Activity(**activity) for activity in day["activities"]]}
+            for day in daily_activities
+        ]
+
+    def _parse_activities(
+        self,
+        response: str,
+        destination: str,
+        mood: str,
+        budget_per_activity: float
+    ) -> Optional[List[Dict[str, List[Activity]]]]:
+        """
+        Parse and validate the LLM response into daily activities.
+        Returns None if the response is unusable, so the caller falls back.
+        """
         try:
             # Clean and parse LLM response
             response_text = response.strip()
@@ -99,23 +140,11 @@ class AIActivityPlanner:
             try:
                 activities_data = json.loads(response_text)
             except json.JSONDecodeError as e:
-                return self._generate_fallback_activities(
-                    destination=destination,
-                    mood=mood,
-                    budget_per_activity=budget_per_activity,
-                    days=days,
-                    activities_per_day=activities_per_day
-                )
+                return None
             
             # Validate response structure
             if "daily_activities" not in activities_data:
-                return self._generate_fallback_activities(
-                    destination=destination,
-                    mood=mood,
-                    budget_per_activity=budget_per_activity,
-                    days=days,
-                    activities_per_day=activities_per_day
-                )
+                return None
             
             # Process and validate activities
             processed_activities = []
@@ -161,22 +190,29 @@ class AIActivityPlanner:
                 return processed_activities
                 
             except (KeyError, ValueError) as e:
-                return self._generate_fallback_activities(
-                    destination=destination,
-                    mood=mood,
-                    budget_per_activity=budget_per_activity,
-                    days=days,
-                    activities_per_day=activities_per_day
-                )
+                return None
                 
         except Exception as e:
-            return self._generate_fallback_activities(
-                destination=destination,
-                mood=mood,
-                budget_per_activity=budget_per_activity,
-                days=days,
-                activities_per_day=activities_per_day
-            )
+            return None
+
+    def fallback_activities(
+        self,
+        destination: str,
+        mood: str,
+        budget: float,
+        days: int,
+        activities_per_day: int = 3
+    ) -> List[Dict[str, List[Activity]]]:
+        """
+        Rule-based activities for the trip, without the LLM (e.g. when generation times out).
+        """
+        return self._generate_fallback_activities(
+            destination=destination,
+            mood=mood,
+            budget_per_activity=budget * 0.4 / (days * activities_per_day),
+            days=days,
+            activities_per_day=activities_per_day
+        )
 
     def _generate_fallback_activities(
         self,
@@ -51,8 +51,8 @@ class FlightAgent:
     
     async def search_flights_logic(self, origin: str, destination: str, depart_date: str, return_date: str = None, budget: float = None) -> str:
         from utils.mock_data_loader import MockDataLoader
-        mock_flights = MockDataLoader.get_mock_flights(origin, destination, budget=budget)
-        return self._format_flight_results(mock_flights)
+        mock_flights = MockDataLoader.get_mock_flights(origin, destination, budget=budget, return_flight=bool(return_date))
+        return self._format_flight_results(mock_flights["outbound"] + mock_flights["return"])
     
     def _format_flight_results(self, flights):
         if not flights:
@@ -1,6 +1,5 @@
 import json
 from typing import List
-from langchain_ollama import OllamaLLM
 from langchain_core.prompts import PromptTemplate, ChatPromptTemplate, SystemMessagePromptTemplate, HumanMessagePromptTemplate
 from langchain_core.tools import tool
 from langchain_core.output_parsers import PydanticOutputParser
@@ -9,22 +8,10 @@ from agents.flight_agent import FlightAgent
 from agents.hotel_agent import HotelAgent
 from agents.itinerary_agent import ItineraryAgent
 from models.schemas import ItineraryRequest, ItineraryResponse
+from utils.stages import Stage, run_stages, stage_timeout
 
 
-# Initialize LLMs with specific configurations
-orchestration_llm = OllamaLLM(
-    model="tinyllama",
-    temperature=0.7,
-    stop=["</s>", "Human:", "Assistant:"],
-    system="You are an English-speaking AI travel assistant. Always respond in English. Be concise and practical."
-)
-
-parsing_llm = OllamaLLM(
-    model="tinyllama",
-    temperature=0,
-    stop=["</s>", "Human:", "Assistant:"],
-    system="You are an English-speaking JSON formatting assistant. Always output valid JSON in English. Be precise and follow the schema exactly."
-)
+# LLMs are created once per process by agents.llm: get_llm("orchestration") and get_llm("parsing")
 
 # Initialize simplified agent logic classes
 flight_agent_logic = FlightAgent()
@@ -202,20 +189,38 @@ async def extract_structured_data(text: str, llm) -> dict:
 # --- Orchestration Logic ---
 async def run_itinerary_agent_flow(request: ItineraryRequest) -> ItineraryResponse:
     try:
-        # Step 1: Get flight and hotel data
+        # Steps 1-3: flights, hotels, activities and the daily schedule are independent,
+        # so the tools run concurrently. Flights and hotels are required; activities and
+        # the schedule fall back to empty results if their tool fails or times out.
         flight_query = f"origin:{request.origin},destination:{request.destination},depart_date:{request.travel_dates},return_date:None"
         hotel_query = f"destination:{request.destination},check_in:{request.travel_dates},check_out:{request.travel_dates}"
-
-        flights_result_str = await search_flights_tool.ainvoke(flight_query, budget=request.budget)
-        hotels_result_str = await search_hotels_tool.ainvoke(hotel_query, budget=request.budget)
-
-        # Step 2: Get activities data first
         activity_query = f"mood:{request.mood},location:{request.destination}"
-        activities_json_str = await search_activities_tool.ainvoke(activity_query)
-
-        # Step 3: Create daily schedule
         schedule_query = f"days:{request.duration_days},mood:{request.mood},budget:{request.budget}"
-        daily_schedule = await create_daily_schedule_tool.ainvoke(schedule_query)
+
+        results = await run_stages({
+            "flights": Stage(
+                run=lambda: search_flights_tool.ainvoke(flight_query, budget=request.budget),
+                timeout=stage_timeout("flights")
+            ),
+            "hotels": Stage(
+                run=lambda: search_hotels_tool.ainvoke(hotel_query, budget=request.budget),
+                timeout=stage_timeout("hotels")
+            ),
+            "activities": Stage(
+                run=lambda: search_activities_tool.ainvoke(activity_query),
+                timeout=stage_timeout("activities"),
+                fallback=lambda: "[]"
+            ),
+            "schedule": Stage(
+                run=lambda: create_daily_schedule_tool.ainvoke(schedule_query),
+                timeout=stage_timeout("schedule"),
+                fallback=lambda: "[]"
+            ),
+        })
+        flights_result_str = results["flights"]
+        hotels_result_str = results["hotels"]
+        activities_json_str = results["activities"]
+        daily_schedule = results["schedule"]
 
         # Step 4: Combine all data and create structured response directly
         try:
@@ -0,0 +1,137 @@
+"""
+Process-wide Ollama LLM clients and the activity planner built on them.
+
+Each LLM role (activity planning, orchestration, JSON parsing) gets one
+OllamaLLM per process, with its model name from Settings. All of them send
+requests through a single HTTP transport, so they share one connection pool
+to the Ollama server. The FastAPI lifespan creates them at startup and closes
+the transport at shutdown.
+"""
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+from langchain_ollama import OllamaLLM
+from ollama import AsyncClient
+
+from config.settings import get_settings
+
+# Generation options per role; the model names come from Settings
+LLM_PROFILES: Dict[str, Dict[str, Any]] = {
+    "activities": dict(
+        temperature=0.3,  # Lower temperature for faster, more focused responses
+        num_ctx=256,      # Smaller context window
+        num_predict=128,  # Shorter predictions
+        repeat_penalty=1.1,
+        top_k=10,        # Limit token choices for faster sampling
+        top_p=0.8,       # Limit token choices for faster sampling
+        system="You are an expert travel activity planner. Generate engaging and realistic activities that match the destination's culture and the traveler's preferences."
+    ),
+    "orchestration": dict(
+        temperature=0.7,
+        stop=["</s>", "Human:", "Assistant:"],
+        system="You are an English-speaking AI travel assistant. Always respond in English. Be concise and practical."
+    ),
+    "parsing": dict(
+        temperature=0,
+        stop=["</s>", "Human:", "Assistant:"],
+        system="You are an English-speaking JSON formatting assistant. Always output valid JSON in English. Be precise and follow the schema exactly."
+    ),
+}
+
+_llms: Dict[str, OllamaLLM] = {}
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+_activity_planner = None
+_llms_lock = threading.RLock()
+
+
+def model_names() -> Dict[str, str]:
+    """Configured model name per LLM role."""
+    settings = get_settings()
+    return {
+        "activities": settings.ACTIVITY_LLM_MODEL,
+        "orchestration": settings.ORCHESTRATION_LLM_MODEL,
+        "parsing": settings.PARSING_LLM_MODEL,
+    }
+
+
+def _shared_transport() -> httpx.AsyncHTTPTransport:
+    global _transport
+    with _llms_lock:
+        if _transport is None:
+            _transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(max_connections=get_settings().OLLAMA_MAX_CONNECTIONS)
+            )
+        return _transport
+
+
+def _async_client_kwargs() -> Dict[str, Any]:
+    return {"transport": _shared_transport(), "timeout": get_settings().OLLAMA_TIMEOUT}
+
+
+def get_llm(role: str) -> OllamaLLM:
+    """The process-wide LLM for a role in LLM_PROFILES."""
+    llm = _llms.get(role)
+    if llm is None:
+        with _llms_lock:
+            llm = _llms.get(role)
+            if llm is None:
+                llm = OllamaLLM(
+                    model=model_names()[role],
+                    base_url=get_settings().OLLAMA_BASE_URL,
+                    async_client_kwargs=_async_client_kwargs(),
+                    **LLM_PROFILES[role]
+                )
+                _llms[role] = llm
+    return llm
+
+
+def get_activity_planner():
+    """The process-wide AIActivityPlanner; it holds no per-request state."""
+    global _activity_planner
+    if _activity_planner is None:
+        from agents.ai_activity_planner import AIActivityPlanner
+        with _llms_lock:
+            if _activity_planner is None:
+                _activity_planner = AIActivityPlanner(llm=get_llm("activities"))
+    return _activity_planner
+
+
+def create_llms() -> Dict[str, OllamaLLM]:
+    """Create every role's LLM and the activity planner up front (application startup)."""
+    llms = {role: get_llm(role) for role in LLM_PROFILES}
+    get_activity_planner()
+    return llms
+
+
+async def close_llms() -> None:
+    """Drop the LLMs and close their shared connection pool (application shutdown)."""
+    global _transport, _activity_planner
+    with _llms_lock:
+        transport = _transport
+        _llms.clear()
+        _activity_planner = None
+        _transport = None
+    if transport is not None:
+        await transport.aclose()
+
+
+async def llm_health() -> Dict[str, Any]:
+    """
+    Whether the Ollama server is reachable and has each configured model pulled.
+    Status is "ready", "degraded" (some models missing) or "unavailable".
+    """
+    settings = get_settings()
+    # A client over the shared transport; not closed here, since that would close the transport
+    client = AsyncClient(host=settings.OLLAMA_BASE_URL, transport=_shared_transport(), timeout=settings.OLLAMA_HEALTH_TIMEOUT)
+    try:
+        available = {model.model for model in (await client.list()).models}
+    except Exception as e:
+        return {"status": "unavailable", "base_url": settings.OLLAMA_BASE_URL, "error": str(e) or type(e).__name__}
+
+    models = {}
+    for role, name in model_names().items():
+        # Ollama lists untagged models as "<name>:latest"
+        models[role] = {"model": name, "ready": name in available or f"{name}:latest" in available}
+    ready = all(model["ready"] for model in models.values())
+    return {"status": "ready" if ready else "degraded", "base_url": settings.OLLAMA_BASE_URL, "models": models}
@@ -0,0 +1,69 @@
+"""
+Compile mock_data/flights.json, hotels.json and airport_details_map.json
+into a single binary catalog that MockDataLoader memory-maps at startup.
+
+Usage:
+    python compile_catalog.py [--data-dir mock_data] [--output mock_data/catalog.bin]
+    python compile_catalog.py --flights mock_data/flights --hotels mock_data/hotels  # NDJSON shard directories
+"""
+import argparse
+import glob
+import json
+import os
+import time
+from typing import Any, Dict, Iterator
+
+from utils.catalog_format import write_catalog
+from utils.catalog_store import COMPILED_CATALOG_FILE, MOCK_DATA_DIR
+
+
+def iter_ndjson(path: str) -> Iterator[Dict[str, Any]]:
+    """Records from an NDJSON file or a directory of shards, read one line at a time."""
+    paths = sorted(glob.glob(os.path.join(path, '*.ndjson'))) if os.path.isdir(path) else [path]
+    for shard in paths:
+        with open(shard, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def load_json(path: str, key: str = None):
+    """
+    Load a JSON catalog file, or stream the NDJSON shards written by generate_*.py
+    --format ndjson (returned as an iterator, so the shards are never held in memory).
+    """
+    if os.path.isdir(path) or path.endswith('.ndjson'):
+        return iter_ndjson(path)
+    if not os.path.exists(path):
+        print(f"Skipping missing file: {path}")
+        return [] if key else {}
+    with open(path, 'r') as f:
+        data = json.load(f)
+    return data[key] if key else data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the JSON mock catalogs into a memory-mappable binary file.")
+    parser.add_argument("--data-dir", default=MOCK_DATA_DIR, help="Directory holding the JSON catalogs")
+    parser.add_argument("--flights", default=None, help="Flights JSON file or NDJSON shard directory (default: <data-dir>/flights.json)")
+    parser.add_argument("--hotels", default=None, help="Hotels JSON file or NDJSON shard directory (default: <data-dir>/hotels.json)")
+    parser.add_argument("--output", default=None, help=f"Output path (default: <data-dir>/{COMPILED_CATALOG_FILE})")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.data_dir, COMPILED_CATALOG_FILE)
+    start_time = time.time()
+    flights = load_json(args.flights or os.path.join(args.data_dir, 'flights.json'), 'flights')
+    hotels = load_json(args.hotels or os.path.join(args.data_dir, 'hotels.json'), 'hotels')
+    airports = load_json(os.path.join(args.data_dir, 'airport_details_map.json'))
+
+    # Write to a temporary file first so running workers never map a half-written catalog
+    tmp_output = f"{output}.tmp"
+    flight_count, hotel_count = write_catalog(tmp_output, flights, hotels, airports)
+    os.replace(tmp_output, output)
+
+    print(f"Compiled {flight_count} flights, {hotel_count} hotels and {len(airports)} airports "
+          f"into {output} ({os.path.getsize(output)} bytes) in {time.time() - start_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
+from functools import lru_cache
+from typing import Dict
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 import os
@@ -11,6 +14,83 @@ class Settings(BaseSettings):
     GEOAPIFY_API_KEY: str = os.getenv("GEOAPIFY_API_KEY")
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     FOURSQUARE_API_KEY: str = os.getenv("FOURSQUARE_API_KEY")
+
+    # Ollama server and the model used for each LLM role
+    OLLAMA_BASE_URL: str = "http://localhost:11434"
+    ACTIVITY_LLM_MODEL: str = "qwen:0.5b"
+    ORCHESTRATION_LLM_MODEL: str = "tinyllama"
+    PARSING_LLM_MODEL: str = "tinyllama"
+    OLLAMA_TIMEOUT: float = 60.0
+    OLLAMA_HEALTH_TIMEOUT: float = 2.0
+    OLLAMA_MAX_CONNECTIONS: int = 10  # Shared by every LLM client in the process
+
+    # Provider endpoints; point them at stub_server.py to replay recorded responses
+    SERPAPI_BASE_URL: str = "https://serpapi.com/search"
+    GEOAPIFY_BASE_URL: str = "https://api.geoapify.com/v2/places"
+    FOURSQUARE_BASE_URL: str = "https://api.foursquare.com/v3/places"
+    # When set, successful provider responses are saved here for stub_server.py
+    PROVIDER_RECORD_DIR: str = ""
     
     CACHE_TTL: int = 3600  # Default to 3600 seconds (1 hour) if not set
+    CACHE_MAX_ENTRIES: int = 10000  # Per cache namespace
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # Per cache namespace, approximate
+    # Per-namespace overrides as JSON, e.g. CACHE_NAMESPACE_TTL='{"flights": 900, "llm": 86400}'
+    CACHE_NAMESPACE_TTL: Dict[str, int] = {}
+    CACHE_NAMESPACE_MAX_ENTRIES: Dict[str, int] = {}
+    # Stale-while-revalidate: seconds past CACHE_TTL an entry is still served while it is refreshed
+    CACHE_STALE_TTL: int = 0
+    CACHE_NAMESPACE_STALE_TTL: Dict[str, int] = {}
+    CACHE_MAX_REFRESHES: int = 4  # Concurrent background refreshes per namespace
+    # Persistent tier behind the in-memory caches: "memory" (none), "sqlite" or "redis"
+    CACHE_BACKEND: str = "memory"
+    CACHE_SQLITE_PATH: str = "cache/provider_cache.sqlite3"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+
+    # Timeouts in seconds for provider HTTP calls
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 15.0
+    # Connection pool of each provider's shared HTTP client
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False  # Needs the 'h2' package
+    # Outbound rate limit in requests/second per provider (0 = unlimited), e.g. '{"serpapi": 5}'
+    HTTP_RATE_LIMIT: float = 0.0
+    HTTP_RATE_LIMITS: Dict[str, float] = {}
+    HTTP_RATE_BURST: int = 10
+    # Retries of failed provider calls, with jittered exponential backoff
+    HTTP_MAX_RETRIES: int = 2
+    HTTP_RETRY_BASE_DELAY: float = 0.5
+    HTTP_RETRY_MAX_DELAY: float = 10.0  # Retry-After longer than this is not waited for
+    # Hedged requests: a second attempt when the first is slower than the provider's p95 latency
+    HTTP_HEDGE_ENABLED: bool = False
+    HTTP_HEDGE_MIN_DELAY: float = 0.5
+
+    # Per-provider circuit breakers: open when at least BREAKER_FAILURE_RATE of the last
+    # BREAKER_WINDOW calls failed or took BREAKER_SLOW_CALL_SECONDS or more
+    BREAKER_WINDOW: int = 20
+    BREAKER_MIN_CALLS: int = 5
+    BREAKER_FAILURE_RATE: float = 0.5
+    BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    BREAKER_OPEN_SECONDS: float = 30.0  # Before trial calls are let through (half-open)
+    BREAKER_HALF_OPEN_PROBES: int = 1
+
+    # Seconds each itinerary pipeline stage (flights, hotels, activities, ...) may take
+    STAGE_TIMEOUT: float = 30.0
+    STAGE_TIMEOUTS: Dict[str, float] = {}  # Per-stage overrides, e.g. '{"activities": 60}'
+
+    # /generate-itineraries/batch
+    BATCH_MAX_REQUESTS: int = 500
+    BATCH_MAX_CONCURRENCY: int = 8  # Itineraries built at the same time per batch
+
+    # Opt-in cache of whole /generate-itinerary responses
+    ITINERARY_CACHE_ENABLED: bool = False
+    ITINERARY_CACHE_TTL: int = 900
+    ITINERARY_CACHE_BUDGET_BUCKET: float = 50.0  # Budgets are rounded down to a multiple of this
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Settings loaded once per process, for per-request code paths."""
+    return Settings()
 
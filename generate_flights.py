@@ -1,16 +1,28 @@
+"""
+Generate the mock flight catalog.
+
+    python generate_flights.py                      # 500 flights -> mock_data/flights.json
+    python generate_flights.py --count 10000000 --format ndjson --output mock_data/flights \
+        --workers 8 --shards 64 --seed 42 --zipf 1.1 --popular-routes 50 --popular-share 0.3
+
+Rows are generated in vectorized batches per shard; see utils/catalog_generation.py.
+"""
+import argparse
 import json
-import random
-import math
-from typing import Dict, Tuple
+import os
+from typing import Any, Dict, Iterator
+
+import numpy as np
+
+from utils.airport_matrix import AirportMatrix
+from utils.catalog_generation import add_generator_arguments, generate_sharded, resolve_seed, zipf_weights
+from utils.catalog_store import AIRPORT_MATRIX_FILE
+from utils.geo import haversine_km
 
 # File paths
 airport_details_map_path = 'mock_data/airport_details_map.json'
 flights_json_path = 'mock_data/flights.json'
 
-# Load airport details
-with open(airport_details_map_path, 'r') as f:
-    airport_details = json.load(f)
-
 # Major airline alliances and their member airlines
 airline_alliances = {
     "Star Alliance": [
@@ -33,26 +45,34 @@ airline_alliances = {
 }
 
 # Flatten airline list while preserving alliance grouping
-airlines = [(airline, alliance) for alliance, members in airline_alliances.items() 
+airlines = [(airline, alliance) for alliance, members in airline_alliances.items()
             for airline in members]
+alliance_names = list(airline_alliances)
+airline_alliance_ids = np.array([alliance_names.index(alliance) for _, alliance in airlines])
+
+# Base price calculations (USD per km) for short, medium and long haul
+base_rates = np.array([(0.15, 0.25), (0.12, 0.20), (0.10, 0.18)])
+
+# Alliance multipliers, in alliance_names order (independents are generally cheaper)
+alliance_multipliers = np.array([(1.1, 1.3), (1.1, 1.3), (1.0, 1.2), (0.8, 1.0)])
+
+# Direct flight premium, standard pricing, multiple stops discount
+stops_multipliers = np.array([(1.1, 1.3), (0.9, 1.1), (0.7, 0.9)])
+
+# Shortest flight duration generate_durations emits
+MIN_DURATION_MINUTES = 30
 
-def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+# Cumulative stop-count weights per route category: 70/25/5, 40/50/10, 20/60/20
+stops_cumulative_weights = np.cumsum([[0.7, 0.25, 0.05], [0.4, 0.5, 0.1], [0.2, 0.6, 0.2]], axis=1)
+
+
+def calculate_distance(lat1, lon1, lat2, lon2):
     """
     Calculate the great circle distance between two points on Earth.
-    Returns distance in kilometers.
+    Returns distance in kilometers; accepts scalars or NumPy arrays.
     """
-    R = 6371  # Earth's radius in kilometers
-
-    # Convert coordinates to radians
-    lat1, lon1, lat2, lon2 = map(math.radians, [lat1, lon1, lat2, lon2])
-    
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-    c = 2 * math.asin(math.sqrt(a))
-    
-    return R * c
+    return haversine_km(lat1, lon1, lat2, lon2)
+
 
 def get_route_category(distance: float) -> str:
     """
@@ -65,118 +85,124 @@ def get_route_category(distance: float) -> str:
     else:
         return "long_haul"
 
-def generate_price(distance: float, alliance: str, stops: int) -> float:
+
+def route_category_ids(distance: np.ndarray) -> np.ndarray:
+    """Vectorized get_route_category: 0 short haul, 1 medium haul, 2 long haul."""
+    return np.searchsorted([1500, 3500], distance, side='left')
+
+
+def generate_prices(rng: np.random.Generator, distance: np.ndarray, alliance: np.ndarray, stops: np.ndarray) -> np.ndarray:
     """
-    Generate realistic price based on distance, airline alliance, and number of stops.
+    Generate realistic prices based on distance, airline alliance, and number of stops.
     """
-    # Base price calculations (USD per km)
-    base_rates = {
-        "short_haul": (0.15, 0.25),    # $150-250 per 1000km
-        "medium_haul": (0.12, 0.20),   # $120-200 per 1000km
-        "long_haul": (0.10, 0.18),     # $100-180 per 1000km
-    }
-    
-    # Alliance multipliers
-    alliance_multipliers = {
-        "Star Alliance": (1.1, 1.3),
-        "Oneworld": (1.1, 1.3),
-        "SkyTeam": (1.0, 1.2),
-        "Independent": (0.8, 1.0)  # Generally cheaper
-    }
-    
-    # Stops discount/premium
-    stops_multipliers = {
-        0: (1.1, 1.3),    # Direct flight premium
-        1: (0.9, 1.1),    # Standard pricing
-        2: (0.7, 0.9)     # Multiple stops discount
-    }
-    
-    route_category = get_route_category(distance)
-    base_min, base_max = base_rates[route_category]
-    alliance_min, alliance_max = alliance_multipliers[alliance]
-    stops_min, stops_max = stops_multipliers[stops]
-    
-    # Calculate price range
-    min_price = distance * base_min * alliance_min * stops_min
-    max_price = distance * base_max * alliance_max * stops_max
-    
-    # Add some randomization within the range
-    price = random.uniform(min_price, max_price)
-    
-    # Round to nearest 0.01
-    return round(price, 2)
-
-def generate_duration(distance: float, stops: int) -> str:
+    category = route_category_ids(distance)
+    min_price = distance * base_rates[category, 0] * alliance_multipliers[alliance, 0] * stops_multipliers[stops, 0]
+    max_price = distance * base_rates[category, 1] * alliance_multipliers[alliance, 1] * stops_multipliers[stops, 1]
+    # Add some randomization within the range, rounded to nearest 0.01
+    return np.round(rng.uniform(min_price, max_price), 2)
+
+
+def generate_durations(rng: np.random.Generator, distance: np.ndarray, stops: np.ndarray) -> Iterator[str]:
     """
-    Generate realistic flight duration based on distance and stops.
+    Generate realistic flight durations based on distance and stops.
     """
     # Average commercial aircraft speed: ~850 km/h
     base_hours = distance / 850
-    
     # Add time for each stop (1-2 hours per stop)
-    stop_hours = sum(random.uniform(1, 2) for _ in range(stops))
-    
+    stop_hours = (rng.uniform(1, 2, size=(len(stops), 2)) * (np.arange(2) < stops[:, None])).sum(axis=1)
     # Add some variation for routes/winds/etc
-    variation = random.uniform(-0.5, 1)
-    
+    variation = rng.uniform(-0.5, 1, size=len(distance))
+
     total_hours = base_hours + stop_hours + variation
-    hours = int(total_hours)
-    minutes = int((total_hours - hours) * 60)
-    
-    # Round minutes to nearest 5
-    minutes = round(minutes / 5) * 5
-    
-    return f"{hours}h {minutes:02d}m"
-
-# Generate 500 flights
-generated_flights = []
-for _ in range(500):
-    # Select random origin and destination airports
-    origin_code = random.choice(list(airport_details.keys()))
-    destination_code = random.choice(list(airport_details.keys()))
-    
-    while destination_code == origin_code:  # Ensure different airports
-        destination_code = random.choice(list(airport_details.keys()))
-    
-    # Get airport details
-    origin_details = airport_details[origin_code]
-    dest_details = airport_details[destination_code]
-    
-    # Calculate distance
-    distance = calculate_distance(
-        float(origin_details['latitude']),
-        float(origin_details['longitude']),
-        float(dest_details['latitude']),
-        float(dest_details['longitude'])
-    )
-    
+    # Round to the nearest 5 minutes; the variation can push short hops below zero
+    total_minutes = np.round(total_hours * 60 / 5).astype(int) * 5
+    hours, minutes = np.divmod(np.maximum(total_minutes, MIN_DURATION_MINUTES), 60)
+    return (f"{h}h {m:02d}m" for h, m in zip(hours.tolist(), minutes.tolist()))
+
+
+def generate_flight_rows(rng: np.random.Generator, n: int, options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Generate `n` flights in one vectorized batch."""
+    codes = options["codes"]
+    distances = options["distances"]
+    weights = options["weights"]
+
+    # Select origin and destination airports (destinations follow the popularity weights)
+    origin = rng.integers(len(codes), size=n)
+    destination = rng.choice(len(codes), size=n, p=weights)
+    clash = origin == destination
+    while clash.any():  # Ensure different airports
+        destination[clash] = rng.choice(len(codes), size=int(clash.sum()), p=weights)
+        clash = origin == destination
+
+    # Send a share of the traffic over a fixed set of popular routes
+    popular = options["popular_routes"]
+    if len(popular):
+        on_popular = rng.random(n) < options["popular_share"]
+        picks = popular[rng.integers(len(popular), size=int(on_popular.sum()))]
+        origin[on_popular], destination[on_popular] = picks[:, 0], picks[:, 1]
+
+    # Route distances come straight from the precomputed all-pairs matrix
+    distance = distances[origin, destination]
+
     # Determine number of stops based on distance
-    if distance <= 1500:  # Short haul
-        stops_weights = [0.7, 0.25, 0.05]  # 70% direct, 25% 1 stop, 5% 2 stops
-    elif distance <= 3500:  # Medium haul
-        stops_weights = [0.4, 0.5, 0.1]   # 40% direct, 50% 1 stop, 10% 2 stops
-    else:  # Long haul
-        stops_weights = [0.2, 0.6, 0.2]   # 20% direct, 60% 1 stop, 20% 2 stops
-    
-    num_stops = random.choices([0, 1, 2], weights=stops_weights, k=1)[0]
-    
+    stops = (rng.random(n)[:, None] > stops_cumulative_weights[route_category_ids(distance)]).sum(axis=1)
+    stops = np.minimum(stops, 2)
+
     # Select airline and get its alliance
-    airline, alliance = random.choice(airlines)
-    
-    # Generate flight details
-    flight = {
-        "airline": airline,
-        "price": generate_price(distance, alliance, num_stops),
-        "duration": generate_duration(distance, num_stops),
-        "stops": num_stops,
-        "departure": origin_code,
-        "arrival": destination_code,
-        "departure_fullname": origin_details['name'],
-        "arrival_fullname": dest_details['name'],
-        "distance_km": round(distance, 2)
+    airline = rng.integers(len(airlines), size=n)
+    prices = generate_prices(rng, distance, airline_alliance_ids[airline], stops)
+    durations = generate_durations(rng, distance, stops)
+
+    names = options["names"]
+    for i, duration in zip(range(n), durations):
+        o, d = int(origin[i]), int(destination[i])
+        yield {
+            "airline": airlines[int(airline[i])][0],
+            "price": float(prices[i]),
+            "duration": duration,
+            "stops": int(stops[i]),
+            "departure": codes[o],
+            "arrival": codes[d],
+            "departure_fullname": names[o],
+            "arrival_fullname": names[d],
+            "distance_km": round(float(distance[i]), 2)
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the mock flight catalog.")
+    add_generator_arguments(parser, default_output=flights_json_path)
+    parser.add_argument("--airports", default=airport_details_map_path, help="Airport details map to draw routes from")
+    parser.add_argument("--popular-routes", type=int, default=0, help="Number of popular routes that get extra traffic")
+    parser.add_argument("--popular-share", type=float, default=0.3, help="Share of flights on the popular routes")
+    args = parser.parse_args()
+
+    # Load airport details
+    with open(args.airports, 'r') as f:
+        airport_details = json.load(f)
+    codes = list(airport_details)
+    matrix_cache = os.path.join(os.path.dirname(args.airports), AIRPORT_MATRIX_FILE)
+    matrix = AirportMatrix.load_or_build(airport_details, matrix_cache)
+
+    # Popularity weights and popular routes are drawn once from the seed so every shard agrees on them
+    rng = np.random.default_rng(resolve_seed(args))
+    weights = zipf_weights(len(codes), args.zipf, rng)
+    popular_routes = np.empty((0, 2), dtype=np.int64)
+    if args.popular_routes:
+        origins = rng.choice(len(codes), size=args.popular_routes, p=weights)
+        offsets = rng.integers(1, len(codes), size=args.popular_routes)
+        popular_routes = np.stack([origins, (origins + offsets) % len(codes)], axis=1)
+
+    options = {
+        "codes": codes,
+        "names": [airport_details[code]['name'] for code in codes],
+        "distances": matrix.distances,
+        "weights": weights,
+        "popular_routes": popular_routes,
+        "popular_share": args.popular_share,
     }
-    generated_flights.append(flight)
+    generate_sharded(generate_flight_rows, args, "flights", options)
+
 
-# Write to flights.json
-with open(flights_json_path, 'w') as f:
-    json.dump({"flights": generated_flights}, f, indent=2)
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,46 @@
+"""
+Generate the mock hotel catalog.
+
+    python generate_hotels.py                       # 500 hotels -> mock_data/hotels.json
+    python generate_hotels.py --count 10000000 --format ndjson --output mock_data/hotels \
+        --workers 8 --shards 64 --seed 42 --zipf 1.1
+
+Rows are generated in vectorized batches per shard; see utils/catalog_generation.py.
+"""
+import argparse
 import json
-import random
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from utils.catalog_generation import add_generator_arguments, generate_sharded, resolve_seed, zipf_weights
 
 airport_details_map_path = 'mock_data/airport_details_map.json'
 hotels_json_path = 'mock_data/hotels.json'
 
-with open(airport_details_map_path, 'r') as f:
-    airport_details = json.load(f)
-
-# Extract unique countries and some major cities from airport details
-cities_and_countries = set()
-for code, details in airport_details.items():
-    cities_and_countries.add(details['country'])
-    if "International Airport" in details['name']:
-        city = details['name'].split(" International Airport")[0]
-        if "Airport" in city:
-            city = city.split(" Airport")[0]
-        cities_and_countries.add(city.strip())
-
-# Add popular cities
-cities_and_countries.update([
+# Popular cities, added to the cities and countries taken from the airport details
+popular_cities = [
     "Paris", "London", "Rome", "New York City", "Tokyo", "Dubai", "Sydney",
     "Rio de Janeiro", "Barcelona", "Amsterdam", "Singapore", "Hong Kong",
     "Bangkok", "Istanbul", "Venice", "Madrid", "Berlin", "Vienna"
-])
+]
+
+
+def load_destinations(path: str) -> List[str]:
+    """Unique countries and major cities from the airport details, plus the popular cities (sorted, so seeds reproduce)."""
+    with open(path, 'r') as f:
+        airport_details = json.load(f)
+
+    cities_and_countries = set(popular_cities)
+    for code, details in airport_details.items():
+        cities_and_countries.add(details['country'])
+        if "International Airport" in details['name']:
+            city = details['name'].split(" International Airport")[0]
+            if "Airport" in city:
+                city = city.split(" Airport")[0]
+            cities_and_countries.add(city.strip())
+    return sorted(cities_and_countries)
 
-destinations = list(cities_and_countries)
 
 # Define hotel categories with their chains and price/rating ranges
 hotel_categories = {
@@ -93,47 +109,68 @@ amenities_by_category = {
     ]
 }
 
-def generate_price_per_night(category):
-    min_price, max_price = hotel_categories[category]["price_range"]
-    # Add location-based price variation (±20%)
-    variation = random.uniform(0.8, 1.2)
-    price = random.uniform(min_price, max_price) * variation
-    return round(price, 2)
-
-def generate_rating(category):
-    min_rating, max_rating = hotel_categories[category]["rating_range"]
-    return round(random.uniform(min_rating, max_rating), 1)
-
-def select_amenities(category):
-    available_amenities = amenities_by_category[category]
-    min_amenities = hotel_categories[category]["min_amenities"]
-    max_amenities = len(available_amenities)
-    num_amenities = random.randint(min_amenities, max(min_amenities + 3, max_amenities - 2))
-    return random.sample(available_amenities, num_amenities)
-
-# Generate 500 hotels
-generated_hotels = []
-for _ in range(500):
-    # Select category with weighted distribution
-    category = random.choices(
-        ["luxury", "upscale", "midscale", "economy"],
-        weights=[0.1, 0.2, 0.4, 0.3],  # 10% luxury, 20% upscale, 40% midscale, 30% economy
-        k=1
-    )[0]
-    
-    location = random.choice(destinations)
-    chain = random.choice(hotel_categories[category]["chains"])
-    
-    hotel = {
-        "name": f"{chain} {location}",
-        "price_per_night": generate_price_per_night(category),
-        "rating": generate_rating(category),
-        "location": location,
-        "amenities": select_amenities(category),
-        "category": category  # Include category in the data for reference
+category_names = list(hotel_categories)
+# 10% luxury, 20% upscale, 40% midscale, 30% economy
+category_weights = [0.1, 0.2, 0.4, 0.3]
+
+
+def generate_hotel_rows(rng: np.random.Generator, n: int, options: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Generate `n` hotels in one vectorized batch."""
+    destinations = options["destinations"]
+
+    # Select category with weighted distribution, and a location following the popularity weights
+    category = rng.choice(len(category_names), size=n, p=category_weights)
+    location = rng.choice(len(destinations), size=n, p=options["weights"])
+    chain_pick = rng.random(n)
+
+    # Price within the category range, with location-based variation (±20%)
+    price_range = np.array([hotel_categories[c]["price_range"] for c in category_names], dtype=np.float64)[category]
+    prices = np.round(rng.uniform(price_range[:, 0], price_range[:, 1]) * rng.uniform(0.8, 1.2, size=n), 2)
+
+    rating_range = np.array([hotel_categories[c]["rating_range"] for c in category_names])[category]
+    ratings = np.round(rng.uniform(rating_range[:, 0], rating_range[:, 1]), 1)
+
+    # Amenities: a random-length prefix of a per-row shuffle of the category's amenities
+    available_counts = np.array([len(amenities_by_category[c]) for c in category_names])[category]
+    shuffle_keys = rng.random((n, available_counts.max(initial=0)))
+    shuffle_keys[np.arange(shuffle_keys.shape[1]) >= available_counts[:, None]] = np.inf
+    amenity_order = np.argsort(shuffle_keys, axis=1).tolist()
+    amenity_pick = rng.random(n)
+
+    for i in range(n):
+        name = category_names[int(category[i])]
+        chains = hotel_categories[name]["chains"]
+        available_amenities = amenities_by_category[name]
+        min_amenities = hotel_categories[name]["min_amenities"]
+        max_amenities = max(min_amenities + 3, len(available_amenities) - 2)
+        num_amenities = min_amenities + int(amenity_pick[i] * (max_amenities - min_amenities + 1))
+        order = amenity_order[i][:num_amenities]
+        city = destinations[int(location[i])]
+        yield {
+            "name": f"{chains[int(chain_pick[i] * len(chains))]} {city}",
+            "price_per_night": float(prices[i]),
+            "rating": float(ratings[i]),
+            "location": city,
+            "amenities": [available_amenities[j] for j in order],
+            "category": name  # Include category in the data for reference
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the mock hotel catalog.")
+    add_generator_arguments(parser, default_output=hotels_json_path)
+    parser.add_argument("--airports", default=airport_details_map_path, help="Airport details map to take cities and countries from")
+    args = parser.parse_args()
+
+    destinations = load_destinations(args.airports)
+    # Popularity weights are drawn once from the seed so every shard agrees on them
+    rng = np.random.default_rng(resolve_seed(args))
+    options = {
+        "destinations": destinations,
+        "weights": zipf_weights(len(destinations), args.zipf, rng),
     }
-    generated_hotels.append(hotel)
+    generate_sharded(generate_hotel_rows, args, "hotels", options)
+
 
-# Write to hotels.json
-with open(hotels_json_path, 'w') as f:
-    json.dump({"hotels": generated_hotels}, f, indent=2)
+if __name__ == "__main__":
+    main()
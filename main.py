@@ -1,13 +1,38 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from agents.llm import close_llms, create_llms
 from routes import itinerary_routes
 from routes import foursquare_routes
+from routes import health_routes
+from services.cache_manager import CACHE_NAMESPACES, close_caches, get_cache
+from services.http_client import close_http_clients, create_http_clients
+from utils.catalog_store import load_catalog_store
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the flight/hotel/airport catalogs once, before serving any request
+    app.state.catalog = load_catalog_store()
+    # Create the shared provider caches up front; every client instance uses these
+    app.state.caches = {namespace: get_cache(namespace) for namespace in CACHE_NAMESPACES}
+    # One pooled HTTP client per provider, so connections are reused across requests
+    app.state.http_clients = create_http_clients()
+    # LLM clients and the activity planner, sharing one connection pool to Ollama
+    app.state.llms = create_llms()
+    yield
+    await close_llms()
+    await close_http_clients()
+    close_caches()
+
 
 app = FastAPI(
     title="Itinerary Planner API",
     description="API for generating travel itineraries, including flights, hotels, and activities.",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -18,4 +43,5 @@ app.add_middleware(
 )
 
 app.include_router(itinerary_routes.router)
-app.include_router(foursquare_routes.router)
\ No newline at end of file
+app.include_router(foursquare_routes.router)
+app.include_router(health_routes.router)
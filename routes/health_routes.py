@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+from agents.llm import llm_health
+from services.cache_manager import cache_stats
+from services.circuit_breaker import breaker_stats
+from services.http_client import pool_stats
+
+router = APIRouter()
+
+@router.get("/health", response_model=Dict[str, Any])
+async def health():
+    """
+    Liveness check with the provider caches', HTTP connection pools' and circuit breakers' state,
+    and whether the Ollama models are ready.
+    """
+    return {
+        "status": "ok",
+        "caches": cache_stats(),
+        "http_pools": pool_stats(),
+        "breakers": breaker_stats(),
+        "llm": await llm_health(),
+    }
@@ -1,5 +1,15 @@
-from fastapi import APIRouter, HTTPException
-from models.schemas import ItineraryRequest, ItineraryResponse, Activity, DayPlan, FlightOptions
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Awaitable, Callable, Dict, List
+from config.settings import get_settings
+from models.schemas import ItineraryRequest, ItineraryResponse, Activity, DayPlan, FlightOption, FlightOptions
+from services.cache_manager import get_cache
+from utils.catalog_store import get_catalog_store
+from utils.destinations import normalize_text
+from utils.flight_table import flight_columns, select_best
+from utils.json_response import ModelJSONResponse
+from utils.stages import Stage, run_stages, stage_timeout
+import asyncio
 import json
 
 # New imports for LLM parsing
@@ -142,40 +152,222 @@ router = APIRouter()
 #     serpapi = SerpApiClient()
 #     hotels = await serpapi.search_hotels(destination, check_in, check_out, budget)
 #     return {"hotels": hotels}
+
+def _best_leg_price(flights: List[FlightOption], preferred_max: float, fallback_max: float) -> float:
+    """
+    Price of the flight to budget for one leg: best stop-penalised price within
+    `preferred_max`, else the cheapest within `fallback_max`, else 0.
+    """
+    prices, stops = flight_columns(flights)
+    best = select_best(prices, stops, preferred_max)
+    if best < 0:
+        best = select_best(prices, stops, fallback_max, stop_penalty=0.0)
+    return float(prices[best]) if best >= 0 else 0
+
+def _canonical_itinerary_request(request: ItineraryRequest, budget_bucket: float):
+    """
+    Cache key and canonical request for the response cache: destinations normalized,
+    budget rounded down to its bucket, and only the fields that shape the itinerary.
+    Every request sharing a key has the same canonical request, so a cached body
+    never carries another caller's spelling of a place or mood.
+    """
+    destinations = get_catalog_store().destinations
+    budget = request.budget
+    if budget_bucket and budget >= budget_bucket:
+        budget = (budget // budget_bucket) * budget_bucket
+    mood = normalize_text(request.mood)
+    return_flight = bool(request.return_flight)
+    cache_key = (
+        f"itinerary_{destinations.canonical_key(request.origin)}_{destinations.canonical_key(request.destination)}_"
+        f"{budget:g}_{mood}_{request.duration_days}_{return_flight}"
+    )
+    canonical_request = ItineraryRequest(
+        origin=destinations.canonical_name(request.origin),
+        destination=destinations.canonical_name(request.destination),
+        duration_days=request.duration_days,
+        budget=budget,
+        mood=mood,
+        return_flight=return_flight
+    )
+    return cache_key, canonical_request
+
 @router.post("/generate-itinerary", response_model=ItineraryResponse)
-async def generate_itinerary(request: ItineraryRequest):
+async def generate_itinerary(request: ItineraryRequest, http_request: Request):
+    settings = get_settings()
+    if not settings.ITINERARY_CACHE_ENABLED:
+        # Validated once when built; returned as-is instead of re-validated against response_model
+        return ModelJSONResponse(await _build_itinerary(request))
+
+    # Cache-Control: no-cache recomputes (and refreshes the entry), no-store bypasses the cache entirely
+    cache_control = http_request.headers.get("cache-control", "").lower()
+    no_store = "no-store" in cache_control
+    no_cache = no_store or "no-cache" in cache_control
+
+    cache = get_cache("itineraries")
+    cache_key, canonical_request = _canonical_itinerary_request(request, settings.ITINERARY_CACHE_BUDGET_BUCKET)
+
+    if no_cache:
+        # Built from the caller's own request, exact budget and spelling included
+        body = await _render_itinerary(request)
+        if not no_store:
+            if request == canonical_request:
+                await cache.aset(cache_key, body, ttl=settings.ITINERARY_CACHE_TTL)
+            else:
+                # This body is not what a hit would return; drop the old entry so the next miss rebuilds it
+                await cache.adelete(cache_key)
+        status = "BYPASS"
+    else:
+        body = await cache.aget(cache_key)
+        status = "HIT"
+        if body is None:
+            status = "MISS"
+            body = await cache.get_or_fetch(cache_key, lambda: _render_itinerary(canonical_request), ttl=settings.ITINERARY_CACHE_TTL)
+    return Response(content=body, media_type="application/json", headers={"X-Cache": status})
+
+@router.post("/generate-itineraries/batch")
+async def generate_itineraries_batch(requests: List[ItineraryRequest]):
+    """
+    Generates many itineraries in one call and streams them back as NDJSON, one
+    line per request as soon as it is ready: {"index": i, "status": 200, "itinerary": {...}}
+    or {"index": i, "status": 500, "error": "..."}. Lines arrive in completion order.
+    """
+    settings = get_settings()
+    if len(requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=413, detail=f"Batch too large: at most {settings.BATCH_MAX_REQUESTS} requests")
+
+    # Identical requests are generated once and answered on every index they appear at
+    indices: Dict[str, List[int]] = {}
+    unique: Dict[str, ItineraryRequest] = {}
+    for index, request in enumerate(requests):
+        key = request.model_dump_json()
+        indices.setdefault(key, []).append(index)
+        unique.setdefault(key, request)
+
+    # Flight and hotel lookups are shared across the batch, and at most
+    # BATCH_MAX_CONCURRENCY itineraries are built at a time
+    lookups = _SharedLookups()
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+
+    async def generate(key: str, request: ItineraryRequest):
+        async with semaphore:
+            try:
+                if not settings.ITINERARY_CACHE_ENABLED:
+                    return key, 200, await _render_itinerary(request, lookups)
+                cache_key, canonical_request = _canonical_itinerary_request(request, settings.ITINERARY_CACHE_BUDGET_BUCKET)
+                body = await get_cache("itineraries").get_or_fetch(
+                    cache_key, lambda: _render_itinerary(canonical_request, lookups), ttl=settings.ITINERARY_CACHE_TTL
+                )
+                return key, 200, body
+            except HTTPException as e:
+                return key, e.status_code, json.dumps(e.detail)
+            except Exception as e:
+                return key, 500, json.dumps(f"Error generating itinerary: {str(e)}")
+
+    async def stream():
+        tasks = [asyncio.create_task(generate(key, request)) for key, request in unique.items()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                key, status, body = await next_done
+                field = "itinerary" if status == 200 else "error"
+                for index in indices[key]:
+                    # The itinerary is already JSON; embed it rather than decoding and re-encoding it
+                    yield f'{{"index":{index},"status":{status},"{field}":{body}}}\n'
+        finally:
+            # The client went away or the stream ended: stop anything still running
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+class _SharedLookups:
+    """
+    Catalog lookups (flights for a route, hotels for a destination) keyed by their
+    canonical query, so itineraries built together run each distinct lookup once.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[tuple, asyncio.Future] = {}
+
+    def run(self, key: tuple, lookup: Callable, **kwargs) -> Awaitable:
+        task = self._tasks.get(key)
+        if task is None:
+            # Synchronous catalog work runs in a worker thread
+            task = asyncio.ensure_future(asyncio.to_thread(lookup, **kwargs))
+            self._tasks[key] = task
+        # Shielded: one itinerary timing out must not cancel a lookup others are waiting on
+        return asyncio.shield(task)
+
+def _place_key(text: str) -> str:
+    """Canonical destination id for lookup keys; unknown places keep their text, which the lookups echo back."""
+    destination = get_catalog_store().destinations.normalize(text) if text else None
+    return destination.id if destination else text
+
+async def _render_itinerary(request: ItineraryRequest, lookups: _SharedLookups = None) -> str:
+    # Serialized once; cached responses are returned as-is, skipping validation and encoding
+    itinerary = await _build_itinerary(request, lookups)
+    return itinerary.model_dump_json(by_alias=True)
+
+async def _build_itinerary(request: ItineraryRequest, lookups: _SharedLookups = None) -> ItineraryResponse:
     from utils.mock_data_loader import MockDataLoader
     from agents.itinerary_agent import ItineraryAgent
     import time
     try:
         start_time = time.time()
-        # 1. Get flights (both outbound and return)
-        flights_data = MockDataLoader.get_mock_flights(
-            origin=request.origin,
-            destination=request.destination,
-            budget=request.budget,
-            return_flight=request.return_flight
-        )
-        
-        # 2. Get hotels
-        hotels = MockDataLoader.get_mock_hotels(
-            destination=request.destination,
-            budget=request.budget,
-            mood=request.mood
-        )
+        from agents.llm import get_activity_planner
+        activity_planner = get_activity_planner()
 
-        # 3. Generate AI-powered activities
-        from agents.ai_activity_planner import AIActivityPlanner
-        activity_planner = AIActivityPlanner()
-        
-        # Generate activities using AI
-        activities_data = await activity_planner.generate_activities(
-            destination=request.destination,
-            mood=request.mood,
-            budget=request.budget,
-            days=request.duration_days,
-            activities_per_day=3
-        )
+        # 1-3. Flights (both outbound and return), hotels and AI-powered activities are
+        # independent until budget allocation, so they run concurrently. The catalog
+        # lookups are synchronous and run in worker threads; activities fall back to
+        # rule-based ones if the LLM is too slow, while a flight or hotel failure
+        # cancels the other stages.
+        lookups = lookups or _SharedLookups()
+        flights_key = ("flights", _place_key(request.origin), _place_key(request.destination), request.budget, bool(request.return_flight))
+        mood = normalize_text(request.mood)
+        hotels_key = ("hotels", _place_key(request.destination), request.budget, mood)
+        results = await run_stages({
+            "flights": Stage(
+                run=lambda: lookups.run(
+                    flights_key,
+                    MockDataLoader.get_mock_flights,
+                    origin=request.origin,
+                    destination=request.destination,
+                    budget=request.budget,
+                    return_flight=request.return_flight
+                ),
+                timeout=stage_timeout("flights")
+            ),
+            "hotels": Stage(
+                run=lambda: lookups.run(
+                    hotels_key,
+                    MockDataLoader.get_mock_hotels,
+                    destination=request.destination,
+                    budget=request.budget,
+                    mood=mood
+                ),
+                timeout=stage_timeout("hotels")
+            ),
+            "activities": Stage(
+                run=lambda: activity_planner.generate_activities(
+                    destination=request.destination,
+                    mood=request.mood,
+                    budget=request.budget,
+                    days=request.duration_days,
+                    activities_per_day=3
+                ),
+                timeout=stage_timeout("activities"),
+                fallback=lambda: activity_planner.fallback_activities(
+                    destination=request.destination,
+                    mood=request.mood,
+                    budget=request.budget,
+                    days=request.duration_days,
+                    activities_per_day=3
+                )
+            ),
+        })
+        flights_data = results["flights"]
+        hotels = results["hotels"]
+        activities_data = results["activities"]
 
         # Transform AI-generated activities into daily plan
         daily_plan = []
@@ -203,35 +395,16 @@ async def generate_itinerary(request: ItineraryRequest):
         max_flight_budget = request.budget * (0.5 if request.return_flight else 0.4)
         
         # Handle outbound flight (15-25% of budget)
+        # Prioritize flights with fewer stops when prices are similar (10% penalty per stop);
+        # if no flights within budget, take the cheapest up to 30% of total budget
         outbound_max = max_flight_budget * 0.5 if request.return_flight else max_flight_budget
-        outbound_options = [(f.price, f.stops) for f in flights_data["outbound"] if f.price <= outbound_max]
-        if outbound_options:
-            # Prioritize flights with fewer stops when prices are similar
-            best_outbound = min(outbound_options, key=lambda x: (x[0] * (1 + 0.1 * x[1])))  # 10% penalty per stop
-            outbound_cost = best_outbound[0]
-        else:
-            # If no flights within budget, try up to 30% of total budget
-            outbound_options = [(f.price, f.stops) for f in flights_data["outbound"] if f.price <= request.budget * 0.3]
-            if outbound_options:
-                best_outbound = min(outbound_options, key=lambda x: x[0])
-                outbound_cost = best_outbound[0]
-            else:
-                outbound_cost = 0
+        outbound_cost = _best_leg_price(flights_data["outbound"], outbound_max, request.budget * 0.3)
 
         # Handle return flight if requested (15-25% of budget)
         return_cost = 0
         if request.return_flight and flights_data["return"]:
             return_max = max_flight_budget * 0.5
-            return_options = [(f.price, f.stops) for f in flights_data["return"] if f.price <= return_max]
-            if return_options:
-                best_return = min(return_options, key=lambda x: (x[0] * (1 + 0.1 * x[1])))
-                return_cost = best_return[0]
-            else:
-                # Try up to 30% of total budget
-                return_options = [(f.price, f.stops) for f in flights_data["return"] if f.price <= request.budget * 0.3]
-                if return_options:
-                    best_return = min(return_options, key=lambda x: x[0])
-                    return_cost = best_return[0]
+            return_cost = _best_leg_price(flights_data["return"], return_max, request.budget * 0.3)
 
         flight_cost = outbound_cost + return_cost
         
@@ -308,10 +481,8 @@ async def generate_itinerary(request: ItineraryRequest):
 async def search_flights(origin: str = None, destination: str = None, depart_date: str = None, return_date: str = None, budget: float = None):
     from utils.mock_data_loader import MockDataLoader
     try:
-        flights = MockDataLoader.get_mock_flights(origin, destination, budget=budget)
-        # Convert to dict for response
-        flight_dicts = [flight.model_dump() for flight in flights]
-        return {"flights": flight_dicts}
+        flights = MockDataLoader.get_mock_flights(origin, destination, budget=budget, return_flight=bool(return_date))
+        return ModelJSONResponse({"flights": FlightOptions(outbound=flights["outbound"], return_=flights["return"])})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching flights: {str(e)}")
 
@@ -320,8 +491,6 @@ async def search_hotels(destination: str, check_in: str, check_out: str, budget:
     from utils.mock_data_loader import MockDataLoader
     try:
         hotels = MockDataLoader.get_mock_hotels(destination, budget)
-        # Convert to dict for response
-        hotel_dicts = [hotel.model_dump() for hotel in hotels]
-        return {"hotels": hotel_dicts}
+        return ModelJSONResponse({"hotels": hotels})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching hotels: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Persistent tiers behind the in-process CacheManager.
+
+Backends store opaque bytes with an absolute expiry time, so every tier
+shares the same keys and TTL semantics. `encode_entry`/`decode_entry` turn
+cached values into a compact binary record: an 8-byte expiry timestamp, a
+1-byte format flag and a JSON body that is zlib-compressed when large.
+"""
+import json
+import os
+import socket
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Optional, Tuple
+from urllib.parse import urlparse
+
+_HEADER = struct.Struct("!dB")
+_RAW, _COMPRESSED = 0, 1
+# Bodies above this size are compressed
+COMPRESS_MIN_BYTES = 1024
+
+
+def encode_entry(value: Any, expires_at: float) -> bytes:
+    body = json.dumps(value, default=str, separators=(",", ":")).encode("utf-8")
+    if len(body) >= COMPRESS_MIN_BYTES:
+        return _HEADER.pack(expires_at, _COMPRESSED) + zlib.compress(body, 6)
+    return _HEADER.pack(expires_at, _RAW) + body
+
+
+def decode_entry(data: bytes) -> Tuple[Any, float]:
+    """(value, expires_at) from an encode_entry record."""
+    expires_at, flag = _HEADER.unpack_from(data)
+    body = data[_HEADER.size:]
+    if flag == _COMPRESSED:
+        body = zlib.decompress(body)
+    return json.loads(body), expires_at
+
+
+class CacheBackend:
+    """Byte store keyed by string with an absolute expiry time per entry."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, data: bytes, expires_at: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def sweep(self) -> int:
+        """Drop expired entries, if the store does not expire them itself."""
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteBackend(CacheBackend):
+    """Entries in a local SQLite file, shared by every worker process on the host."""
+
+    def __init__(self, path: str, table: str = "cache"):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_expires_at ON {table} (expires_at)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value FROM {self.table} WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def set(self, key: str, data: bytes, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, sqlite3.Binary(data), expires_at)
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RedisBackend(CacheBackend):
+    """
+    Entries in a Redis server, or anything speaking the Redis protocol (RESP).
+    Only GET, SET ... PX and DEL are used, so a small local stand-in can replace
+    the server in tests. Expiry is delegated to the server via PX.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", timeout: float = 2.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.password = parsed.password
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._reader = self._sock.makefile("rb")
+        if self.password:
+            self._call(b"AUTH", self.password.encode("utf-8"))
+        if self.db:
+            self._call(b"SELECT", str(self.db).encode("ascii"))
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+                self._reader = None
+
+    def _call(self, *args: bytes):
+        payload = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            payload.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self._sock.sendall(b"".join(payload))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, rest = line[:1], line[1:-2]
+        if kind in (b"+", b":"):
+            return rest
+        if kind == b"-":
+            raise RuntimeError(rest.decode("utf-8", "replace"))
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(rest)
+            return None if count < 0 else [self._read_reply() for _ in range(count)]
+        raise ConnectionError(f"Unexpected reply: {line!r}")
+
+    def execute(self, *args: bytes):
+        """Run one command, reconnecting once if the connection was dropped."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._call(*args)
+                except (OSError, ConnectionError):
+                    self._disconnect()
+                    if attempt:
+                        raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.execute(b"GET", key.encode("utf-8"))
+
+    def set(self, key: str, data: bytes, expires_at: float) -> None:
+        ttl_ms = int((expires_at - time.time()) * 1000)
+        if ttl_ms <= 0:
+            self.delete(key)
+            return
+        self.execute(b"SET", key.encode("utf-8"), data, b"PX", str(ttl_ms).encode("ascii"))
+
+    def delete(self, key: str) -> None:
+        self.execute(b"DEL", key.encode("utf-8"))
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+
+def create_backend(kind: str, sqlite_path: str = None, redis_url: str = None) -> Optional[CacheBackend]:
+    """Backend for Settings.CACHE_BACKEND: "memory" (none), "sqlite" or "redis"."""
+    kind = (kind or "memory").lower()
+    if kind == "memory":
+        return None
+    if kind == "sqlite":
+        return SQLiteBackend(sqlite_path)
+    if kind == "redis":
+        return RedisBackend(redis_url)
+    raise ValueError(f"Unknown cache backend: {kind}")
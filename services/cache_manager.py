@@ -1,23 +1,457 @@
+import asyncio
+import heapq
+import itertools
 import json
+import threading
 import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import Settings
+from services.cache_backends import CacheBackend, create_backend, decode_entry, encode_entry
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_SWEEP_INTERVAL = 60
+DEFAULT_MAX_REFRESHES = 4
+
+# Namespaces of the shared cache registry
+CACHE_NAMESPACES = ("flights", "hotels", "places", "llm", "itineraries")
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory cost of a cached value, measured as its JSON encoding."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+def _sweep_loop(cache_ref: "weakref.ref[CacheManager]", stop: threading.Event, interval: float) -> None:
+    # Holds only a weak reference so an unused cache can still be garbage collected
+    while not stop.wait(interval):
+        cache = cache_ref()
+        if cache is None:
+            return
+        cache.sweep()
+        del cache
+
 
 class CacheManager:
-    def __init__(self, ttl: int = 3600):
-        self.cache = {}
-        self.ttl = ttl  # Time to live in seconds
+    """
+    In-memory cache with a time to live per entry, bounded by entry count and
+    approximate size in bytes. Entries live in an OrderedDict in least recently
+    used order, so get/set/delete and eviction are O(1); an expiry heap lets a
+    background sweeper drop expired entries without scanning the whole cache.
 
-    def get(self, key: str):
-        if key in self.cache:
-            data, timestamp = self.cache[key]
-            if (time.time() - timestamp) < self.ttl:
-                return data
+    With a `backend`, the in-memory LRU is the first tier in front of a persistent
+    store (see services/cache_backends.py): writes go to both, and memory misses
+    are filled from the backend with the entry's remaining TTL. The async entry
+    points (get_or_fetch, aget, aset, adelete) run backend I/O in a worker thread
+    so a slow SQLite file or Redis server never blocks the event loop; get/set/delete
+    are for synchronous callers.
+
+    `get_or_fetch` adds single-flight semantics for async callers: concurrent
+    misses for one key share a single fetch. With `stale_ttl`, entries stay fresh
+    for their TTL and are then served stale for up to `stale_ttl` more seconds
+    while `get_or_fetch` refreshes them in the background, at most
+    `max_refreshes` at a time.
+    """
+
+    def __init__(
+        self,
+        ttl: int = 3600,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+        max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+        sweep_interval: Optional[float] = DEFAULT_SWEEP_INTERVAL,
+        backend: Optional[CacheBackend] = None,
+        namespace: str = "",
+        stale_ttl: int = 0,
+        max_refreshes: int = DEFAULT_MAX_REFRESHES,
+        sweep_backend: bool = True
+    ):
+        self.ttl = ttl  # Default time to live in seconds
+        self.stale_ttl = stale_ttl  # Extra seconds an entry may be served stale while it is refreshed
+        self.max_refreshes = max_refreshes
+        self.backend = backend
+        # Off when the backend is shared by several caches and swept once for all of them
+        self.sweep_backend = sweep_backend
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (value, expires_at, size, fresh_until); expires_at is the hard expiry
+        self.cache: "OrderedDict[str, Tuple[Any, float, int, float]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.backend_hits = 0
+        self._expiry_heap: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refreshing = 0
+        self.coalesced = 0
+        self.stale_hits = 0
+        self.refreshes = 0
+
+        self._stop = threading.Event()
+        if sweep_interval:
+            threading.Thread(
+                target=_sweep_loop,
+                args=(weakref.ref(self), self._stop, sweep_interval),
+                name="cache-sweeper",
+                daemon=True
+            ).start()
+
+    def _memory_lookup(self, key: str) -> Tuple[Any, bool]:
+        """(value, stale) from the in-memory tier, or (None, False) if it is missing or past its hard expiry."""
+        now = time.time()
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is not None:
+                data, expires_at, _, fresh_until = entry
+                if now < expires_at:
+                    self.cache.move_to_end(key)
+                    return data, now >= fresh_until
+                self._remove(key)  # Expired
+        return None, False
+
+    def _fill(self, key: str, found: Optional[Tuple[Any, float]]) -> Tuple[Any, bool]:
+        """Copy a backend entry into the in-memory tier; returns (value, stale) like _memory_lookup."""
+        if found is None:
+            return None, False
+        data, expires_at = found
+        fresh_until = expires_at - self.stale_ttl
+        size = estimate_size(data)
+        with self._lock:
+            self._store(key, data, expires_at, size, fresh_until)
+            self.backend_hits += 1
+        return data, time.time() >= fresh_until
+
+    def _lookup(self, key: str) -> Tuple[Any, bool]:
+        """(value, stale) for `key` from either tier; blocks on the backend, so for sync callers only."""
+        data, stale = self._memory_lookup(key)
+        if data is not None or self.backend is None:
+            return data, stale
+        return self._fill(key, self._backend_get(key))
+
+    async def _alookup(self, key: str) -> Tuple[Any, bool]:
+        """_lookup for async callers: backend I/O runs in a worker thread, off the event loop."""
+        data, stale = self._memory_lookup(key)
+        if data is not None or self.backend is None:
+            return data, stale
+        return self._fill(key, await asyncio.to_thread(self._backend_get, key))
+
+    def _count(self, data, stale: bool, allow_stale: bool):
+        with self._lock:
+            if data is None or (stale and not allow_stale):
+                self.misses += 1
+                return None
+            self.hits += 1
+            return data
+
+    def get(self, key: str, allow_stale: bool = False):
+        data, stale = self._lookup(key)
+        return self._count(data, stale, allow_stale)
+
+    async def aget(self, key: str, allow_stale: bool = False):
+        """get() that does not block the event loop on the backend."""
+        data, stale = await self._alookup(key)
+        return self._count(data, stale, allow_stale)
+
+    def _memory_set(self, key: str, value, ttl: Optional[int]) -> float:
+        """Store in the in-memory tier; returns the entry's hard expiry for the backend write."""
+        size = estimate_size(value)
+        fresh_until = time.time() + (self.ttl if ttl is None else ttl)
+        expires_at = fresh_until + self.stale_ttl
+        with self._lock:
+            self._store(key, value, expires_at, size, fresh_until)
+        return expires_at
+
+    def set(self, key: str, value, ttl: Optional[int] = None):
+        """Store `value` under `key` for `ttl` seconds (the cache default if omitted)."""
+        expires_at = self._memory_set(key, value, ttl)
+        if self.backend is not None:
+            self._backend_set(key, value, expires_at)
+
+    async def aset(self, key: str, value, ttl: Optional[int] = None):
+        """set() that writes to the backend from a worker thread."""
+        expires_at = self._memory_set(key, value, ttl)
+        if self.backend is not None:
+            await asyncio.to_thread(self._backend_set, key, value, expires_at)
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        cache_if: Callable[[Any], bool] = bool
+    ):
+        """
+        Cached value for `key`, or the result of `await fetch()`, which is cached
+        when `cache_if(result)` holds (by default: when it is not empty).
+
+        Only the first miss for a key runs `fetch`; concurrent callers await the same
+        task and receive its result or its exception. The fetch runs as its own task,
+        so a cancelled caller does not cancel it for the others.
+
+        A stale value is returned immediately and refreshed in the background.
+        """
+        value, stale = await self._alookup(key)
+        with self._lock:
+            if value:
+                self.hits += 1
+                self.stale_hits += stale
             else:
-                del self.cache[key]  # Expired
-        return None
+                self.misses += 1
+        if value:
+            if stale:
+                self._start_refresh(key, fetch, ttl, cache_if)
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            with self._lock:
+                self.coalesced += 1
+        else:
+            task = self._start_fetch(key, fetch, ttl, cache_if)
+        return await asyncio.shield(task)
+
+    def _start_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: Optional[int], cache_if: Callable[[Any], bool]) -> asyncio.Task:
+        async def run():
+            result = await fetch()
+            if cache_if(result):
+                await self.aset(key, result, ttl)
+            return result
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._inflight[key] = task
+        task.add_done_callback(lambda done: self._fetch_done(key, done))
+        return task
 
-    def set(self, key: str, value):
-        self.cache[key] = (value, time.time())
+    def _start_refresh(self, key: str, fetch: Callable[[], Awaitable[Any]], ttl: Optional[int], cache_if: Callable[[Any], bool]):
+        """Refresh a stale entry in the background, unless it is already being fetched or too many refreshes run."""
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            return
+        if self._refreshing >= self.max_refreshes:
+            return  # Keep serving the stale value; a later request will refresh it
+        with self._lock:
+            self._refreshing += 1
+            self.refreshes += 1
+        task = self._start_fetch(key, fetch, ttl, cache_if)
+        task.add_done_callback(lambda done: self._refresh_done(key, done))
+
+    def _refresh_done(self, key: str, task: asyncio.Task):
+        with self._lock:
+            self._refreshing -= 1
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Background refresh failed for {key}: {task.exception()}")
+
+    def _fetch_done(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception retrieved even if every caller was cancelled meanwhile
+        if not task.cancelled():
+            task.exception()
+
+    def _memory_delete(self, key: str):
+        with self._lock:
+            if key in self.cache:
+                self._remove(key)
 
     def delete(self, key: str):
+        self._memory_delete(key)
+        if self.backend is not None:
+            self._backend_delete(key)
+
+    async def adelete(self, key: str):
+        """delete() that deletes from the backend from a worker thread."""
+        self._memory_delete(key)
+        if self.backend is not None:
+            await asyncio.to_thread(self._backend_delete, key)
+
+    def clear(self):
+        with self._lock:
+            self.cache.clear()
+            self._expiry_heap.clear()
+            self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def sweep(self) -> int:
+        """Drop every expired entry; returns how many were removed."""
+        removed = 0
+        now = time.time()
+        with self._lock:
+            while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                expires_at, _, key = heapq.heappop(self._expiry_heap)
+                entry = self.cache.get(key)
+                # Heap items for overwritten or deleted entries are stale; skip them
+                if entry is not None and entry[1] == expires_at:
+                    self._remove(key)
+                    removed += 1
+        if self.backend is not None and self.sweep_backend:
+            try:
+                self.backend.sweep()
+            except Exception as e:
+                print(f"Cache backend sweep error: {e}")
+        return removed
+
+    def close(self):
+        """Stop the background sweeper."""
+        self._stop.set()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.cache),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "backend_hits": self.backend_hits,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+            "stale_hits": self.stale_hits,
+            "refreshes": self.refreshes,
+        }
+
+    def _backend_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}" if self.namespace else key
+
+    def _backend_get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(value, expires_at) from the backend, or None on a miss, expiry or backend error."""
+        try:
+            data = self.backend.get(self._backend_key(key))
+            if data is None:
+                return None
+            value, expires_at = decode_entry(data)
+        except Exception as e:
+            print(f"Cache backend read error for {key}: {e}")
+            return None
+        return (value, expires_at) if time.time() < expires_at else None
+
+    def _backend_set(self, key: str, value, expires_at: float):
+        try:
+            self.backend.set(self._backend_key(key), encode_entry(value, expires_at), expires_at)
+        except Exception as e:
+            print(f"Cache backend write error for {key}: {e}")
+
+    def _backend_delete(self, key: str):
+        try:
+            self.backend.delete(self._backend_key(key))
+        except Exception as e:
+            print(f"Cache backend delete error for {key}: {e}")
+
+    def _store(self, key: str, value, expires_at: float, size: int, fresh_until: float):
+        """Insert into the in-memory tier; caller holds the lock."""
         if key in self.cache:
-            del self.cache[key]
+            self._remove(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        self.cache[key] = (value, expires_at, size, fresh_until)
+        self.total_bytes += size
+        heapq.heappush(self._expiry_heap, (expires_at, next(self._sequence), key))
+        self._evict()
+        if len(self._expiry_heap) > 2 * len(self.cache) + 1024:
+            self._compact_expiry_heap()
+
+    def _remove(self, key: str):
+        _, _, size, _ = self.cache.pop(key)
+        self.total_bytes -= size
+
+    def _evict(self):
+        """Drop least recently used entries until both bounds hold."""
+        while self.cache and (
+            (self.max_entries is not None and len(self.cache) > self.max_entries) or
+            (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            _, (_, _, size, _) = self.cache.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+    def _compact_expiry_heap(self):
+        self._expiry_heap = [item for item in self._expiry_heap
+                             if item[2] in self.cache and self.cache[item[2]][1] == item[0]]
+        heapq.heapify(self._expiry_heap)
+
+
+_caches: Dict[str, CacheManager] = {}
+_caches_lock = threading.Lock()
+_backend: Optional[CacheBackend] = None
+_sweeper_stop: Optional[threading.Event] = None
+
+
+def _registry_sweep_loop(stop: threading.Event, interval: float) -> None:
+    # One thread for the whole registry: every namespace's memory tier, then the shared backend once
+    while not stop.wait(interval):
+        for cache in list(_caches.values()):
+            cache.sweep()
+        backend = _backend
+        if backend is not None:
+            try:
+                backend.sweep()
+            except Exception as e:
+                print(f"Cache backend sweep error: {e}")
+
+
+def get_cache(namespace: str) -> CacheManager:
+    """
+    Process-wide cache for a namespace, shared by every client instance.
+    TTL and bounds come from Settings (CACHE_TTL, CACHE_MAX_ENTRIES, CACHE_MAX_BYTES
+    and the CACHE_NAMESPACE_* overrides); all namespaces share the persistent
+    backend chosen by CACHE_BACKEND, with keys prefixed by namespace. A single
+    background thread sweeps every namespace and the backend.
+    """
+    cache = _caches.get(namespace)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(namespace)
+            if cache is None:
+                global _backend, _sweeper_stop
+                settings = Settings()
+                if _backend is None:
+                    _backend = create_backend(settings.CACHE_BACKEND, settings.CACHE_SQLITE_PATH, settings.CACHE_REDIS_URL)
+                if _sweeper_stop is None:
+                    _sweeper_stop = threading.Event()
+                    threading.Thread(
+                        target=_registry_sweep_loop,
+                        args=(_sweeper_stop, DEFAULT_SWEEP_INTERVAL),
+                        name="cache-sweeper",
+                        daemon=True
+                    ).start()
+                cache = CacheManager(
+                    ttl=settings.CACHE_NAMESPACE_TTL.get(namespace, settings.CACHE_TTL),
+                    max_entries=settings.CACHE_NAMESPACE_MAX_ENTRIES.get(namespace, settings.CACHE_MAX_ENTRIES),
+                    max_bytes=settings.CACHE_MAX_BYTES,
+                    backend=_backend,
+                    namespace=namespace,
+                    stale_ttl=settings.CACHE_NAMESPACE_STALE_TTL.get(namespace, settings.CACHE_STALE_TTL),
+                    max_refreshes=settings.CACHE_MAX_REFRESHES,
+                    sweep_interval=None,  # Swept by the registry's sweeper
+                    sweep_backend=False
+                )
+                _caches[namespace] = cache
+    return cache
+
+
+def cache_stats() -> Dict[str, dict]:
+    return {namespace: cache.stats() for namespace, cache in _caches.items()}
+
+
+def close_caches() -> None:
+    """Stop the sweeper, drop every namespace and close the backend (application shutdown)."""
+    global _backend, _sweeper_stop
+    with _caches_lock:
+        if _sweeper_stop is not None:
+            _sweeper_stop.set()
+            _sweeper_stop = None
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
+        if _backend is not None:
+            _backend.close()
+            _backend = None
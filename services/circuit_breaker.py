@@ -0,0 +1,159 @@
+"""
+Circuit breakers for the external providers.
+
+A breaker watches the outcome and latency of a provider's recent calls. When
+too many of them fail or are too slow it opens: calls fail immediately with
+CircuitOpenError, so callers fall back to local data instead of waiting for
+timeouts. After a cool-down it lets a few trial calls through (half-open) and
+closes again once they succeed.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict
+
+from config.settings import get_settings
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        # Recent outcomes: True for a failed or slow call
+        self._outcomes = deque(maxlen=window)
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.opened = 0
+
+    def _open(self) -> None:
+        if self.state != OPEN:
+            print(f"Circuit breaker '{self.name}' opened")
+            self.opened += 1
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the provider now; half-open lets a limited number of probes through."""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = HALF_OPEN
+                self._probes = self._probe_successes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def record(self, success: bool, seconds: float) -> None:
+        slow = seconds >= self.slow_call_seconds
+        bad = not success or slow
+        with self._lock:
+            self.calls += 1
+            self.failures += not success
+            self.slow_calls += slow
+            if self.state == HALF_OPEN:
+                if bad:
+                    self._open()
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    print(f"Circuit breaker '{self.name}' closed")
+                    self.state = CLOSED
+                return
+            self._outcomes.append(bad)
+            if len(self._outcomes) >= self.min_calls and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    async def call(self, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """`await fetch()` if the breaker allows it, recording its outcome; CircuitOpenError otherwise."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+        start = time.monotonic()
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            # Cancellation says nothing about the provider's health, but frees the probe slot
+            with self._lock:
+                if self.state == HALF_OPEN and self._probes > 0:
+                    self._probes -= 1
+            raise
+        except Exception:
+            self.record(False, time.monotonic() - start)
+            raise
+        self.record(True, time.monotonic() - start)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "recent_failure_rate": round(sum(self._outcomes) / len(self._outcomes), 3) if self._outcomes else 0.0,
+                "calls": self.calls,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "opened": self.opened,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    """The process-wide breaker for a provider, configured from Settings."""
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(provider)
+            if breaker is None:
+                settings = get_settings()
+                breaker = CircuitBreaker(
+                    provider,
+                    window=settings.BREAKER_WINDOW,
+                    min_calls=settings.BREAKER_MIN_CALLS,
+                    failure_rate=settings.BREAKER_FAILURE_RATE,
+                    slow_call_seconds=settings.BREAKER_SLOW_CALL_SECONDS,
+                    open_seconds=settings.BREAKER_OPEN_SECONDS,
+                    half_open_probes=settings.BREAKER_HALF_OPEN_PROBES
+                )
+                _breakers[provider] = breaker
+    return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    return {provider: breaker.stats() for provider, breaker in _breakers.items()}
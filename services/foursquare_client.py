@@ -10,6 +10,9 @@ from typing import Dict, Any, List, Optional
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 from config.settings import Settings
+from services.cache_manager import get_cache
+from services.circuit_breaker import CircuitOpenError, get_breaker
+from services.http_client import provider_get
 
 
 class FoursquareClient:
@@ -17,11 +20,13 @@ class FoursquareClient:
         settings = Settings()
     
         self.api_key = settings.FOURSQUARE_API_KEY
-        self.base_url = "https://api.foursquare.com/v3/places"
+        self.base_url = settings.FOURSQUARE_BASE_URL
         self.headers = {
             "Accept": "application/json",
             "Authorization": self.api_key
         }
+        self.cache = get_cache("places")  # Shared by every FoursquareClient
+        self.breaker = get_breaker("foursquare")
 
     async def search_places(
         self,
@@ -48,19 +53,24 @@ class FoursquareClient:
         if radius: params["radius"] = radius
         if categories: params["categories"] = categories
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(f"{self.base_url}/search", headers=self.headers, params=params)
-                response.raise_for_status()  # Raise an exception for HTTP errors
-                data = response.json()
-                return data.get("results", [])
-            except httpx.HTTPStatusError as e:
-                print(f"Foursquare API HTTP error: {e.response.status_code} - {e.response.text}")
-                return []
-            except httpx.RequestError as e:
-                print(f"Foursquare API request error: {e}")
-                return []
-            except Exception as e:
-                print(f"An unexpected error occurred with Foursquare API: {e}")
-                return []
+        async def fetch_places():
+            response = await provider_get("foursquare", f"{self.base_url}/search", hedge=True, headers=self.headers, params=params)
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            data = response.json()
+            return data.get("results", [])
 
+        cache_key = "foursquare_" + "_".join(f"{name}={params[name]}" for name in sorted(params))
+        try:
+            # Concurrent identical searches share one provider call
+            return await self.cache.get_or_fetch(cache_key, lambda: self.breaker.call(fetch_places))
+        except CircuitOpenError:
+            return []
+        except httpx.HTTPStatusError as e:
+            print(f"Foursquare API HTTP error: {e.response.status_code} - {e.response.text}")
+            return []
+        except httpx.RequestError as e:
+            print(f"Foursquare API request error: {e}")
+            return []
+        except Exception as e:
+            print(f"An unexpected error occurred with Foursquare API: {e}")
+            return []
@@ -1,55 +1,122 @@
 
-import requests
+import math
 import os
 from typing import List, Dict
 from config.settings import Settings
-from services.cache_manager import CacheManager
+from services.cache_manager import get_cache
+from services.circuit_breaker import CircuitOpenError, get_breaker
+from services.http_client import provider_get
+from utils.destinations import normalize_text
+from utils.geo import geohash_center, geohash_encode, geohash_half_diagonal_km, geohash_precision_for_radius, haversine_km
+
+# Tiles cover more area than a single query, so fetch more places per tile (Geoapify caps limit at 500)
+TILE_LIMIT_FACTOR = 2
+MAX_LIMIT = 500
+
+def _has_location(place: Dict) -> bool:
+    return place.get("lat") is not None and place.get("lon") is not None
+
+def _distance_m(lat: float, lon: float, place: Dict) -> float:
+    return float(haversine_km(lat, lon, place["lat"], place["lon"])) * 1000
+
+def _nearest(places: List[Dict], lat: float, lon: float, radius: int) -> List[Dict]:
+    """Places within `radius` meters of (lat, lon), with their exact distance, closest first."""
+    nearby = []
+    for place in places:
+        if not _has_location(place):
+            continue
+        distance = _distance_m(lat, lon, place)
+        if distance <= radius:
+            nearby.append({**place, "distance": round(distance)})
+    nearby.sort(key=lambda place: place["distance"])
+    return nearby
 
 class GeoapifyClient:
     def __init__(self):
         settings = Settings()
         self.api_key = settings.GEOAPIFY_API_KEY
-        self.base_url = "https://api.geoapify.com/v2/places"
-        self.cache = CacheManager()
+        self.base_url = settings.GEOAPIFY_BASE_URL
+        self.cache = get_cache("places")  # Shared by every GeoapifyClient
+        self.breaker = get_breaker("geoapify")
     
     async def search_places(self, categories: List[str], lat: float, lon: float, radius: int = 5000, limit: int = 20):
-        cache_key = f"places_{'_'.join(categories)}_{lat}_{lon}_{radius}_{limit}"
-        cached_data = self.cache.get(cache_key)
-        if cached_data:
-            return cached_data
+        """
+        Places within `radius` meters of (lat, lon), closest first.
 
-        categories_str = ",".join(categories)
-        
-        params = {
-            "categories": categories_str,
-            "filter": f"circle:{lon},{lat},{radius}",
-            "bias": f"proximity:{lon},{lat}",
-            "limit": limit,
-            "apiKey": self.api_key
-        }
-        
-        response = requests.get(self.base_url, params=params)
-        data = response.json()
-        
-        places = []
-        for feature in data.get("features", []):
-            props = feature["properties"]
-            places.append({
-                "name": props.get("name"),
-                "category": props.get("categories", [""])[0],
-                "address": props.get("formatted"),
-                "distance": props.get("distance"),
-                "rating": props.get("rate", {}).get("rating"),
-                "website": props.get("website"),
-                "opening_hours": props.get("opening_hours")
-            })
-        
-        self.cache.set(cache_key, places)
-        return places
+        Searches are snapped to the geohash tile containing the point, at a precision
+        derived from `radius`. Each tile is fetched once, with the radius widened by the
+        tile's half diagonal so it covers every query point inside it, and cached; the
+        tile's places are then filtered by exact distance to the query point.
+
+        A full tile page is only the places nearest the tile's center. When it cannot
+        vouch for the places nearest the query point, the point is searched directly.
+        """
+        precision = geohash_precision_for_radius(radius / 1000)
+        tile = geohash_encode(lat, lon, precision)
+        tile_lat, tile_lon = geohash_center(tile)
+        tile_radius = int(math.ceil(radius + geohash_half_diagonal_km(precision) * 1000))
+        tile_limit = min(limit * TILE_LIMIT_FACTOR, MAX_LIMIT)
+
+        tile_key = f"places_{'_'.join(categories)}_{tile}_{tile_radius}_{tile_limit}"
+        places = await self._search(tile_key, categories, tile_lat, tile_lon, tile_radius, tile_limit)
+        nearby = _nearest(places, lat, lon, radius)
+
+        if len(places) >= tile_limit:
+            # Truncated page: it holds every place within `covered` meters of the tile center,
+            # hence every place within `covered - offset` meters of the query point
+            covered = max((_distance_m(tile_lat, tile_lon, place) for place in places if _has_location(place)), default=0.0)
+            safe = covered - _distance_m(tile_lat, tile_lon, {"lat": lat, "lon": lon})
+            complete = radius <= safe or (len(nearby) >= limit and nearby[limit - 1]["distance"] <= safe)
+            if not complete:
+                point_key = f"places_{'_'.join(categories)}_{lat}_{lon}_{radius}_{limit}"
+                places = await self._search(point_key, categories, lat, lon, radius, limit)
+                nearby = _nearest(places, lat, lon, radius)
+        return nearby[:limit]
+
+    async def _search(self, cache_key: str, categories: List[str], lat: float, lon: float, radius: int, limit: int):
+        """Up to `limit` places within `radius` meters of (lat, lon), nearest first, cached under `cache_key`."""
+        async def fetch_places():
+            categories_str = ",".join(categories)
+
+            params = {
+                "categories": categories_str,
+                "filter": f"circle:{lon},{lat},{radius}",
+                "bias": f"proximity:{lon},{lat}",
+                "limit": limit,
+                "apiKey": self.api_key
+            }
+
+            response = await provider_get("geoapify", self.base_url, hedge=True, params=params)
+            response.raise_for_status()
+            data = response.json()
+
+            places = []
+            for feature in data.get("features", []):
+                props = feature["properties"]
+                places.append({
+                    "name": props.get("name"),
+                    "category": props.get("categories", [""])[0],
+                    "address": props.get("formatted"),
+                    "distance": props.get("distance"),
+                    "rating": props.get("rate", {}).get("rating"),
+                    "website": props.get("website"),
+                    "opening_hours": props.get("opening_hours"),
+                    "lat": props.get("lat"),
+                    "lon": props.get("lon")
+                })
+            return places
+
+        # Concurrent searches for the same tile share one provider call
+        try:
+            return await self.cache.get_or_fetch(cache_key, lambda: self.breaker.call(fetch_places))
+        except CircuitOpenError:
+            # No local places catalog to fall back to: fail fast with no places
+            return []
     
     async def get_place_categories_by_mood(self, mood: str) -> List[str]:
+        mood = normalize_text(mood or "")
         cache_key = f"mood_categories_{mood}"
-        cached_data = self.cache.get(cache_key)
+        cached_data = await self.cache.aget(cache_key)
         if cached_data:
             return cached_data
 
@@ -60,5 +127,5 @@ class GeoapifyClient:
             "relaxing": ["leisure", "wellness", "natural", "catering.cafe"],
             "cultural": ["tourism", "cultural", "religion", "museum", "historical"]
         }
-        self.cache.set(cache_key, mood_categories.get(mood, ["tourism", "catering", "entertainment"]))
+        await self.cache.aset(cache_key, mood_categories.get(mood, ["tourism", "catering", "entertainment"]))
         return mood_categories.get(mood, ["tourism", "catering", "entertainment"])
\ No newline at end of file
@@ -0,0 +1,267 @@
+"""
+Shared, pooled HTTP clients for the external providers.
+
+One httpx.AsyncClient per provider keeps connections alive between calls,
+so requests skip TCP/TLS setup. The FastAPI lifespan creates the clients at
+startup and closes them at shutdown; code running outside the app (scripts,
+tests) gets a lazily created client instead.
+
+`provider_get` is the way provider searches go out: every attempt takes a
+token from the provider's rate limiter, failed attempts are retried with
+jittered exponential backoff (or after the server's Retry-After), and
+hedged requests send a second attempt when the first is slower than the
+provider's recent p95 latency. With PROVIDER_RECORD_DIR set, successful
+responses are also recorded for replay by stub_server.py.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import Counter, deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, Optional
+
+import httpx
+
+from config.settings import get_settings
+from services.rate_limiter import TokenBucket
+from services.recordings import save_recording
+
+PROVIDERS = ("serpapi", "geoapify", "foursquare")
+
+# Responses worth another attempt: throttling and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Latency samples kept per provider for the hedging delay, and the minimum before it is trusted
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 20
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_request_counts: Dict[str, int] = {}
+_clients_lock = threading.Lock()
+_limiters: Dict[str, TokenBucket] = {}
+_latencies: Dict[str, Deque[float]] = {}
+_counters: Dict[str, Counter] = {}
+_in_flight: Counter = Counter()
+
+
+def provider_timeout() -> httpx.Timeout:
+    """Connect/read/write/pool timeouts for provider calls, from Settings."""
+    settings = get_settings()
+    return httpx.Timeout(
+        connect=settings.HTTP_CONNECT_TIMEOUT,
+        read=settings.HTTP_READ_TIMEOUT,
+        write=settings.HTTP_READ_TIMEOUT,
+        pool=settings.HTTP_CONNECT_TIMEOUT
+    )
+
+
+def _http2_enabled() -> bool:
+    if not get_settings().HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # noqa: F401  (httpx needs it for HTTP/2)
+    except ImportError:
+        print("HTTP2_ENABLED is set but the 'h2' package is not installed; using HTTP/1.1")
+        return False
+    return True
+
+
+def _create_client(provider: str) -> httpx.AsyncClient:
+    settings = get_settings()
+
+    async def count_request(request: httpx.Request):
+        _request_counts[provider] = _request_counts.get(provider, 0) + 1
+
+    return httpx.AsyncClient(
+        timeout=provider_timeout(),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        ),
+        http2=_http2_enabled(),
+        event_hooks={"request": [count_request]}
+    )
+
+
+def get_http_client(provider: str) -> httpx.AsyncClient:
+    """The shared client for a provider, created on first use if the app did not create it."""
+    client = _clients.get(provider)
+    if client is None or client.is_closed:
+        with _clients_lock:
+            client = _clients.get(provider)
+            if client is None or client.is_closed:
+                client = _create_client(provider)
+                _clients[provider] = client
+    return client
+
+
+def create_http_clients() -> Dict[str, httpx.AsyncClient]:
+    """Create every provider's client up front (application startup)."""
+    return {provider: get_http_client(provider) for provider in PROVIDERS}
+
+
+async def close_http_clients() -> None:
+    """Close every provider's client and its pooled connections (application shutdown)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        await client.aclose()
+
+
+def get_rate_limiter(provider: str) -> TokenBucket:
+    limiter = _limiters.get(provider)
+    if limiter is None:
+        settings = get_settings()
+        rate = settings.HTTP_RATE_LIMITS.get(provider, settings.HTTP_RATE_LIMIT)
+        limiter = _limiters.setdefault(provider, TokenBucket(rate, settings.HTTP_RATE_BURST))
+    return limiter
+
+
+def hedge_delay(provider: str) -> float:
+    """Seconds to wait before hedging: the provider's recent p95 latency, at least HTTP_HEDGE_MIN_DELAY."""
+    minimum = get_settings().HTTP_HEDGE_MIN_DELAY
+    samples = _latencies.get(provider)
+    if not samples or len(samples) < MIN_LATENCY_SAMPLES:
+        return minimum
+    ordered = sorted(samples)
+    return max(minimum, ordered[int(len(ordered) * 0.95) - 1])
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), if present."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+async def _attempt(provider: str, url: str, **kwargs) -> httpx.Response:
+    start = time.monotonic()
+    _in_flight[provider] += 1
+    try:
+        response = await get_http_client(provider).get(url, **kwargs)
+    finally:
+        _in_flight[provider] -= 1
+    if response.status_code not in RETRY_STATUSES:
+        latencies = _latencies.setdefault(provider, deque(maxlen=LATENCY_WINDOW))
+        latencies.append(time.monotonic() - start)
+    return response
+
+
+async def _hedged_attempt(provider: str, url: str, **kwargs) -> httpx.Response:
+    """One attempt, plus a second one if the first is slower than the hedge delay and quota allows."""
+    first = asyncio.ensure_future(_attempt(provider, url, **kwargs))
+    pending = {first}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=hedge_delay(provider))
+        # The hedge only goes out if a token is free right now; it never waits for quota
+        if done or not get_rate_limiter(provider).try_acquire():
+            return await first
+
+        _counters.setdefault(provider, Counter())["hedged"] += 1
+        pending.add(asyncio.ensure_future(_attempt(provider, url, **kwargs)))
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # First successful attempt wins; an error only counts once both attempts failed
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                if first not in succeeded:
+                    _counters[provider]["hedge_wins"] += 1
+                return succeeded[0].result()
+            if not pending:
+                return done.pop().result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def provider_get(provider: str, url: str, hedge: bool = False, **kwargs) -> httpx.Response:
+    """
+    GET through the provider's shared client with rate limiting and retries.
+
+    Connection errors, timeouts and RETRY_STATUSES responses are retried up to
+    HTTP_MAX_RETRIES times. Pass hedge=True only for idempotent requests. The
+    last response is returned even if it is an error, so callers keep their own
+    status handling.
+    """
+    settings = get_settings()
+    limiter = get_rate_limiter(provider)
+    counters = _counters.setdefault(provider, Counter())
+    hedge = hedge and settings.HTTP_HEDGE_ENABLED
+
+    for attempt in range(settings.HTTP_MAX_RETRIES + 1):
+        await limiter.acquire()
+        last_attempt = attempt == settings.HTTP_MAX_RETRIES
+        try:
+            if hedge:
+                response = await _hedged_attempt(provider, url, **kwargs)
+            else:
+                response = await _attempt(provider, url, **kwargs)
+        except httpx.TransportError as e:
+            if last_attempt:
+                raise
+            print(f"{provider} request failed ({e!r}), retrying")
+            retry_after = None
+        else:
+            if response.status_code not in RETRY_STATUSES or last_attempt:
+                if settings.PROVIDER_RECORD_DIR and response.is_success:
+                    # File writes go to a worker thread so recording does not block the event loop
+                    await asyncio.to_thread(save_recording, settings.PROVIDER_RECORD_DIR, provider, response)
+                return response
+            print(f"{provider} returned HTTP {response.status_code}, retrying")
+            retry_after = _retry_after(response)
+
+        # Full jitter: a random delay up to the exponential cap, so clients retrying together spread out
+        delay = random.uniform(0, min(settings.HTTP_RETRY_MAX_DELAY, settings.HTTP_RETRY_BASE_DELAY * 2 ** attempt))
+        if retry_after is not None:
+            if retry_after > settings.HTTP_RETRY_MAX_DELAY:
+                return response  # The server wants us to wait longer than we would; give up
+            delay = max(delay, retry_after)
+        counters["retries"] += 1
+        await asyncio.sleep(delay)
+
+
+def _pool_connections(client: httpx.AsyncClient) -> Optional[Dict[str, int]]:
+    """
+    Open and idle connection counts, read from httpx internals (it has no public
+    API for them). None when those internals are not what this expects, e.g.
+    after an httpx upgrade, so /health degrades instead of failing.
+    """
+    try:
+        connections = list(client._transport._pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+    except Exception:
+        return None
+    return {"open": len(connections), "idle": idle}
+
+
+def pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-provider request, retry and hedging counts and connection pool state."""
+    settings = get_settings()
+    stats = {}
+    for provider, client in list(_clients.items()):
+        connections = _pool_connections(client)
+        stats[provider] = {
+            "requests": _request_counts.get(provider, 0),
+            "in_flight": _in_flight[provider],
+            "retries": _counters.get(provider, Counter())["retries"],
+            "hedged": _counters.get(provider, Counter())["hedged"],
+            "hedge_wins": _counters.get(provider, Counter())["hedge_wins"],
+            "rate_limited": get_rate_limiter(provider).waits,
+            "hedge_delay": round(hedge_delay(provider), 3),
+            "connections": connections["open"] if connections else None,
+            "idle_connections": connections["idle"] if connections else None,
+            "max_connections": settings.HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            "closed": client.is_closed,
+        }
+    return stats
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket limiting calls to `rate` per second with bursts of up to `capacity`.
+
+    Callers reserve a token and sleep until it is theirs, so waiting callers are
+    served in arrival order without polling. A rate of 0 disables the limit.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waits = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """Take a token, possibly one not yet refilled; returns the seconds to wait before using it."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now."""
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def release(self) -> None:
+        """Give back a token that was taken but never used."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+    async def acquire(self) -> None:
+        delay = self.reserve()
+        if delay > 0:
+            self.waits += 1
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                # Cancelled before the reserved token was used (e.g. the caller timed out): refund it
+                self.release()
+                raise
@@ -0,0 +1,83 @@
+"""
+Recorded provider responses, for replaying the providers without network or quota.
+
+With Settings.PROVIDER_RECORD_DIR set, every successful provider call made
+through `provider_get` is saved as <dir>/<provider>/<key>.json. The key
+covers the request path and its query parameters, minus credentials, so the
+stub server (stub_server.py) can find the response for a replayed request.
+"""
+import hashlib
+import json
+import os
+from typing import Any, Dict, Mapping, Optional
+
+import httpx
+
+# Query parameters holding credentials; never written to disk or part of the key
+SECRET_PARAMS = {"api_key", "apiKey", "apikey", "key"}
+
+
+def public_params(params: Mapping[str, Any]) -> Dict[str, str]:
+    return {name: str(value) for name, value in sorted(params.items()) if name not in SECRET_PARAMS}
+
+
+def recording_key(provider: str, path: str, params: Mapping[str, Any]) -> str:
+    canonical = json.dumps([provider, path, public_params(params)], separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def save_recording(directory: str, provider: str, response: httpx.Response) -> str:
+    """Write a provider response to the recordings directory; returns its path."""
+    url = response.request.url
+    params = dict(url.params.multi_items())
+    record = {
+        "provider": provider,
+        "path": url.path,
+        "params": public_params(params),
+        "status": response.status_code,
+        "content_type": response.headers.get("content-type", "application/json"),
+        "body": response.text,
+    }
+    provider_dir = os.path.join(directory, provider)
+    os.makedirs(provider_dir, exist_ok=True)
+    path = os.path.join(provider_dir, f"{recording_key(provider, url.path, params)}.json")
+    with open(path, "w") as f:
+        json.dump(record, f)
+    return path
+
+
+class Recordings:
+    """Recorded responses loaded from a recordings directory, looked up by request."""
+
+    def __init__(self, directory: str):
+        self.by_key: Dict[str, dict] = {}
+        self.by_path: Dict[tuple, list] = {}
+        for provider in sorted(os.listdir(directory)) if os.path.isdir(directory) else []:
+            provider_dir = os.path.join(directory, provider)
+            for name in sorted(os.listdir(provider_dir)):
+                if not name.endswith(".json"):
+                    continue
+                with open(os.path.join(provider_dir, name), "r") as f:
+                    record = json.load(f)
+                self.by_key[name[:-len(".json")]] = record
+                self.by_path.setdefault((record["provider"], record["path"]), []).append(record)
+        self._next: Dict[tuple, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_key)
+
+    def find(self, provider: str, path: str, params: Mapping[str, Any], exact: bool = False) -> Optional[dict]:
+        """
+        The recording for this request. Unless `exact`, requests that were never
+        recorded get the provider's other recordings for the same path in turn,
+        so load tests can vary dates and places freely.
+        """
+        record = self.by_key.get(recording_key(provider, path, params))
+        if record is not None or exact:
+            return record
+        candidates = self.by_path.get((provider, path))
+        if not candidates:
+            return None
+        index = self._next.get((provider, path), 0)
+        self._next[(provider, path)] = index + 1
+        return candidates[index % len(candidates)]
@@ -1,38 +1,41 @@
 
-import requests
 from typing import List
 from models.schemas import FlightOption, HotelOption
 from config.settings import Settings
-from services.cache_manager import CacheManager
+from services.cache_manager import get_cache
+from services.circuit_breaker import CircuitOpenError, get_breaker
+from services.http_client import provider_get
+from utils.catalog_store import get_catalog_store
 
 class SerpApiClient:
     def __init__(self):
         settings = Settings()
         self.api_key = settings.SERPAPI_API_KEY
-        self.base_url = "https://serpapi.com/search"
-        self.cache = CacheManager() # Initialize CacheManager
+        self.base_url = settings.SERPAPI_BASE_URL
+        # Shared process-wide caches, so results outlive this client instance
+        self.flight_cache = get_cache("flights")
+        self.hotel_cache = get_cache("hotels")
+        self.breaker = get_breaker("serpapi")
     
     async def search_flights(self, origin: str, destination: str, depart_date: str, return_date: str = None) -> List[FlightOption]:
-        cache_key = f"flights_{origin}_{destination}_{depart_date}_{return_date}"
-        cached_data = self.cache.get(cache_key)
-        if cached_data:
-            return [FlightOption(**f) for f in cached_data] # Reconstruct objects from cached dicts
+        destinations = get_catalog_store().destinations
+        cache_key = f"flights_{destinations.canonical_key(origin)}_{destinations.canonical_key(destination)}_{depart_date}_{return_date}"
 
-        params = {
-            "engine": "google_flights",
-            "departure_id": self._get_airport_code(origin),
-            "arrival_id": self._get_airport_code(destination),
-            "outbound_date": depart_date,
-            "return_date": return_date,
-            "currency": "USD",
-            "hl": "en",
-            "api_key": self.api_key
-        }
-        
-        try:
-            response = requests.get(self.base_url, params=params)
+        async def fetch_flights():
+            params = {
+                "engine": "google_flights",
+                "departure_id": self._get_airport_code(origin),
+                "arrival_id": self._get_airport_code(destination),
+                "outbound_date": depart_date,
+                "return_date": return_date,
+                "currency": "USD",
+                "hl": "en",
+                "api_key": self.api_key
+            }
+            response = await provider_get("serpapi", self.base_url, hedge=True, params=params)
+            response.raise_for_status()
             data = response.json()
-            
+
             flights = []
             for flight in data.get("best_flights", [])[:5]:  # Top 5 flights
                 flights.append(FlightOption(
@@ -43,35 +46,35 @@ class SerpApiClient:
                     departure=flight["flights"][0]["departure_airport"]["name"],
                     arrival=flight["flights"][-1]["arrival_airport"]["name"]
                 ))
-            self.cache.set(cache_key, [f.dict() for f in flights]) # Cache the results
-            return flights
+            return [f.dict() for f in flights]
+
+        try:
+            # Concurrent searches for the same route share one provider call
+            cached_data = await self.flight_cache.get_or_fetch(cache_key, lambda: self.breaker.call(fetch_flights))
+            return [FlightOption(**f) for f in cached_data] # Reconstruct objects from cached dicts
+        except CircuitOpenError:
+            return self._catalog_flights(origin, destination)
         except Exception as e:
             print(f"Flight search error: {e}")
-            return []
+            return self._catalog_flights(origin, destination)
 
     async def search_hotels(self, destination: str, check_in: str, check_out: str, budget: str) -> List[HotelOption]:
-        cache_key = f"hotels_{destination}_{check_in}_{check_out}_{budget}"
-        cached_data = self.cache.get(cache_key)
-        if cached_data:
-            return [HotelOption(**h) for h in cached_data] # Reconstruct objects from cached dicts
+        cache_key = f"hotels_{get_catalog_store().destinations.canonical_key(destination)}_{check_in}_{check_out}_{budget}"
 
         budget_map = {"low": 1, "medium": 2, "high": 3, "luxury": 4}
-        
-        params = {
-            "engine": "google_hotels",
-            "q": f"hotels in {destination}",
-            "check_in_date": check_in,
-            "check_out_date": check_out,
-            "currency": "USD",
-            "hl": "en",
-            "api_key": self.api_key
-        }
-        
-        # Implementation similar to flights...
-        # return hotels
 
-        try:
-            response = requests.get(self.base_url, params=params)
+        async def fetch_hotels():
+            params = {
+                "engine": "google_hotels",
+                "q": f"hotels in {destination}",
+                "check_in_date": check_in,
+                "check_out_date": check_out,
+                "currency": "USD",
+                "hl": "en",
+                "api_key": self.api_key
+            }
+            response = await provider_get("serpapi", self.base_url, hedge=True, params=params)
+            response.raise_for_status()
             data = response.json()
 
             hotels = []
@@ -83,19 +86,34 @@ class SerpApiClient:
                     location=hotel["address"],
                     amenities=hotel.get("amenities", [])
                 ))
-            self.cache.set(cache_key, [h.dict() for h in hotels]) # Cache the results
-            return hotels
+            return [h.dict() for h in hotels]
+
+        try:
+            # Concurrent searches for the same stay share one provider call
+            cached_data = await self.hotel_cache.get_or_fetch(cache_key, lambda: self.breaker.call(fetch_hotels))
+            return [HotelOption(**h) for h in cached_data] # Reconstruct objects from cached dicts
+        except CircuitOpenError:
+            return self._catalog_hotels(destination)
         except Exception as e:
             print(f"Hotel search error: {e}")
-            return []
+            return self._catalog_hotels(destination)
+
+    def _catalog_flights(self, origin: str, destination: str) -> List[FlightOption]:
+        # Fallback while SerpApi is failing: the local flight catalog
+        from utils.mock_data_loader import MockDataLoader
+        return MockDataLoader.get_mock_flights(origin, destination, return_flight=False)["outbound"][:5]
+
+    def _catalog_hotels(self, destination: str) -> List[HotelOption]:
+        # Fallback while SerpApi is failing: the local hotel catalog
+        from utils.mock_data_loader import MockDataLoader
+        return MockDataLoader.get_mock_hotels(destination)[:5]
     
     def _get_airport_code(self, city: str) -> str:
-        # Simple mapping - in production, use a proper airport database
-        codes = {
-            "new york": "JFK",
-            "paris": "CDG", 
-            "london": "LHR",
-            "tokyo": "NRT",
-            "lagos": "LOS"
-        }
-        return codes.get(city.lower(), city)
\ No newline at end of file
+        # Resolve through the airport table built from airport_details_map.json,
+        # then through the destination normalizer for other spellings ("NYC")
+        catalog = get_catalog_store()
+        code = catalog.airport_locator.resolve(city)
+        if code:
+            return code
+        destination = catalog.destinations.normalize(city)
+        return destination.airports[0] if destination and destination.airports else city
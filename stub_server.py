@@ -0,0 +1,149 @@
+"""
+Local stand-in for SerpApi, Geoapify and Foursquare that replays recorded responses.
+
+Record real responses first by running the app with PROVIDER_RECORD_DIR set,
+then point the provider base URLs at this server:
+
+    SERPAPI_BASE_URL=http://127.0.0.1:8090/serpapi/search
+    GEOAPIFY_BASE_URL=http://127.0.0.1:8090/geoapify/v2/places
+    FOURSQUARE_BASE_URL=http://127.0.0.1:8090/foursquare/v3/places
+
+The first path segment names the provider; the rest is the provider's own path.
+
+Usage:
+    python stub_server.py [--recordings recordings] [--port 8090]
+        [--latency lognormal:250,0.5] [--latency geoapify=fixed:80]
+        [--error-rate 0.02] [--error-rate serpapi=0.1] [--error-status 503] [--seed 1]
+
+Latency specs are in milliseconds: fixed:MS, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA.
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+from urllib.parse import parse_qsl, urlsplit
+
+from services.recordings import Recordings
+
+DEFAULT_RECORDINGS_DIR = "recordings"
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Sampler of delays in seconds for a latency spec."""
+    kind, _, args = spec.partition(":")
+    values = [float(value) for value in args.split(",")] if args else []
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1]) / 1000
+    raise argparse.ArgumentTypeError(f"Invalid latency spec: {spec}")
+
+
+def per_provider(values, parse) -> Dict[str, object]:
+    """'SPEC' sets the default (key None), 'provider=SPEC' overrides it for one provider."""
+    parsed = {}
+    for value in values or []:
+        provider, sep, spec = value.partition("=")
+        parsed[provider if sep else None] = parse(spec if sep else value)
+    return parsed
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load tests open many connections at once; the default backlog of 5 makes the extra ones retry
+    request_queue_size = 1024
+
+
+def make_handler(recordings: Recordings, latencies, error_rates, error_status: int, exact: bool, seed: int = None):
+    rng = random.Random(seed)
+    # Guards the shared generator and the counters; handlers run on one thread per connection
+    rng_lock = threading.Lock()
+    counts = {"requests": 0, "errors": 0, "misses": 0}
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            provider, _, path = url.path.lstrip("/").partition("/")
+            path = "/" + path
+            params = dict(parse_qsl(url.query, keep_blank_values=True))
+
+            latency = latencies.get(provider, latencies.get(None))
+            error_rate = error_rates.get(provider, error_rates.get(None, 0.0))
+            with rng_lock:
+                counts["requests"] += 1
+                delay = latency(rng) if latency else 0.0
+                fail = rng.random() < error_rate
+            if delay > 0:
+                time.sleep(delay)
+
+            if fail:
+                with rng_lock:
+                    counts["errors"] += 1
+                self._send(error_status, "application/json", json.dumps({"error": "Injected failure"}))
+                return
+            record = recordings.find(provider, path, params, exact=exact)
+            if record is None:
+                with rng_lock:
+                    counts["misses"] += 1
+                self._send(404, "application/json", json.dumps({"error": f"No recording for {provider}{path}"}))
+                return
+            self._send(record["status"], record["content_type"], record["body"])
+
+        def _send(self, status: int, content_type: str, body: str):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    StubHandler.counts = counts
+    return StubHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded provider responses with injected latency and errors.")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS_DIR, help="Directory written by PROVIDER_RECORD_DIR")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", action="append", help="Latency spec, or provider=spec (repeatable)")
+    parser.add_argument("--error-rate", action="append", help="Share of requests failed, or provider=rate (repeatable)")
+    parser.add_argument("--error-status", type=int, default=503, help="HTTP status of injected failures")
+    parser.add_argument("--exact", action="store_true", help="Only answer requests that were recorded exactly")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    args = parser.parse_args()
+
+    recordings = Recordings(args.recordings)
+    handler = make_handler(
+        recordings,
+        per_provider(args.latency, parse_latency),
+        per_provider(args.error_rate, float),
+        args.error_status,
+        args.exact,
+        args.seed
+    )
+    server = StubServer((args.host, args.port), handler)
+    print(f"Replaying {len(recordings)} recordings from {args.recordings} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {handler.counts['requests']} requests "
+              f"({handler.counts['errors']} injected errors, {handler.counts['misses']} without a recording)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+import os
+
+# Settings requires the provider keys; the tests never call the providers
+for name in ("SERPAPI_API_KEY", "GEOAPIFY_API_KEY", "OPENAI_API_KEY", "FOURSQUARE_API_KEY"):
+    os.environ.setdefault(name, "test")
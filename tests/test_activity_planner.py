@@ -0,0 +1,36 @@
+import asyncio
+import json
+
+from agents.ai_activity_planner import AIActivityPlanner
+from services.cache_manager import close_caches
+
+
+class CountingLLM:
+    model = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, prompt: str) -> str:
+        self.calls += 1
+        return json.dumps({"daily_activities": [
+            {"day": 1, "activities": [{"activity": "Garden Visit", "time": "09:00", "duration_hours": 2}]}
+        ]})
+
+
+def test_cached_activities_use_the_canonical_destination():
+    llm = CountingLLM()
+    planner = AIActivityPlanner(llm=llm)
+
+    async def plan(destination: str):
+        return await planner.generate_activities(destination=destination, mood="romantic", budget=500, days=1, activities_per_day=1)
+
+    try:
+        first = asyncio.run(plan("paris"))
+        second = asyncio.run(plan("PARIS, France"))
+    finally:
+        close_caches()
+
+    assert llm.calls == 1
+    assert first == second
+    assert [activity.location for activity in second[0]["activities"]] == ["Paris - Garden Visit"]
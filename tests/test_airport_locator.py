@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from utils.catalog_store import get_catalog_store
+from utils.geo import haversine_km
+
+
+@pytest.fixture(scope="module")
+def airports():
+    catalog = get_catalog_store()
+    coordinates = {}
+    for code in catalog.airport_codes:
+        details = catalog.airport_details(code)
+        if details.get('latitude') is not None and details.get('longitude') is not None:
+            coordinates[code] = (float(details['latitude']), float(details['longitude']))
+    return catalog.airport_locator, coordinates
+
+
+def brute_force(coordinates, lat, lon):
+    return sorted((float(haversine_km(lat, lon, *point)), code) for code, point in coordinates.items())
+
+
+def test_kd_tree_matches_brute_force(airports):
+    locator, coordinates = airports
+    rng = random.Random(1)
+    for _ in range(200):
+        lat, lon = rng.uniform(-80, 80), rng.uniform(-180, 180)
+        expected = brute_force(coordinates, lat, lon)
+
+        nearest = locator.nearest(lat, lon, k=3)
+        assert [code for code, _ in nearest] == [code for _, code in expected[:3]]
+        assert [distance for _, distance in nearest] == pytest.approx([distance for distance, _ in expected[:3]], abs=1e-6)
+
+        within = locator.within_radius(lat, lon, 1500)
+        assert [code for code, _ in within] == [code for distance, code in expected if distance <= 1500]
+
+
+def test_cities_resolve_to_their_primary_airport(airports):
+    locator, _ = airports
+    assert locator.code_for_city(" new york ") == "JFK"
+    assert locator.resolve("jfk") == "JFK"
+    assert locator.resolve("Tokyo") == "NRT"
+    assert locator.resolve("Atlantis") is None
@@ -0,0 +1,34 @@
+import json
+import os
+
+import pytest
+
+from utils.airport_locator import AirportLocator
+from utils.airport_matrix import AirportMatrix
+from utils.catalog_store import MOCK_DATA_DIR
+
+with open(os.path.join(MOCK_DATA_DIR, 'airport_details_map.json')) as f:
+    AIRPORTS = json.load(f)
+
+
+def test_matrix_matches_the_kd_tree_around_each_airport():
+    matrix = AirportMatrix.from_airports(AIRPORTS)
+    locator = AirportLocator(AIRPORTS)
+    for code, details in AIRPORTS.items():
+        lat, lon = details['latitude'], details['longitude']
+        assert [c for c, _ in matrix.nearby(code, 1500)] == [c for c, _ in locator.within_radius(lat, lon, 1500)]
+        assert [c for c, _ in matrix.nearest(code, 3)] == [c for c, _ in locator.nearest(lat, lon, 3)]
+        assert matrix.nearby(code, 1500)[0] == (code.upper(), 0.0)
+
+
+def test_locator_answers_airport_queries_from_the_matrix(monkeypatch):
+    locator = AirportLocator(AIRPORTS, AirportMatrix.from_airports(AIRPORTS))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("searched the KD-tree for a catalog airport")
+
+    monkeypatch.setattr(locator, "within_radius", fail)
+    monkeypatch.setattr(locator, "nearest", fail)
+    city = AIRPORTS["JFK"]["city"]
+    assert locator.metro_airports(city, radius_km=1000)[0] == "JFK"
+    assert locator.nearest_to_city(city, k=2)[0] == ("JFK", pytest.approx(0.0))
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import agents.llm
+from agents.ai_activity_planner import AIActivityPlanner
+from config.settings import get_settings
+from main import app
+from tests.test_itinerary_cache import FakeLLM
+from utils.mock_data_loader import MockDataLoader
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("ITINERARY_CACHE_ENABLED", "false")
+    get_settings.cache_clear()
+    with TestClient(app) as client:
+        planner = AIActivityPlanner(llm=FakeLLM())
+        monkeypatch.setattr(agents.llm, "get_activity_planner", lambda: planner)
+        yield client
+    get_settings.cache_clear()
+
+
+@pytest.fixture
+def hotel_lookups(monkeypatch):
+    calls = []
+    get_mock_hotels = MockDataLoader.get_mock_hotels
+
+    def counting(**kwargs):
+        calls.append(kwargs)
+        return get_mock_hotels(**kwargs)
+
+    monkeypatch.setattr(MockDataLoader, "get_mock_hotels", staticmethod(counting))
+    return calls
+
+
+def batch(client, *moods):
+    requests = [{"origin": "NYC", "destination": "Paris", "duration_days": 3, "budget": 1999, "mood": mood}
+                for mood in moods]
+    response = client.post("/generate-itineraries/batch", json=requests)
+    return sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+
+
+def test_identical_requests_are_generated_once(client, hotel_lookups):
+    lines = batch(client, "romantic", "romantic")
+
+    assert [line["index"] for line in lines] == [0, 1]
+    assert all(line["status"] == 200 for line in lines)
+    assert lines[0]["itinerary"] == lines[1]["itinerary"]
+    assert len(hotel_lookups) == 1
+
+
+def test_hotel_lookup_is_shared_across_spellings_of_a_mood(client, hotel_lookups):
+    lines = batch(client, "Romantic", "romantic", " ROMANTIC ")
+
+    assert all(line["status"] == 200 for line in lines)
+    assert len(hotel_lookups) == 1
+    assert hotel_lookups[0]["mood"] == "romantic"
+    hotels = [line["itinerary"]["hotels"] for line in lines]
+    assert hotels[0] == hotels[1] == hotels[2]
@@ -0,0 +1,295 @@
+import asyncio
+import threading
+import time
+
+import services.cache_manager as cache_manager
+from services.cache_backends import CacheBackend
+from services.cache_manager import CACHE_NAMESPACES, CacheManager, close_caches, get_cache
+
+
+class CountingBackend(CacheBackend):
+    def __init__(self):
+        self.data = {}
+        self.sweeps = 0
+
+    def get(self, key):
+        return self.data.get(key, (None,))[0]
+
+    def set(self, key, data, expires_at):
+        self.data[key] = (data, expires_at)
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def sweep(self):
+        self.sweeps += 1
+        return 0
+
+
+def test_shared_backend_is_swept_once_per_interval(monkeypatch):
+    backend = CountingBackend()
+    monkeypatch.setattr(cache_manager, "_backend", backend)
+    monkeypatch.setattr(cache_manager, "DEFAULT_SWEEP_INTERVAL", 0.05)
+    try:
+        caches = [get_cache(namespace) for namespace in CACHE_NAMESPACES]
+        assert all(cache.backend is backend for cache in caches)
+        time.sleep(0.28)
+    finally:
+        close_caches()
+    # Five namespaces, but one sweep of the backend per interval
+    assert 3 <= backend.sweeps <= 6
+
+
+def test_hit_and_miss_counts_are_exact_under_contention():
+    cache = CacheManager(sweep_interval=None)
+    cache.set("key", "value")
+
+    async def fetch():
+        return "fetched"
+
+    async def reads():
+        for _ in range(2000):
+            await cache.get_or_fetch("key", fetch)
+            cache.get("missing")
+
+    def read():
+        asyncio.run(reads())
+
+    threads = [threading.Thread(target=read) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()["hits"] == 16000
+    assert cache.stats()["misses"] == 16000
+
+
+def test_backend_io_does_not_block_the_event_loop():
+    class SlowBackend(CountingBackend):
+        def get(self, key):
+            time.sleep(0.2)
+            return super().get(key)
+
+        def set(self, key, data, expires_at):
+            time.sleep(0.2)
+            super().set(key, data, expires_at)
+
+    cache = CacheManager(sweep_interval=None, backend=SlowBackend())
+
+    async def fetch():
+        return "value"
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        value = await cache.get_or_fetch("key", fetch)
+        ticking.cancel()
+        return value, ticks
+
+    value, ticks = asyncio.run(main())
+    assert value == "value"
+    # A backend read and a backend write of 0.2 s each ran while the loop kept ticking
+    assert ticks >= 20
+    assert cache.backend.get("key") is not None
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = CacheManager(sweep_interval=None)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": calls}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_fetch("key", fetch) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert calls == 1
+    assert results == [{"value": 1}] * 10
+    assert cache.stats()["coalesced"] == 9
+
+
+def test_failed_fetch_reaches_every_waiter_and_is_retried():
+    cache = CacheManager(sweep_interval=None)
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        if calls == 1:
+            raise ConnectionError("down")
+        return "value"
+
+    async def main():
+        failed = await asyncio.gather(*(cache.get_or_fetch("key", fetch) for _ in range(5)), return_exceptions=True)
+        return failed, await cache.get_or_fetch("key", fetch)
+
+    failed, retried = asyncio.run(main())
+    assert all(isinstance(result, ConnectionError) for result in failed)
+    assert retried == "value"
+    assert calls == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_fetch():
+    cache = CacheManager(sweep_interval=None)
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def main():
+        first = asyncio.ensure_future(cache.get_or_fetch("key", fetch))
+        second = asyncio.ensure_future(cache.get_or_fetch("key", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "value"
+    assert cache.get("key") == "value"
+
+
+def test_stale_value_is_served_while_it_refreshes():
+    cache = CacheManager(ttl=0, stale_ttl=60, sweep_interval=None)
+    cache.set("key", "old")
+    refreshed = asyncio.Event()
+
+    async def fetch():
+        refreshed.set()
+        return "new"
+
+    async def main():
+        stale = await cache.get_or_fetch("key", fetch)
+        await asyncio.wait_for(refreshed.wait(), 1)
+        await asyncio.sleep(0)
+        return stale
+
+    assert asyncio.run(main()) == "old"
+    assert cache.get("key", allow_stale=True) == "new"
+    assert cache.stats()["stale_hits"] == 1
+    assert cache.stats()["refreshes"] == 1
+
+
+def test_refreshes_are_capped_and_fresh_entries_are_not_refreshed():
+    cache = CacheManager(ttl=0, stale_ttl=60, max_refreshes=2, sweep_interval=None)
+    for index in range(5):
+        cache.set(f"stale{index}", "old")
+    cache.set("fresh", "value", ttl=60)
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return "new"
+
+    async def main():
+        values = [await cache.get_or_fetch(f"stale{index}", fetch) for index in range(5)]
+        values.append(await cache.get_or_fetch("fresh", fetch))
+        release.set()
+        await asyncio.sleep(0.01)
+        return values
+
+    assert asyncio.run(main()) == ["old"] * 5 + ["value"]
+    # Only two refreshes ran; the other stale entries keep their value until a later request
+    assert cache.stats()["refreshes"] == 2
+    assert [cache.get(f"stale{index}", allow_stale=True) for index in range(5)] == ["new", "new", "old", "old", "old"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+def test_least_recently_used_entries_are_evicted_first():
+    cache = CacheManager(max_entries=2, max_bytes=None, sweep_interval=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["evictions"] == 1
+
+
+def test_size_bound_evicts_until_the_entries_fit():
+    cache = CacheManager(max_entries=None, max_bytes=20, sweep_interval=None)
+    cache.set("a", "x" * 10)
+    cache.set("b", "y" * 10)
+    cache.set("too big", "z" * 100)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "y" * 10
+    assert cache.get("too big") is None
+    assert cache.stats()["bytes"] <= 20
+
+
+def test_entries_expire_after_their_own_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_manager, "time", clock)
+    cache = CacheManager(ttl=60, sweep_interval=None)
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=5)
+
+    clock.now += 10
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+    clock.now += 60
+    assert cache.get("default") is None
+
+
+def test_sweep_drops_expired_entries_nobody_reads(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_manager, "time", clock)
+    cache = CacheManager(ttl=60, sweep_interval=None)
+    for index in range(10):
+        cache.set(f"key{index}", index, ttl=5 if index % 2 else 60)
+    cache.set("key1", "overwritten", ttl=60)
+
+    clock.now += 10
+    assert cache.sweep() == 4
+    assert len(cache) == 6
+    assert cache.get("key1") == "overwritten"
+
+
+def test_background_sweeper_runs_until_closed():
+    cache = CacheManager(ttl=0, sweep_interval=0.02)
+    cache.set("key", "value")
+    time.sleep(0.1)
+    cache.close()
+    assert len(cache) == 0
+
+
+def test_clients_share_one_cache_per_namespace(monkeypatch):
+    from services.geoapify_client import GeoapifyClient
+    from services.serpapi_client import SerpApiClient
+
+    monkeypatch.setenv("CACHE_NAMESPACE_TTL", '{"flights": 900}')
+    try:
+        first, second = SerpApiClient(), SerpApiClient()
+        assert first.flight_cache is second.flight_cache is get_cache("flights")
+        assert first.hotel_cache is get_cache("hotels") is not first.flight_cache
+        assert GeoapifyClient().cache is GeoapifyClient().cache is get_cache("places")
+        assert get_cache("flights").ttl == 900
+        assert get_cache("hotels").ttl == 3600
+
+        first.flight_cache.set("route", ["flight"])
+        assert second.flight_cache.get("route") == ["flight"]
+        assert set(cache_manager.cache_stats()) >= {"flights", "hotels", "places"}
+    finally:
+        close_caches()
+    # Shutdown drops every namespace; the next use starts afresh
+    assert get_cache("flights").get("route") is None
+    close_caches()
@@ -0,0 +1,58 @@
+import json
+import os
+
+import utils.catalog_format as catalog_format
+from compile_catalog import load_json
+from utils.catalog_format import write_catalog
+from utils.catalog_store import MOCK_DATA_DIR, CatalogStore
+
+
+def load(filename):
+    with open(os.path.join(MOCK_DATA_DIR, filename), 'r') as f:
+        return json.load(f)
+
+
+def test_binary_catalog_round_trip(tmp_path):
+    flights = load('flights.json')['flights']
+    hotels = load('hotels.json')['hotels']
+    airports = load('airport_details_map.json')
+    path = str(tmp_path / 'catalog.bin')
+    write_catalog(path, flights, hotels, airports)
+
+    from_json = CatalogStore.from_records(flights=flights, hotels=hotels, airports=airports)
+    from_binary = CatalogStore.from_binary(path)
+
+    assert from_binary.flight_count == len(flights)
+    assert from_binary.hotel_count == len(hotels)
+    assert [from_binary.flight(row) for row in range(len(flights))] == [from_json.flight(row) for row in range(len(flights))]
+    assert [from_binary.hotel(row) for row in range(len(hotels))] == [from_json.hotel(row) for row in range(len(hotels))]
+    assert set(from_binary.airport_codes) == set(from_json.airport_codes)
+    for departure, arrival in from_json.flight_index.routes()[:50]:
+        assert from_binary.find_flights(departure, arrival, max_price=400) == from_json.find_flights(departure, arrival, max_price=400)
+
+
+def test_ndjson_shards_compile_in_chunks(tmp_path, monkeypatch):
+    flights = load('flights.json')['flights']
+    hotels = load('hotels.json')['hotels']
+    airports = load('airport_details_map.json')
+    for key, records in (('flights', flights), ('hotels', hotels)):
+        shard_dir = tmp_path / key
+        shard_dir.mkdir()
+        for shard in range(3):
+            (shard_dir / f"{key}-{shard:05d}.ndjson").write_text(
+                "".join(json.dumps(record) + "\n" for record in records[shard::3]))
+
+    # Shards are read lazily and compiled a few records at a time
+    monkeypatch.setattr(catalog_format, 'COMPILE_CHUNK_SIZE', 7)
+    streamed_flights = load_json(str(tmp_path / 'flights'), 'flights')
+    streamed_hotels = load_json(str(tmp_path / 'hotels'), 'hotels')
+    assert not isinstance(streamed_flights, list)
+    path = str(tmp_path / 'catalog.bin')
+    assert write_catalog(path, streamed_flights, streamed_hotels, airports) == (len(flights), len(hotels))
+
+    sharded_flights = [f for shard in range(3) for f in flights[shard::3]]
+    sharded_hotels = [h for shard in range(3) for h in hotels[shard::3]]
+    from_json = CatalogStore.from_records(flights=sharded_flights, hotels=sharded_hotels, airports=airports)
+    from_binary = CatalogStore.from_binary(path)
+    assert [from_binary.flight(row) for row in range(len(flights))] == [from_json.flight(row) for row in range(len(flights))]
+    assert [from_binary.hotel(row) for row in range(len(hotels))] == [from_json.hotel(row) for row in range(len(hotels))]
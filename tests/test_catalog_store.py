@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+import utils.catalog_store as catalog_store
+from utils.catalog_store import CatalogStore, get_catalog_store
+
+FLIGHTS = [
+    {"airline": "KLM", "price": 320.0, "duration": "7h 30m", "stops": 0, "departure": "JFK", "arrival": "CDG",
+     "departure_fullname": "John F. Kennedy International Airport", "arrival_fullname": "Charles de Gaulle Airport",
+     "distance_km": 5834.0},
+]
+HOTELS = [
+    {"name": "Hilton Paris", "price_per_night": 210.0, "rating": 4.2, "location": "Paris",
+     "amenities": ["WiFi", "Pool"], "category": "midscale"},
+]
+AIRPORTS = {
+    "JFK": {"name": "John F. Kennedy International Airport", "country": "USA", "city": "New York",
+            "latitude": 40.6413, "longitude": -73.7781},
+    "CDG": {"name": "Charles de Gaulle Airport", "country": "France", "city": "Paris",
+            "latitude": 49.0097, "longitude": 2.5479},
+}
+
+
+@pytest.fixture
+def store():
+    return CatalogStore.from_records(flights=FLIGHTS, hotels=HOTELS, airports=AIRPORTS)
+
+
+def test_store_is_loaded_once_across_threads(monkeypatch, store):
+    loads = []
+
+    def from_directory(*args, **kwargs):
+        loads.append(1)
+        return store
+
+    monkeypatch.setattr(catalog_store, "_catalog_store", None)
+    monkeypatch.setattr(CatalogStore, "from_directory", from_directory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_catalog_store())) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert all(result is store for result in results)
+
+
+def test_records_are_read_only(store):
+    with pytest.raises(TypeError):
+        store.flight_record(0)["price"] = 0
+    with pytest.raises(TypeError):
+        store.airport_details("JFK")["city"] = "Boston"
+    assert store.hotel_record(0)["amenities"] == ("WiFi", "Pool")
+
+
+def test_query_results_are_fresh_copies(store):
+    flight = store.find_flights("JFK", "CDG")[0]
+    flight.price = 0
+    hotel = store.hotel(0)
+    hotel.amenities.append("Spa")
+
+    assert store.find_flights("JFK", "CDG")[0].price == 320.0
+    assert store.hotel(0).amenities == ["WiFi", "Pool"]
+    assert FLIGHTS[0]["price"] == 320.0
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+async def ok():
+    return "ok"
+
+
+async def fail():
+    raise ConnectionError("down")
+
+
+def call(breaker, fetch):
+    return asyncio.run(breaker.call(fetch))
+
+
+def test_opens_after_failures_and_rejects_calls():
+    breaker = CircuitBreaker("test", window=10, min_calls=4, failure_rate=0.5, open_seconds=60)
+    for _ in range(2):
+        assert call(breaker, ok) == "ok"
+        with pytest.raises(ConnectionError):
+            call(breaker, fail)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        call(breaker, ok)
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test", window=4, min_calls=2, failure_rate=0.5, open_seconds=0.01)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            call(breaker, fail)
+    assert breaker.state == OPEN
+
+    asyncio.run(asyncio.sleep(0.02))
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)  # The probe fails: open again
+    assert breaker.state == OPEN
+
+    asyncio.run(asyncio.sleep(0.02))
+    assert call(breaker, ok) == "ok"
+    assert breaker.state == CLOSED
+
+
+def test_cancelled_probe_frees_its_slot():
+    breaker = CircuitBreaker("test", window=4, min_calls=1, failure_rate=0.5, open_seconds=0.01)
+    with pytest.raises(ConnectionError):
+        call(breaker, fail)
+
+    async def main():
+        await asyncio.sleep(0.02)
+        probe = asyncio.ensure_future(breaker.call(lambda: asyncio.sleep(1)))
+        await asyncio.sleep(0)
+        assert breaker.state == HALF_OPEN
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        return await breaker.call(ok)
+
+    assert asyncio.run(main()) == "ok"
+    assert breaker.state == CLOSED
+
+
+
+def test_open_breaker_falls_back_to_the_local_catalog(monkeypatch):
+    from services.cache_manager import close_caches
+    from services.serpapi_client import SerpApiClient
+    from utils.mock_data_loader import MockDataLoader
+
+    client = SerpApiClient()
+    breaker = CircuitBreaker("serpapi", min_calls=1)
+    monkeypatch.setattr(client, "breaker", breaker)
+    breaker._open()
+
+    async def unreachable(*args, **kwargs):
+        raise AssertionError("called SerpApi while the breaker is open")
+
+    monkeypatch.setattr("services.serpapi_client.provider_get", unreachable)
+    try:
+        hotels = asyncio.run(client.search_hotels("Paris", "2026-11-01", "2026-11-03", "medium"))
+    finally:
+        close_caches()
+    assert hotels and hotels == MockDataLoader.get_mock_hotels("Paris")[:5]
+    assert breaker.stats()["rejected"] == 1
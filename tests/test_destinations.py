@@ -0,0 +1,46 @@
+import pytest
+
+from utils.destinations import DestinationNormalizer
+
+AIRPORTS = {
+    "LHR": {"name": "Heathrow Airport", "city": "London", "country": "UK"},
+    "FCO": {"name": "Leonardo da Vinci International Airport", "city": "Rome", "country": "Italy"},
+    "SEA": {"name": "Seattle-Tacoma International Airport", "city": "Seattle", "country": "USA"},
+    "JFK": {"name": "John F. Kennedy International Airport", "city": "New York", "country": "USA"},
+    "CDG": {"name": "Charles de Gaulle Airport", "city": "Paris", "country": "France"},
+}
+HOTEL_LOCATIONS = ["London", "New York City", "Paris", "France", "Tokyo"]
+
+
+@pytest.fixture
+def normalizer():
+    return DestinationNormalizer(AIRPORTS, HOTEL_LOCATIONS)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("NYC", "new-york"),
+    ("New York City", "new-york"),
+    ("new york, NY", "new-york"),
+    ("JFK", "new-york"),
+    ("SEA", "seattle"),
+    ("Paris, France", "paris"),
+    ("Pariss", "paris"),
+    ("London, United Kingdom", "london"),
+    ("Tokyo, Japan", "tokyo"),
+    ("France", "france"),
+])
+def test_spellings_of_a_destination_share_it(normalizer, text, expected):
+    assert normalizer.normalize(text).id == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Londonderry",
+    "Rome, Georgia",
+    "Paris, TX",
+    "Paris, London",
+    "Sea",
+    "jfk",
+    "Paris Texas",
+])
+def test_other_places_do_not_match(normalizer, text):
+    assert normalizer.normalize(text) is None
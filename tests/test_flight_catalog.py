@@ -0,0 +1,24 @@
+import numpy as np
+
+from utils.catalog_store import get_catalog_store
+from utils.flight_table import FlightTable
+
+
+def test_best_flight_matches_scoring_the_whole_route():
+    catalog = get_catalog_store()
+    table, index = catalog.flight_table, catalog.flight_index
+    routes = index.routes() + [(None, None)] + [(departure, None) for departure, _ in index.routes()[:20]]
+    for departure, arrival in routes:
+        for max_price in (None, 150, 600, 5000):
+            for stop_penalty in (0.0, 0.1, 0.5):
+                rows = index.lookup(departure, arrival, max_price=max_price)
+                expected = table.best_flight(rows, float('inf') if max_price is None else max_price, stop_penalty)
+                best = catalog.best_flight(departure, arrival, max_price=max_price, stop_penalty=stop_penalty)
+                assert best == (catalog.flight(expected) if expected >= 0 else None)
+
+
+def test_zero_distance_is_kept():
+    flight = {"price": 100.0, "stops": 0, "duration": "1h 0m", "airline": "A", "departure": "JFK", "arrival": "LGA"}
+    table = FlightTable.from_records([{**flight, "distance_km": 0}, flight])
+    assert table.distance_km[0] == 0
+    assert np.isnan(table.distance_km[1])
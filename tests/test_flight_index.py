@@ -0,0 +1,32 @@
+from utils.catalog_store import get_catalog_store
+
+
+def scan(records, departure, arrival, max_price):
+    """The flights a linear scan over the catalog finds, cheapest first (ties in catalog order)."""
+    rows = [row for row, flight in enumerate(records)
+            if (departure is None or flight['departure'] == departure)
+            and (arrival is None or flight['arrival'] == arrival)
+            and (max_price is None or flight['price'] <= max_price)]
+    return sorted(rows, key=lambda row: records[row]['price'])
+
+
+def test_postings_match_a_linear_scan():
+    catalog = get_catalog_store()
+    records = list(catalog.iter_flight_records())
+    index = catalog.flight_index
+    departure, arrival = index.routes()[0]
+    queries = index.routes()[:30] + [(departure, None), (None, arrival), (None, None)]
+    for departure, arrival in queries:
+        for max_price in (None, 0, 250, 800):
+            expected = scan(records, departure, arrival, max_price)
+            assert index.lookup(departure, arrival, max_price=max_price) == expected
+            assert index.lookup(departure, arrival, max_price=max_price, limit=3) == expected[:3]
+            assert index.count(departure, arrival, max_price=max_price) == len(expected)
+
+
+def test_lookup_ignores_case_and_unknown_routes():
+    index = get_catalog_store().flight_index
+    departure, arrival = index.routes()[0]
+    assert index.lookup(departure.lower(), arrival.lower()) == index.lookup(departure, arrival)
+    assert index.lookup("XXX", arrival) == []
+    assert index.count("XXX", arrival) == 0
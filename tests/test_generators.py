@@ -0,0 +1,42 @@
+import argparse
+import os
+
+import numpy as np
+
+from generate_flights import generate_durations, generate_flight_rows
+from utils.catalog_generation import generate_sharded
+from utils.flight_table import parse_duration_minutes
+
+CODES = ["JFK", "BOS", "LHR", "CDG"]
+OPTIONS = {
+    "codes": CODES,
+    "names": [f"{code} Airport" for code in CODES],
+    # JFK-BOS is short enough for the variation to push some durations below zero
+    "distances": np.array([[0, 300, 5540, 5834], [300, 0, 5260, 5530], [5540, 5260, 0, 344], [5834, 5530, 344, 0]]),
+    "weights": np.full(len(CODES), 1 / len(CODES)),
+    "popular_routes": np.empty((0, 2), dtype=np.int64),
+    "popular_share": 0.0,
+}
+
+
+def test_durations_are_never_negative():
+    rng = np.random.default_rng(0)
+    distance = rng.uniform(50, 400, size=5000)
+    stops = np.zeros(5000, dtype=np.int64)
+    durations = list(generate_durations(rng, distance, stops))
+
+    minutes = [duration.split()[1] for duration in durations]
+    assert all(not m.startswith("-") and int(m[:-1]) < 60 for m in minutes)
+    assert min(parse_duration_minutes(duration) for duration in durations) >= 30
+
+
+def generate(tmp_path, workers):
+    output = os.path.join(tmp_path, f"flights-{workers}.json")
+    args = argparse.Namespace(count=2500, seed=7, format="json", output=output, shards=4, workers=workers, zipf=0.0)
+    generate_sharded(generate_flight_rows, args, "flights", OPTIONS)
+    with open(output) as f:
+        return f.read()
+
+
+def test_output_does_not_depend_on_workers(tmp_path):
+    assert generate(tmp_path, workers=1) == generate(tmp_path, workers=2)
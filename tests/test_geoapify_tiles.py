@@ -0,0 +1,67 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+import services.geoapify_client as geoapify_client
+from services.cache_manager import close_caches
+from services.geoapify_client import GeoapifyClient
+from utils.geo import haversine_km
+
+# A dense grid of places, roughly 100 m apart, around central Paris
+PLACES = [(48.85 + i * 0.0009, 2.34 + j * 0.0014) for i in range(-40, 41) for j in range(-40, 41)]
+
+
+class FakeGeoapify:
+    """Answers like Geoapify: the `limit` places nearest the filter circle's center, inside it."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, provider, url, hedge=False, params=None):
+        lon, lat, radius = (float(value) for value in params["filter"].removeprefix("circle:").split(","))
+        self.calls.append(params)
+        lats, lons = np.array(PLACES).T
+        distances = haversine_km(lat, lon, lats, lons) * 1000
+        order = [index for index in np.argsort(distances) if distances[index] <= radius][:int(params["limit"])]
+        features = [{"properties": {"name": f"place {index}", "lat": lats[index], "lon": lons[index]}} for index in order]
+        return httpx.Response(200, json={"features": features}, request=httpx.Request("GET", url))
+
+
+@pytest.fixture
+def fake_geoapify(monkeypatch):
+    fake = FakeGeoapify()
+    monkeypatch.setattr(geoapify_client, "provider_get", fake)
+    yield fake
+    close_caches()
+
+
+def nearest_names(lat, lon, radius, limit):
+    distances = [(float(haversine_km(lat, lon, place_lat, place_lon)) * 1000, index)
+                 for index, (place_lat, place_lon) in enumerate(PLACES)]
+    return [f"place {index}" for distance, index in sorted(distances) if distance <= radius][:limit]
+
+
+def test_dense_tile_returns_the_places_nearest_the_query_point(fake_geoapify):
+    # Off-center in its tile: the tile's page holds the places nearest the center instead
+    lat, lon = 48.8705, 2.3652
+    places = asyncio.run(GeoapifyClient().search_places(["catering"], lat, lon, radius=2000, limit=20))
+
+    assert [place["name"] for place in places] == nearest_names(lat, lon, 2000, 20)
+
+
+def test_sparse_tile_is_served_from_the_tile(fake_geoapify):
+    lat, lon = 48.8705, 2.3652
+
+    async def search():
+        client = GeoapifyClient()
+        # Nothing in 150 m beyond a handful of places: the tile page is not full
+        first = await client.search_places(["catering"], lat, lon, radius=150, limit=20)
+        second = await client.search_places(["catering"], lat + 0.0001, lon, radius=150, limit=20)
+        return first, second
+
+    first, second = asyncio.run(search())
+    assert [place["name"] for place in first] == nearest_names(lat, lon, 150, 20)
+    assert [place["name"] for place in second] == nearest_names(lat + 0.0001, lon, 150, 20)
+    assert len(fake_geoapify.calls) == 1
@@ -0,0 +1,29 @@
+from utils.catalog_store import get_catalog_store
+
+
+def test_match_locations_is_a_case_insensitive_substring_test():
+    catalog = get_catalog_store()
+    index, locations = catalog.hotel_index, catalog.hotel_table.locations
+    for destination in ("paris", "NEW YORK", "york", "an", "o'hare", "Dallas/Fort", "", "atlantis"):
+        expected = [loc_id for loc_id, location in enumerate(locations) if destination.lower() in location.lower()]
+        assert index.match_locations(destination) == expected
+
+
+def test_rows_match_a_linear_filter():
+    catalog = get_catalog_store()
+    index = catalog.hotel_index
+    records = list(catalog.iter_hotel_records())
+    for destination in ("Paris", "new york", None):
+        location_ids = index.match_locations(destination) if destination else None
+        for categories in (["luxury"], ["midscale", "economy"], index.categories):
+            for max_price in (None, 150, 600):
+                expected = [row for row, hotel in enumerate(records)
+                            if (destination is None or destination.lower() in hotel['location'].lower())
+                            and hotel.get('category') in categories
+                            and (max_price is None or hotel['price_per_night'] <= max_price)]
+                assert index.rows(categories, max_price, location_ids) == expected
+                assert index.count(categories, max_price, location_ids) == len(expected)
+                by_price = [row for _, row in index.iter_by_price(categories, max_price, location_ids)]
+                assert sorted(by_price) == expected
+                prices = [records[row]['price_per_night'] for row in by_price]
+                assert prices == sorted(prices)
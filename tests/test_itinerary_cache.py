@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import agents.llm
+from agents.ai_activity_planner import AIActivityPlanner
+from config.settings import get_settings
+from main import app
+
+
+class FakeLLM:
+    """Answers every activity prompt with the same one-activity-per-day schedule."""
+    model = "fake"
+
+    async def ainvoke(self, prompt: str) -> str:
+        days = [{"day": day, "activities": [{"activity": "Garden Visit", "time": "09:00", "duration_hours": 2}]}
+                for day in range(1, 4)]
+        return json.dumps({"daily_activities": days})
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("ITINERARY_CACHE_ENABLED", "true")
+    get_settings.cache_clear()
+    with TestClient(app) as client:
+        planner = AIActivityPlanner(llm=FakeLLM())
+        monkeypatch.setattr(agents.llm, "get_activity_planner", lambda: planner)
+        yield client
+    get_settings.cache_clear()
+
+
+def itinerary(client, headers=None, **fields):
+    request = {"origin": "NYC", "destination": "paris", "duration_days": 3, "budget": 1999, "mood": "Romantic"}
+    request.update(fields)
+    return client.post("/generate-itinerary", json=request, headers=headers or {})
+
+
+def test_cached_body_matches_every_request_sharing_its_key(client):
+    first = itinerary(client)
+    second = itinerary(client, origin="New York", destination="Paris", mood="romantic", budget=1951)
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    body = first.json()
+    # Built from the canonical request, not from whichever spelling missed first
+    assert body["summary"] == "3-day romantic trip to Paris from New York"
+    locations = [activity["location"] for day in body["daily_plan"] for activity in day["activities"]]
+    assert locations and all(location.startswith("Paris - ") for location in locations)
+
+
+def test_no_store_renders_the_callers_request(client):
+    response = itinerary(client, headers={"Cache-Control": "no-store"})
+
+    assert response.headers["x-cache"] == "BYPASS"
+    assert response.json()["summary"] == "3-day Romantic trip to paris from NYC"
+    # Nothing was cached for the key
+    assert itinerary(client).headers["x-cache"] == "MISS"
+
+
+def test_no_cache_does_not_store_a_non_canonical_body(client):
+    itinerary(client)
+    refreshed = itinerary(client, headers={"Cache-Control": "no-cache"})
+    after = itinerary(client, origin="New York", destination="Paris", mood="romantic", budget=1950)
+
+    assert refreshed.json()["summary"] == "3-day Romantic trip to paris from NYC"
+    assert after.headers["x-cache"] == "MISS"
+    assert after.json()["summary"] == "3-day romantic trip to Paris from New York"
@@ -0,0 +1,30 @@
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+
+from main import app
+from models.schemas import FlightOption, FlightOptions
+from utils.json_response import ModelJSONResponse
+
+FLIGHT = FlightOption(airline="KLM", price=320.5, duration="7h 30m", stops=0, departure="JFK", arrival="CDG")
+
+
+def test_models_render_like_the_default_encoder():
+    content = {"flights": FlightOptions(outbound=[FLIGHT], return_=[FLIGHT]), "count": 2}
+    response = ModelJSONResponse(content)
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == jsonable_encoder(content, by_alias=True)
+    assert "return" in json.loads(response.body)["flights"]
+
+
+def test_search_endpoints_keep_their_response_shape():
+    with TestClient(app) as client:
+        flights = client.get("/search-flights", params={"origin": "JFK", "destination": "CDG", "return_date": "2026-11-08"})
+        hotels = client.get("/search-hotels", params={"destination": "Paris", "check_in": "2026-11-01", "check_out": "2026-11-08"})
+
+    assert flights.headers["content-type"] == "application/json"
+    assert set(flights.json()["flights"]) == {"outbound", "return"}
+    assert all(FlightOption(**flight) for flight in flights.json()["flights"]["outbound"])
+    assert hotels.json()["hotels"] and all("price_per_night" in hotel for hotel in hotels.json()["hotels"])
@@ -0,0 +1,46 @@
+import asyncio
+import threading
+
+import pytest
+
+import agents.llm as llm
+from config.settings import get_settings
+
+
+@pytest.fixture
+def llms(monkeypatch):
+    monkeypatch.setenv("ACTIVITY_LLM_MODEL", "activity-model")
+    get_settings.cache_clear()
+    yield llm
+    asyncio.run(llm.close_llms())
+    get_settings.cache_clear()
+
+
+def test_each_role_gets_one_llm_per_process(llms):
+    created = llms.create_llms()
+
+    assert set(created) == set(llms.LLM_PROFILES)
+    assert all(llms.get_llm(role) is instance for role, instance in created.items())
+    assert len({id(instance) for instance in created.values()}) == len(created)
+    assert llms.get_llm("activities").model == "activity-model"
+
+
+def test_activity_planner_is_shared_and_uses_the_shared_llm(llms):
+    planners = []
+    threads = [threading.Thread(target=lambda: planners.append(llms.get_activity_planner())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(planner is planners[0] for planner in planners)
+    assert planners[0].llm is llms.get_llm("activities")
+
+
+def test_close_llms_drops_the_instances_and_their_pool(llms):
+    first = llms.get_llm("parsing")
+    transport = llms._shared_transport()
+    asyncio.run(llms.close_llms())
+
+    assert llms.get_llm("parsing") is not first
+    assert llms._shared_transport() is not transport
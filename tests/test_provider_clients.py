@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+import services.http_client as http_client
+from services.cache_manager import close_caches
+from services.recordings import Recordings
+from services.serpapi_client import SerpApiClient
+from stub_server import StubServer, make_handler
+
+DELAY = 0.2
+
+
+@pytest.fixture
+def slow_serpapi(monkeypatch):
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.params["q"])
+        await asyncio.sleep(DELAY)
+        hotel = {"name": f"Hotel {len(calls)}", "price": 120.0, "rating": 4.1, "address": request.url.params["q"]}
+        return httpx.Response(200, json={"hotels": [hotel]})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_client, "get_http_client", lambda provider: client)
+    yield calls
+    close_caches()
+
+
+def test_searches_run_concurrently_without_blocking_the_loop(slow_serpapi):
+    destinations = ["Paris", "Rome", "Madrid", "Vienna", "Dublin"]
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticking = asyncio.ensure_future(ticker())
+        client = SerpApiClient()
+        start = time.monotonic()
+        results = await asyncio.gather(*(
+            client.search_hotels(destination, "2026-11-01", "2026-11-03", "medium") for destination in destinations
+        ))
+        elapsed = time.monotonic() - start
+        ticking.cancel()
+        return results, elapsed, ticks
+
+    results, elapsed, ticks = asyncio.run(main())
+    assert [hotels[0].location for hotels in results] == [f"hotels in {d}" for d in destinations]
+    assert sorted(slow_serpapi) == sorted(f"hotels in {d}" for d in destinations)
+    # Five provider calls of DELAY each overlapped, and the loop kept running meanwhile
+    assert elapsed < 3 * DELAY
+    assert ticks >= 10
+
+
+def test_app_lifespan_owns_one_pooled_client_per_provider():
+    from fastapi.testclient import TestClient
+
+    from main import app
+
+    with TestClient(app) as client:
+        clients = app.state.http_clients
+        assert set(clients) == set(http_client.PROVIDERS)
+        assert all(http_client.get_http_client(provider) is clients[provider] for provider in clients)
+        pools = client.get("/health").json()["http_pools"]
+        assert set(pools) == set(http_client.PROVIDERS)
+        assert not any(pool["closed"] for pool in pools.values())
+    assert all(pooled.is_closed for pooled in clients.values())
+
+
+def test_requests_reuse_a_kept_alive_connection(tmp_path):
+    server = StubServer(("127.0.0.1", 0), make_handler(Recordings(str(tmp_path)), {}, {}, 503, exact=False))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/geoapify/v2/places"
+
+    async def main():
+        try:
+            statuses = [(await http_client.provider_get("geoapify", url)).status_code for _ in range(5)]
+            return statuses, http_client._pool_connections(http_client.get_http_client("geoapify"))
+        finally:
+            await http_client.close_http_clients()
+
+    try:
+        statuses, connections = asyncio.run(main())
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert statuses == [404] * 5
+    assert connections == {"open": 1, "idle": 1}
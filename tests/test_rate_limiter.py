@@ -0,0 +1,33 @@
+import asyncio
+
+from services.rate_limiter import TokenBucket
+
+
+def test_cancelled_waiter_refunds_its_token():
+    bucket = TokenBucket(rate=10, capacity=1)
+
+    async def main():
+        assert bucket.try_acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+
+    asyncio.run(main())
+    # The cancelled reservation was given back: only the first token is spent
+    assert bucket.tokens > -0.5
+
+
+def test_burst_then_waits():
+    bucket = TokenBucket(rate=100, capacity=2)
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for _ in range(4):
+            await bucket.acquire()
+        return loop.time() - start
+
+    elapsed = asyncio.run(main())
+    assert 0.015 <= elapsed < 0.1
+    assert bucket.waits == 2
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+import services.http_client as http_client
+from config.settings import get_settings
+from services.recordings import Recordings
+from stub_server import StubServer, make_handler
+
+
+def test_recorded_response_replays_without_its_api_key(monkeypatch, tmp_path):
+    def handler(request):
+        return httpx.Response(200, json={"features": [{"name": "Louvre"}]})
+
+    monkeypatch.setenv("PROVIDER_RECORD_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(http_client, "get_http_client", lambda provider: client)
+    try:
+        params = {"categories": "tourism", "apiKey": "secret"}
+        response = asyncio.run(http_client.provider_get("geoapify", "https://api.geoapify.com/v2/places", params=params))
+    finally:
+        get_settings.cache_clear()
+
+    assert response.json() == {"features": [{"name": "Louvre"}]}
+    (recording,) = (tmp_path / "geoapify").iterdir()
+    assert "secret" not in recording.read_text()
+    record = Recordings(str(tmp_path)).find("geoapify", "/v2/places", {"categories": "tourism", "apiKey": "other"}, exact=True)
+    assert record["body"] == response.text
+
+
+def test_stub_server_counts_every_request_once(tmp_path):
+    handler = make_handler(Recordings(str(tmp_path)), {}, {None: 0.5}, 503, exact=False, seed=1)
+    server = StubServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def get(_):
+        with httpx.Client() as client:
+            return [client.get(f"{base_url}/geoapify/v2/places").status_code for _ in range(25)]
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            statuses = [status for batch in pool.map(get, range(8)) for status in batch]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    counts = handler.counts
+    assert counts["requests"] == len(statuses) == 200
+    assert counts["errors"] == statuses.count(503)
+    assert counts["misses"] == statuses.count(404)
+    assert counts["errors"] + counts["misses"] == counts["requests"]
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from utils.stages import Stage, StageError, run_stages
+
+
+async def value(result, delay: float = 0):
+    await asyncio.sleep(delay)
+    return result
+
+
+async def fail(error: Exception):
+    raise error
+
+
+def test_stages_run_concurrently():
+    async def main():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await run_stages({
+            "a": Stage(run=lambda: value(1, 0.1)),
+            "b": Stage(run=lambda: value(2, 0.1)),
+        })
+        return results, loop.time() - start
+
+    results, elapsed = asyncio.run(main())
+    assert results == {"a": 1, "b": 2}
+    assert elapsed < 0.19
+
+
+def test_failed_stage_uses_its_fallback():
+    results = asyncio.run(run_stages({
+        "a": Stage(run=lambda: fail(ValueError("boom")), fallback=lambda: "fallback"),
+        "b": Stage(run=lambda: value(2)),
+    }))
+    assert results == {"a": "fallback", "b": 2}
+
+
+def test_timed_out_stage_uses_its_fallback():
+    results = asyncio.run(run_stages({
+        "a": Stage(run=lambda: value(1, 1), timeout=0.01, fallback=lambda: "fallback"),
+    }))
+    assert results == {"a": "fallback"}
+
+
+def test_failed_stage_without_fallback_cancels_the_others():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def main():
+        with pytest.raises(StageError) as raised:
+            await run_stages({
+                "a": Stage(run=lambda: fail(ValueError("boom"))),
+                "b": Stage(run=slow),
+            })
+        return raised.value
+
+    error = asyncio.run(main())
+    assert error.stage == "a"
+    assert str(error) == "a stage failed: boom"
+    assert cancelled.is_set()
+
+
+def test_failing_fallback_raises_stage_error():
+    def fallback():
+        return 1 / 0
+
+    with pytest.raises(StageError) as raised:
+        asyncio.run(run_stages({
+            "activities": Stage(run=lambda: fail(ValueError("boom")), fallback=fallback),
+            "b": Stage(run=lambda: value(2, 1)),
+        }))
+    assert raised.value.stage == "activities"
+    assert isinstance(raised.value.error, ZeroDivisionError)
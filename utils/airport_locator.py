@@ -0,0 +1,204 @@
+import heapq
+import math
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from utils.airport_matrix import AirportMatrix
+from utils.geo import EARTH_RADIUS_KM
+
+# Airports within this distance of a city's primary airport serve the same metro area
+METRO_RADIUS_KM = 80
+
+# Primary airports for cities the catalog has no coordinates for; catalog cities take precedence
+EXTRA_CITY_AIRPORTS = {
+    "TOKYO": "NRT",
+    "DUBAI": "DXB",
+    "SINGAPORE": "SIN",
+    "HONG KONG": "HKG",
+    "SYDNEY": "SYD",
+    "TORONTO": "YYZ",
+    "VANCOUVER": "YVR",
+    "BERLIN": "BER",
+    "LAGOS": "LOS",
+}
+
+
+def unit_vectors(lat, lon) -> np.ndarray:
+    """Points on the unit sphere; chord length between them is monotonic in great circle distance."""
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    """Scalar unit_vectors for query points."""
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def km_to_chord(distance_km: float) -> float:
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+class AirportLocator:
+    """
+    Resolves city names and coordinates to airport codes.
+
+    Cities map to their airports through a table built once from the catalog;
+    coordinates go through a KD-tree over the airports' unit vectors, which
+    answers nearest and within-radius queries without scanning every airport.
+    Queries around a catalog airport read its row of the precomputed
+    AirportMatrix instead, when one is given.
+    """
+
+    def __init__(self, airports: Mapping[str, Mapping[str, Any]], matrix: Optional[AirportMatrix] = None):
+        self._matrix = matrix
+        self.codes: Tuple[str, ...] = tuple(code.upper() for code in airports)
+        self._index = {code: idx for idx, code in enumerate(self.codes)}
+        self._lat = [float(details['latitude']) for details in airports.values()]
+        self._lon = [float(details['longitude']) for details in airports.values()]
+        self._points = unit_vectors(self._lat, self._lon).reshape(-1, 3)
+        # Plain tuples for the per-node distance checks; NumPy call overhead dominates at this size
+        self._xyz: List[Tuple[float, float, float]] = [tuple(p) for p in self._points.tolist()]
+
+        # City table: every catalog airport under its city, in catalog order (first one is primary)
+        self._city_airports: Dict[str, List[str]] = {}
+        for code, details in zip(self.codes, airports.values()):
+            city = (details.get('city') or '').strip().upper()
+            if city:
+                self._city_airports.setdefault(city, []).append(code)
+        for city, code in EXTRA_CITY_AIRPORTS.items():
+            self._city_airports.setdefault(city, [code])
+
+        # KD-tree nodes stored as parallel lists; node i splits on _axis[i] at point _point[i]
+        self._point: List[int] = []
+        self._axis: List[int] = []
+        self._left: List[int] = []
+        self._right: List[int] = []
+        self._root = self._build(np.arange(len(self.codes)), 0)
+
+    def _squared_chord(self, point: int, target: Tuple[float, float, float]) -> float:
+        x, y, z = self._xyz[point]
+        return (x - target[0]) ** 2 + (y - target[1]) ** 2 + (z - target[2]) ** 2
+
+    def _build(self, indices: np.ndarray, depth: int) -> int:
+        if len(indices) == 0:
+            return -1
+        # Split on the axis with the largest spread, at the median point
+        spread = np.ptp(self._points[indices], axis=0)
+        axis = int(np.argmax(spread)) if len(indices) > 1 else depth % 3
+        ordered = indices[np.argsort(self._points[indices, axis], kind='stable')]
+        median = len(ordered) // 2
+
+        node = len(self._point)
+        self._point.append(int(ordered[median]))
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[node] = self._build(ordered[:median], depth + 1)
+        self._right[node] = self._build(ordered[median + 1:], depth + 1)
+        return node
+
+    # --- City names ---
+
+    def airports_for_city(self, city: str) -> List[str]:
+        """All airport codes listed for a city, primary first."""
+        return list(self._city_airports.get(city.strip().upper(), [])) if city else []
+
+    def code_for_city(self, city: str) -> Optional[str]:
+        """Primary airport code for a city name, or None if the city is unknown."""
+        airports = self.airports_for_city(city)
+        return airports[0] if airports else None
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Airport code for a city name or an airport code, or None if neither is known."""
+        if not name:
+            return None
+        code = name.strip().upper()
+        if code in self._index:
+            return code
+        return self.code_for_city(name)
+
+    def metro_airports(self, city: str, radius_km: float = METRO_RADIUS_KM) -> List[str]:
+        """The city's airports plus any other catalog airport within `radius_km` of its primary one."""
+        airports = self.airports_for_city(city)
+        if not airports or airports[0] not in self._index:
+            return airports
+        nearby = [code for code, _ in self._around(airports[0], radius_km=radius_km)]
+        return airports + [code for code in nearby if code not in airports]
+
+    def _around(self, code: str, radius_km: float = None, k: int = None) -> List[Tuple[str, float]]:
+        """Airports near a catalog airport: from the distance matrix if it covers it, else the KD-tree."""
+        if self._matrix is not None and self._matrix.index(code) >= 0:
+            return self._matrix.nearby(code, radius_km) if k is None else self._matrix.nearest(code, k)
+        lat, lon = self._coordinates(code)
+        return self.within_radius(lat, lon, radius_km) if k is None else self.nearest(lat, lon, k)
+
+    def _coordinates(self, code: str) -> Tuple[float, float]:
+        idx = self._index[code]
+        return self._lat[idx], self._lon[idx]
+
+    # --- Coordinates ---
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[str, float]]:
+        """The `k` airports closest to a point, as (code, distance_km) pairs, closest first."""
+        if k <= 0 or self._root < 0:
+            return []
+        target = unit_vector(lat, lon)
+        best: List[Tuple[float, int]] = []  # max-heap of (-squared chord, point)
+
+        # Entries are (node, squared distance to the splitting plane that led there)
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, plane_d2 = stack.pop()
+            # Skip subtrees whose splitting plane is already farther than the current k-th best
+            if node < 0 or (len(best) == k and plane_d2 >= -best[0][0]):
+                continue
+            point = self._point[node]
+            d2 = self._squared_chord(point, target)
+            if len(best) < k:
+                heapq.heappush(best, (-d2, point))
+            elif d2 < -best[0][0]:
+                heapq.heapreplace(best, (-d2, point))
+
+            axis = self._axis[node]
+            diff = target[axis] - self._xyz[point][axis]
+            near, far = (self._left[node], self._right[node]) if diff < 0 else (self._right[node], self._left[node])
+            stack.append((far, diff * diff))
+            stack.append((near, 0.0))
+
+        found = sorted((-neg_d2, point) for neg_d2, point in best)
+        return [(self.codes[point], 2 * EARTH_RADIUS_KM * math.asin(min(d2 ** 0.5 / 2, 1.0))) for d2, point in found]
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> List[Tuple[str, float]]:
+        """All airports within `radius_km` of a point, as (code, distance_km) pairs, closest first."""
+        target = unit_vector(lat, lon)
+        limit = km_to_chord(radius_km)
+        limit2 = limit * limit
+        found: List[Tuple[float, int]] = []
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            point = self._point[node]
+            d2 = self._squared_chord(point, target)
+            if d2 <= limit2:
+                found.append((d2, point))
+            axis = self._axis[node]
+            diff = target[axis] - self._xyz[point][axis]
+            if diff - limit <= 0:
+                stack.append(self._left[node])
+            if diff + limit >= 0:
+                stack.append(self._right[node])
+
+        found.sort()
+        return [(self.codes[point], 2 * EARTH_RADIUS_KM * math.asin(min(d2 ** 0.5 / 2, 1.0))) for d2, point in found]
+
+    def nearest_to_city(self, city: str, k: int = 1) -> List[Tuple[str, float]]:
+        """Nearest airports to a catalog city's primary airport (including itself)."""
+        airports = self.airports_for_city(city)
+        if not airports or airports[0] not in self._index:
+            return []
+        return self._around(airports[0], k=k)
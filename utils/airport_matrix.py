@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from utils.geo import haversine_km
+
+# Average commercial aircraft speed, as used by generate_flights.py
+CRUISE_SPEED_KMH = 850
+# Average extra time per stop (generate_flights.py draws 1-2 hours) and per flight (winds, taxiing)
+HOURS_PER_STOP = 1.5
+OVERHEAD_HOURS = 0.25
+
+
+def estimate_duration_minutes(distance_km, stops=0):
+    """Expected flight time in minutes for a distance and number of stops (scalars or arrays)."""
+    hours = np.asarray(distance_km) / CRUISE_SPEED_KMH + HOURS_PER_STOP * np.asarray(stops) + OVERHEAD_HOURS
+    return np.rint(hours * 60).astype(np.int32)
+
+
+class AirportMatrix:
+    """
+    All-pairs great circle distances and nonstop duration estimates between
+    catalog airports, computed once with a broadcast haversine so any route
+    can be looked up in O(1) by airport code.
+    """
+
+    def __init__(self, codes: Sequence[str], distances: np.ndarray):
+        self.codes = tuple(code.upper() for code in codes)
+        self.distances = distances
+        self.durations = estimate_duration_minutes(distances)
+        self._index = {code: idx for idx, code in enumerate(self.codes)}
+
+    @staticmethod
+    def _coordinates(airports: Mapping[str, Mapping[str, Any]]):
+        codes = [code.upper() for code in airports]
+        lat = np.array([float(details['latitude']) for details in airports.values()])
+        lon = np.array([float(details['longitude']) for details in airports.values()])
+        return codes, lat, lon
+
+    @classmethod
+    def from_airports(cls, airports: Mapping[str, Mapping[str, Any]]) -> "AirportMatrix":
+        codes, lat, lon = cls._coordinates(airports)
+        distances = haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+        return cls(codes, distances)
+
+    @staticmethod
+    def fingerprint(airports: Mapping[str, Mapping[str, Any]]) -> str:
+        """Hash of the airport codes and coordinates; a cached matrix is only reused if it matches."""
+        payload = [(code.upper(), float(d['latitude']), float(d['longitude'])) for code, d in airports.items()]
+        return hashlib.sha256(json.dumps(payload).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def load_or_build(cls, airports: Mapping[str, Mapping[str, Any]], cache_path: Optional[str]) -> "AirportMatrix":
+        """Load the matrix from `cache_path` if it was built from the same airports, else build and cache it."""
+        fingerprint = cls.fingerprint(airports)
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with np.load(cache_path) as cached:
+                    if str(cached['fingerprint']) == fingerprint:
+                        return cls([str(code) for code in cached['codes']], cached['distances'])
+            except (OSError, KeyError, ValueError) as e:
+                print(f"Ignoring unreadable airport matrix cache {cache_path}: {e}")
+
+        matrix = cls.from_airports(airports)
+        if cache_path:
+            try:
+                tmp_path = f"{cache_path}.tmp.npz"
+                np.savez(tmp_path, fingerprint=fingerprint, codes=np.array(matrix.codes), distances=matrix.distances)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"Could not cache airport matrix to {cache_path}: {e}")
+        return matrix
+
+    def index(self, code: str) -> int:
+        """Row/column of an airport code, or -1 if unknown."""
+        return self._index.get(code.upper(), -1) if code else -1
+
+    def distance_km(self, departure: str, arrival: str) -> Optional[float]:
+        i, j = self.index(departure), self.index(arrival)
+        if i < 0 or j < 0:
+            return None
+        return float(self.distances[i, j])
+
+    def duration_minutes(self, departure: str, arrival: str, stops: int = 0) -> Optional[int]:
+        """Estimated flight time between two airports, adding the average time per stop."""
+        i, j = self.index(departure), self.index(arrival)
+        if i < 0 or j < 0:
+            return None
+        return int(self.durations[i, j]) + int(round(HOURS_PER_STOP * 60 * stops))
+
+    def nearby(self, code: str, radius_km: float) -> List[Tuple[str, float]]:
+        """Airports within `radius_km` of an airport (itself included), as (code, distance_km) pairs, closest first."""
+        i = self.index(code)
+        if i < 0:
+            return []
+        row = self.distances[i]
+        found = np.flatnonzero(row <= radius_km)
+        found = found[np.argsort(row[found], kind='stable')]
+        return [(self.codes[j], float(row[j])) for j in found]
+
+    def nearest(self, code: str, k: int = 1) -> List[Tuple[str, float]]:
+        """The `k` airports closest to an airport (itself first), as (code, distance_km) pairs."""
+        i = self.index(code)
+        if i < 0 or k <= 0:
+            return []
+        row = self.distances[i]
+        found = np.argsort(row, kind='stable')[:k]
+        return [(self.codes[j], float(row[j])) for j in found]
@@ -0,0 +1,345 @@
+"""
+Compiled binary catalog format.
+
+A catalog file is a small JSON directory followed by fixed-width NumPy
+record sections and a string table:
+
+    b"ITCATLG1" | uint32 directory length | directory JSON | sections...
+
+The directory lists every section with its byte offset, record dtype and
+record count. Sections start on 8-byte boundaries so they can be viewed
+in place with `np.frombuffer` over a read-only `mmap`; strings are stored
+once in the string table and referenced by uint32 id (NO_STRING for None).
+"""
+
+import itertools
+import json
+import mmap
+import struct
+from collections import abc
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from utils.flight_table import FlightTable
+from utils.hotel_table import HotelTable
+
+MAGIC = b"ITCATLG1"
+FORMAT_VERSION = 1
+NO_STRING = 0xFFFFFFFF
+# Records compiled per chunk by write_catalog
+COMPILE_CHUNK_SIZE = 65_536
+
+FLIGHT_DTYPE = np.dtype([
+    ('price', '<f8'),
+    ('distance_km', '<f4'),
+    ('duration_minutes', '<i4'),
+    ('airline', '<i4'),
+    ('departure', '<i4'),
+    ('arrival', '<i4'),
+    ('duration', '<u4'),
+    ('departure_fullname', '<u4'),
+    ('arrival_fullname', '<u4'),
+    ('stops', 'i1'),
+    ('_pad', 'V7'),
+])
+
+HOTEL_DTYPE = np.dtype([
+    ('price_per_night', '<f8'),
+    ('rating', '<f8'),
+    ('location', '<i4'),
+    ('category', '<i4'),
+    ('name', '<u4'),
+    ('amenities_start', '<u4'),
+    ('amenities_count', '<u2'),
+    ('_pad', 'V6'),
+])
+
+AIRPORT_DTYPE = np.dtype([
+    ('latitude', '<f8'),
+    ('longitude', '<f8'),
+    ('code', '<u4'),
+    ('name', '<u4'),
+    ('country', '<u4'),
+    ('city', '<u4'),
+])
+
+
+class StringTableBuilder:
+    """Interns strings and assigns each distinct one a uint32 id."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        return self._ids.setdefault(value, len(self._ids))
+
+    def encode(self) -> Tuple[np.ndarray, bytes]:
+        blobs = [value.encode('utf-8') for value in self._ids]
+        offsets = np.zeros(len(blobs) + 1, dtype='<u8')
+        np.cumsum([len(b) for b in blobs], out=offsets[1:])
+        return offsets, b"".join(blobs)
+
+
+class StringTable:
+    """Read side of the string table, decoding lazily from the mapped file."""
+
+    def __init__(self, offsets: np.ndarray, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def get(self, string_id: int) -> Optional[str]:
+        if string_id == NO_STRING:
+            return None
+        start, end = int(self._offsets[string_id]), int(self._offsets[string_id + 1])
+        return str(self._blob[start:end], 'utf-8')
+
+
+def _chunks(records: Iterable[Mapping[str, Any]], size: int) -> Iterator[List[Mapping[str, Any]]]:
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _flight_chunks(
+    flights: Iterable[Mapping[str, Any]],
+    strings: StringTableBuilder,
+    airline_ids: Dict[str, int],
+    airport_ids: Dict[str, int]
+) -> Iterator[np.ndarray]:
+    for chunk in _chunks(flights, COMPILE_CHUNK_SIZE):
+        table = FlightTable.from_records(chunk, airline_ids, airport_ids)
+        rows = np.zeros(len(chunk), dtype=FLIGHT_DTYPE)
+        for column in ('price', 'distance_km', 'duration_minutes', 'airline', 'departure', 'arrival', 'stops'):
+            rows[column] = getattr(table, column)
+        rows['duration'] = [strings.add(f['duration']) for f in chunk]
+        rows['departure_fullname'] = [strings.add(f.get('departure_fullname')) for f in chunk]
+        rows['arrival_fullname'] = [strings.add(f.get('arrival_fullname')) for f in chunk]
+        yield rows
+
+
+def _hotel_chunks(
+    hotels: Iterable[Mapping[str, Any]],
+    strings: StringTableBuilder,
+    location_ids: Dict[str, int],
+    category_ids: Dict[str, int],
+    amenity_chunks: List[np.ndarray]
+) -> Iterator[np.ndarray]:
+    amenities_start = 0
+    for chunk in _chunks(hotels, COMPILE_CHUNK_SIZE):
+        table = HotelTable.from_records(chunk, location_ids, category_ids)
+        rows = np.zeros(len(chunk), dtype=HOTEL_DTYPE)
+        rows['price_per_night'] = table.price
+        rows['rating'] = table.rating
+        rows['location'] = table.location
+        rows['category'] = table.category
+        rows['name'] = [strings.add(h['name']) for h in chunk]
+        rows['amenities_count'] = [len(h['amenities']) for h in chunk]
+        counts = rows['amenities_count'].astype(np.int64)
+        rows['amenities_start'] = amenities_start + np.cumsum(counts) - counts
+        amenities_start += int(counts.sum())
+        amenity_chunks.append(np.array([strings.add(a) for h in chunk for a in h['amenities']], dtype='<u4'))
+        yield rows
+
+
+def write_catalog(
+    path: str,
+    flights: Iterable[Mapping[str, Any]],
+    hotels: Iterable[Mapping[str, Any]],
+    airports: Mapping[str, Mapping[str, Any]]
+) -> Tuple[int, int]:
+    """
+    Compile catalog records into a binary catalog file at `path`, returning the
+    flight and hotel counts. `flights` and `hotels` may be any iterables (e.g.
+    generators over NDJSON shards): records are consumed COMPILE_CHUNK_SIZE at a
+    time into fixed-width chunks, so only the compact rows stay in memory.
+    """
+    strings = StringTableBuilder()
+    airline_ids: Dict[str, int] = {}
+    airport_ids: Dict[str, int] = {}
+    location_ids: Dict[str, int] = {}
+    category_ids: Dict[str, int] = {}
+    amenity_chunks: List[np.ndarray] = []
+
+    flight_chunks = list(_flight_chunks(flights, strings, airline_ids, airport_ids))
+    hotel_chunks = list(_hotel_chunks(hotels, strings, location_ids, category_ids, amenity_chunks))
+
+    airport_rows = np.zeros(len(airports), dtype=AIRPORT_DTYPE)
+    for row, (code, details) in enumerate(airports.items()):
+        airport_rows[row] = (
+            float(details.get('latitude', 'nan')), float(details.get('longitude', 'nan')),
+            strings.add(code.upper()), strings.add(details.get('name')),
+            strings.add(details.get('country')), strings.add(details.get('city'))
+        )
+
+    def vocabulary(values: Iterable[str]) -> List[np.ndarray]:
+        return [np.array([strings.add(v) for v in values], dtype='<u4')]
+
+    # Every section is a list of chunks sharing one dtype, written back to back
+    sections: Dict[str, List[np.ndarray]] = {
+        'flights': flight_chunks or [np.zeros(0, dtype=FLIGHT_DTYPE)],
+        'airlines': vocabulary(airline_ids),
+        'flight_airports': vocabulary(airport_ids),
+        'hotels': hotel_chunks or [np.zeros(0, dtype=HOTEL_DTYPE)],
+        'hotel_amenities': amenity_chunks or [np.zeros(0, dtype='<u4')],
+        'hotel_locations': vocabulary(location_ids),
+        'hotel_categories': vocabulary(category_ids),
+        'airports': [airport_rows],
+    }
+    string_offsets, string_blob = strings.encode()
+    sections['string_offsets'] = [string_offsets]
+    sections['string_blob'] = [np.frombuffer(string_blob, dtype='u1')]
+
+    # Lay the sections out after the directory, each on an 8-byte boundary
+    def directory_for(base: int) -> Tuple[Dict[str, Any], int]:
+        entries, offset = {}, base
+        for name, chunks in sections.items():
+            offset = (offset + 7) & ~7
+            dtype = chunks[0].dtype
+            entries[name] = {
+                'offset': offset,
+                'count': sum(len(chunk) for chunk in chunks),
+                'dtype': dtype.descr if dtype.names else dtype.str
+            }
+            offset += sum(chunk.nbytes for chunk in chunks)
+        return {'version': FORMAT_VERSION, 'sections': entries}, offset
+
+    # The directory's own length moves the sections, so settle it before writing
+    base = 0
+    while True:
+        directory, _ = directory_for(base)
+        encoded = json.dumps(directory).encode('utf-8')
+        header_end = len(MAGIC) + 4 + len(encoded)
+        if header_end <= base:
+            break
+        base = header_end
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(encoded)))
+        f.write(encoded)
+        for name, chunks in sections.items():
+            f.write(b"\0" * (directory['sections'][name]['offset'] - f.tell()))
+            for chunk in chunks:
+                f.write(chunk.tobytes())
+    return directory['sections']['flights']['count'], directory['sections']['hotels']['count']
+
+
+def _descr(descr: Any) -> Any:
+    """Rebuild a dtype description read back from JSON (lists become tuples)."""
+    if isinstance(descr, str):
+        return descr
+    return [tuple(field) for field in descr]
+
+
+class BinaryCatalog:
+    """A compiled catalog file, memory-mapped read-only and viewed in place as NumPy arrays."""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"Not a compiled catalog file: {path}")
+        (directory_length,) = struct.unpack_from('<I', buffer, len(MAGIC))
+        start = len(MAGIC) + 4
+        directory = json.loads(bytes(buffer[start:start + directory_length]))
+        if directory.get('version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog format version {directory.get('version')} in {path}")
+
+        self.sections: Dict[str, np.ndarray] = {
+            name: np.frombuffer(buffer, dtype=np.dtype(_descr(entry['dtype'])), count=entry['count'], offset=entry['offset'])
+            for name, entry in directory['sections'].items()
+        }
+        blob = self.sections['string_blob']
+        self.strings = StringTable(self.sections['string_offsets'], memoryview(blob))
+
+    def _vocabulary(self, name: str) -> List[str]:
+        return [self.strings.get(int(string_id)) for string_id in self.sections[name]]
+
+    def flight_table(self) -> FlightTable:
+        rows = self.sections['flights']
+        return FlightTable(
+            price=rows['price'],
+            stops=rows['stops'],
+            duration_minutes=rows['duration_minutes'],
+            distance_km=rows['distance_km'],
+            airline=rows['airline'],
+            departure=rows['departure'],
+            arrival=rows['arrival'],
+            airlines=self._vocabulary('airlines'),
+            airports=self._vocabulary('flight_airports')
+        )
+
+    def hotel_table(self) -> HotelTable:
+        rows = self.sections['hotels']
+        return HotelTable(
+            price=rows['price_per_night'],
+            rating=rows['rating'],
+            location=rows['location'],
+            category=rows['category'],
+            locations=self._vocabulary('hotel_locations'),
+            categories=self._vocabulary('hotel_categories')
+        )
+
+    def airports(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            self.strings.get(int(row['code'])): {
+                'name': self.strings.get(int(row['name'])),
+                'country': self.strings.get(int(row['country'])),
+                'city': self.strings.get(int(row['city'])),
+                'latitude': float(row['latitude']),
+                'longitude': float(row['longitude']),
+            }
+            for row in self.sections['airports']
+        }
+
+
+class BinaryRecords(abc.Sequence):
+    """Read-only sequence of catalog records decoded on access from a BinaryCatalog."""
+
+    def __init__(self, catalog: BinaryCatalog, table: Any, kind: str):
+        self._catalog = catalog
+        self._table = table
+        self._kind = kind
+        self._rows = catalog.sections[kind]
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        row = self._rows[idx]
+        strings = self._catalog.strings
+        if self._kind == 'flights':
+            table = self._table
+            return {
+                'airline': table.airlines[row['airline']],
+                'price': float(row['price']),
+                'duration': strings.get(int(row['duration'])),
+                'stops': int(row['stops']),
+                'departure': table.airports[row['departure']],
+                'arrival': table.airports[row['arrival']],
+                'departure_fullname': strings.get(int(row['departure_fullname'])),
+                'arrival_fullname': strings.get(int(row['arrival_fullname'])),
+                'distance_km': None if np.isnan(row['distance_km']) else round(float(row['distance_km']), 2),
+            }
+        start, count = int(row['amenities_start']), int(row['amenities_count'])
+        amenity_ids = self._catalog.sections['hotel_amenities'][start:start + count]
+        return {
+            'name': strings.get(int(row['name'])),
+            'price_per_night': float(row['price_per_night']),
+            'rating': float(row['rating']),
+            'location': self._table.locations[row['location']],
+            'amenities': tuple(strings.get(int(a)) for a in amenity_ids),
+            'category': self._table.category_name(int(row['category'])),
+        }
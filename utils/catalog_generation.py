@@ -0,0 +1,133 @@
+"""
+Shared plumbing for the catalog generator scripts (generate_flights.py,
+generate_hotels.py): deterministic sharding over a process pool, skewed
+popularity weights and streaming NDJSON / JSON writers.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List
+
+import numpy as np
+
+# Rows per vectorized batch inside a shard; bounds worker memory for very large shards
+BATCH_SIZE = 100_000
+# Without --shards: one shard per BATCH_SIZE rows, up to this many
+MAX_DEFAULT_SHARDS = 64
+
+
+def add_generator_arguments(parser: argparse.ArgumentParser, default_output: str) -> None:
+    parser.add_argument("--count", type=int, default=500, help="Number of rows to generate")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible output (random if omitted)")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json",
+                        help="json: one file the app loads directly; ndjson: one streamed file per shard")
+    parser.add_argument("--output", default=default_output,
+                        help="Output file (json) or directory for the shard files (ndjson)")
+    parser.add_argument("--shards", type=int, default=None, help=f"Number of shards (default: one per {BATCH_SIZE:,} rows, at most {MAX_DEFAULT_SHARDS})")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes")
+    parser.add_argument("--zipf", type=float, default=0.0,
+                        help="Zipf exponent for destination popularity (0 = uniform)")
+
+
+def resolve_seed(args: argparse.Namespace) -> int:
+    """Pick a random seed when none was given, so the run can still be reproduced from the log."""
+    if args.seed is None:
+        args.seed = int(np.random.SeedSequence().entropy % 2**32)
+    return args.seed
+
+
+def default_shards(count: int) -> int:
+    """Shard count when --shards is omitted; depends on the row count only, never on --workers."""
+    return max(1, min(MAX_DEFAULT_SHARDS, -(-count // BATCH_SIZE)))
+
+
+def shard_sizes(count: int, shards: int) -> List[int]:
+    base, extra = divmod(count, shards)
+    return [base + (1 if shard < extra else 0) for shard in range(shards)]
+
+
+def zipf_weights(n: int, exponent: float, rng: np.random.Generator) -> np.ndarray:
+    """Popularity weights ~ 1 / rank^exponent over n items, with ranks assigned by a seeded shuffle."""
+    if n == 0:
+        return np.zeros(0)
+    ranks = rng.permutation(n) + 1
+    weights = 1.0 / ranks.astype(np.float64) ** exponent
+    return weights / weights.sum()
+
+
+def write_ndjson(path: str, rows: Iterable[Dict[str, Any]]) -> int:
+    written = 0
+    with open(path, 'w') as f:
+        for row in rows:
+            f.write(json.dumps(row))
+            f.write("\n")
+            written += 1
+    return written
+
+
+def _run_shard(task):
+    generate_rows, path, size, seed, shard, options = task
+    rng = np.random.default_rng([seed, shard])
+
+    def batches():
+        remaining = size
+        while remaining:
+            batch = min(remaining, BATCH_SIZE)
+            yield from generate_rows(rng, batch, options)
+            remaining -= batch
+
+    return write_ndjson(path, batches())
+
+
+def generate_sharded(
+    generate_rows: Callable[[np.random.Generator, int, Dict[str, Any]], Iterable[Dict[str, Any]]],
+    args: argparse.Namespace,
+    key: str,
+    options: Dict[str, Any]
+) -> None:
+    """
+    Run `generate_rows(rng, n, options)` over deterministic shards and write the result.
+
+    Each shard draws from its own generator seeded with (seed, shard index), so the
+    output depends only on --seed, --count and --shards, never on --workers.
+    `generate_rows` must be a module-level function so worker processes can import it.
+    """
+    seed = resolve_seed(args)
+    shards = args.shards or default_shards(args.count)
+    sizes = shard_sizes(args.count, shards)
+
+    if args.format == "ndjson":
+        os.makedirs(args.output, exist_ok=True)
+        shard_dir = args.output
+    else:
+        shard_dir = tempfile.mkdtemp(prefix=f"{key}-shards-")
+    paths = [os.path.join(shard_dir, f"{key}-{shard:05d}.ndjson") for shard in range(shards)]
+    tasks = [(generate_rows, path, size, seed, shard, options) for shard, (path, size) in enumerate(zip(paths, sizes))]
+
+    try:
+        if args.workers > 1:
+            with ProcessPoolExecutor(max_workers=args.workers) as pool:
+                written = sum(pool.map(_run_shard, tasks))
+        else:
+            written = sum(map(_run_shard, tasks))
+
+        if args.format == "json":
+            # Stream the shards into the {"<key>": [...]} document the app loads
+            with open(args.output, 'w') as out:
+                out.write(f'{{"{key}": [')
+                first = True
+                for path in paths:
+                    with open(path, 'r') as shard_file:
+                        for line in shard_file:
+                            out.write(("" if first else ",\n") + line.rstrip("\n"))
+                            first = False
+                out.write("]}\n")
+    finally:
+        if args.format == "json":
+            shutil.rmtree(shard_dir, ignore_errors=True)
+
+    print(f"Wrote {written} {key} (seed {seed}, {shards} shard(s)) to {args.output}")
@@ -0,0 +1,254 @@
+import json
+import os
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.schemas import FlightOption, HotelOption
+from utils.airport_locator import AirportLocator
+from utils.airport_matrix import AirportMatrix
+from utils.catalog_format import BinaryCatalog, BinaryRecords
+from utils.destinations import DestinationNormalizer
+from utils.flight_index import FlightIndex
+from utils.flight_table import FlightTable
+from utils.hotel_index import HotelIndex
+from utils.hotel_table import HotelTable
+
+MOCK_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'mock_data')
+COMPILED_CATALOG_FILE = 'catalog.bin'
+AIRPORT_MATRIX_FILE = 'airport_matrix.npz'
+CATALOG_SOURCE_FILES = ('flights.json', 'hotels.json', 'airport_details_map.json')
+# Cheapest flights scored first by best_flight to bound how far into a route's posting it looks
+BEST_FLIGHT_PROBE = 16
+
+
+def _freeze(record: Dict[str, Any]) -> Mapping[str, Any]:
+    """Return a read-only view of a catalog record (lists become tuples)."""
+    return MappingProxyType({
+        key: tuple(value) if isinstance(value, list) else value
+        for key, value in record.items()
+    })
+
+
+class CatalogStore:
+    """
+    Immutable in-memory copy of the flight, hotel and airport catalogs.
+
+    Records are kept as read-only mappings and only turned into Pydantic
+    models for the rows a query actually returns, so callers always get
+    fresh objects they are free to mutate. When a compiled catalog is
+    available the records and columns are views over a shared mmap instead.
+    """
+
+    def __init__(
+        self,
+        flights: Sequence[Mapping[str, Any]],
+        hotels: Sequence[Mapping[str, Any]],
+        airports: Mapping[str, Mapping[str, Any]],
+        flight_table: FlightTable,
+        hotel_table: HotelTable,
+        airport_matrix_cache: Optional[str] = None
+    ):
+        self._flights = flights
+        self._hotels = hotels
+        self._airports: Mapping[str, Mapping[str, Any]] = MappingProxyType({
+            code.upper(): _freeze(details) for code, details in airports.items()
+        })
+        self.airport_matrix = AirportMatrix.load_or_build(self._airports, airport_matrix_cache)
+        self.airport_locator = AirportLocator(self._airports, self.airport_matrix)
+        self.flight_table = self._fill_missing_distances(flight_table)
+        self.flight_index = FlightIndex(flight_table)
+        self.hotel_table = hotel_table
+        self.hotel_index = HotelIndex(hotel_table)
+        self.destinations = DestinationNormalizer(self._airports, hotel_table.locations)
+
+    def _fill_missing_distances(self, table: FlightTable) -> FlightTable:
+        """Take distance_km from the airport matrix for flights that lack it."""
+        missing = np.isnan(table.distance_km)
+        if not missing.any():
+            return table
+        matrix_ids = np.array([self.airport_matrix.index(code) for code in table.airports] + [-1], dtype=np.int64)
+        departure, arrival = matrix_ids[table.departure], matrix_ids[table.arrival]
+        known = missing & (departure >= 0) & (arrival >= 0)
+        distance_km = np.array(table.distance_km, copy=True)
+        distance_km[known] = self.airport_matrix.distances[departure[known], arrival[known]]
+        table.distance_km = distance_km
+        return table
+
+    @classmethod
+    def from_records(
+        cls,
+        flights: List[Dict[str, Any]],
+        hotels: List[Dict[str, Any]],
+        airports: Dict[str, Dict[str, Any]],
+        airport_matrix_cache: Optional[str] = None
+    ) -> "CatalogStore":
+        flight_records = tuple(_freeze(f) for f in flights)
+        hotel_records = tuple(_freeze(h) for h in hotels)
+        return cls(
+            flights=flight_records,
+            hotels=hotel_records,
+            airports=airports,
+            flight_table=FlightTable.from_records(flight_records),
+            hotel_table=HotelTable.from_records(hotel_records),
+            airport_matrix_cache=airport_matrix_cache
+        )
+
+    @classmethod
+    def from_binary(cls, path: str, airport_matrix_cache: Optional[str] = None) -> "CatalogStore":
+        """Map a catalog compiled by compile_catalog.py."""
+        catalog = BinaryCatalog(path)
+        flight_table = catalog.flight_table()
+        hotel_table = catalog.hotel_table()
+        return cls(
+            flights=BinaryRecords(catalog, flight_table, 'flights'),
+            hotels=BinaryRecords(catalog, hotel_table, 'hotels'),
+            airports=catalog.airports(),
+            flight_table=flight_table,
+            hotel_table=hotel_table,
+            airport_matrix_cache=airport_matrix_cache
+        )
+
+    @staticmethod
+    def _load_json_file(data_dir: str, filename: str) -> Optional[Dict[str, Any]]:
+        file_path = os.path.join(data_dir, filename)
+        if not os.path.exists(file_path):
+            print(f"Catalog file not found, continuing without it: {file_path}")
+            return None
+        with open(file_path, 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _compiled_catalog_path(data_dir: str) -> Optional[str]:
+        """Path of the compiled catalog in `data_dir`, unless it is missing or older than the JSON sources."""
+        compiled = os.path.join(data_dir, COMPILED_CATALOG_FILE)
+        if not os.path.exists(compiled):
+            return None
+        compiled_mtime = os.path.getmtime(compiled)
+        for filename in CATALOG_SOURCE_FILES:
+            source = os.path.join(data_dir, filename)
+            if os.path.exists(source) and os.path.getmtime(source) > compiled_mtime:
+                print(f"{compiled} is older than {source}, loading JSON instead. Run compile_catalog.py to rebuild it.")
+                return None
+        return compiled
+
+    @classmethod
+    def from_directory(cls, data_dir: str = MOCK_DATA_DIR) -> "CatalogStore":
+        """Load the catalogs from `data_dir`, preferring an up-to-date compiled catalog over the JSON files."""
+        matrix_cache = os.path.join(data_dir, AIRPORT_MATRIX_FILE)
+        compiled = cls._compiled_catalog_path(data_dir)
+        if compiled:
+            return cls.from_binary(compiled, airport_matrix_cache=matrix_cache)
+        flights = cls._load_json_file(data_dir, 'flights.json') or {}
+        hotels = cls._load_json_file(data_dir, 'hotels.json') or {}
+        airports = cls._load_json_file(data_dir, 'airport_details_map.json') or {}
+        return cls.from_records(
+            flights=flights.get('flights', []),
+            hotels=hotels.get('hotels', []),
+            airports=airports,
+            airport_matrix_cache=matrix_cache
+        )
+
+    # --- Flights ---
+    @property
+    def flight_count(self) -> int:
+        return len(self._flights)
+
+    def flight_record(self, idx: int) -> Mapping[str, Any]:
+        return self._flights[idx]
+
+    def flight(self, idx: int) -> FlightOption:
+        return FlightOption(**self._flights[idx])
+
+    def iter_flight_records(self) -> Iterator[Mapping[str, Any]]:
+        return iter(self._flights)
+
+    def find_flights(
+        self,
+        departure: Optional[str] = None,
+        arrival: Optional[str] = None,
+        max_price: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[FlightOption]:
+        """Cheapest catalog flights matching the given airport codes and price cap."""
+        rows = self.flight_index.lookup(departure, arrival, max_price=max_price, limit=limit)
+        return [FlightOption(**self._flights[row]) for row in rows]
+
+    def best_flight(
+        self,
+        departure: Optional[str] = None,
+        arrival: Optional[str] = None,
+        max_price: Optional[float] = None,
+        stop_penalty: float = 0.1
+    ) -> Optional[FlightOption]:
+        """Best catalog flight on the route within `max_price`, penalising each stop by `stop_penalty`."""
+        prices, rows = self.flight_index.posting(departure, arrival, max_price=max_price)
+        if not len(rows):
+            return None
+        table = self.flight_table
+        if stop_penalty >= 0:
+            # A score is then never below its price, so once the cheapest few have a best score,
+            # no flight priced above it can win: only that prefix of the posting is scored
+            probe = table.best_flight(rows[:BEST_FLIGHT_PROBE], float('inf'), stop_penalty)
+            bound = table.price[probe] * (1 + stop_penalty * table.stops[probe])
+            rows = rows[:int(np.searchsorted(prices, bound, side='right'))]
+        row = table.best_flight(rows, float('inf'), stop_penalty)
+        return self.flight(row) if row >= 0 else None
+
+    # --- Hotels ---
+    @property
+    def hotel_count(self) -> int:
+        return len(self._hotels)
+
+    def hotel_record(self, idx: int) -> Mapping[str, Any]:
+        return self._hotels[idx]
+
+    def hotel(self, idx: int) -> HotelOption:
+        return HotelOption(**self._hotels[idx])
+
+    def hotel_category(self, idx: int) -> Optional[str]:
+        return self.hotel_table.category_name(int(self.hotel_table.category[idx]))
+
+    def iter_hotel_records(self) -> Iterator[Mapping[str, Any]]:
+        return iter(self._hotels)
+
+    # --- Airports ---
+    @property
+    def airport_codes(self) -> Tuple[str, ...]:
+        return tuple(self._airports.keys())
+
+    def airport_details(self, airport_code: str) -> Optional[Mapping[str, Any]]:
+        return self._airports.get(airport_code.upper())
+
+    def airport_fullname(self, airport_code: str) -> Optional[str]:
+        return (self.airport_details(airport_code) or {}).get('name')
+
+    def airport_country(self, airport_code: str) -> Optional[str]:
+        return (self.airport_details(airport_code) or {}).get('country')
+
+
+_catalog_store: Optional[CatalogStore] = None
+_catalog_lock = threading.Lock()
+
+
+def load_catalog_store(data_dir: str = MOCK_DATA_DIR) -> CatalogStore:
+    """Load the catalogs and publish them as the process-wide store. Called from the app lifespan."""
+    global _catalog_store
+    store = CatalogStore.from_directory(data_dir)
+    with _catalog_lock:
+        _catalog_store = store
+    return store
+
+
+def get_catalog_store() -> CatalogStore:
+    """Return the shared store, loading it on first use outside of the app lifespan (scripts, agents)."""
+    global _catalog_store
+    store = _catalog_store
+    if store is None:
+        with _catalog_lock:
+            if _catalog_store is None:
+                _catalog_store = CatalogStore.from_directory()
+            store = _catalog_store
+    return store
@@ -0,0 +1,240 @@
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+# Minimum trigram (Jaccard) similarity for a fuzzy match
+MIN_SIMILARITY = 0.5
+# Each word of a fuzzy match must be at least this close in length to the name's word,
+# so a typo ("Pariss") matches but a longer place ("Londonderry") does not
+MIN_LENGTH_RATIO = 0.8
+_MAX_CACHED_QUERIES = 4096
+
+# Words that do not identify an airport's place ("Boston Logan International Airport" -> "boston logan")
+_AIRPORT_NAME_STOPWORDS = {"international", "airport"}
+
+# Common abbreviations that share no trigrams with the city they stand for
+ABBREVIATIONS = {
+    "nyc": "new york",
+    "la": "los angeles",
+    "sf": "san francisco",
+}
+
+# Words that qualify a place without changing it ("New York City", "Downtown Miami")
+_GENERIC_WORDS = {"city", "downtown", "metro", "area", "center", "centre", "greater"}
+
+# Other names for the catalog's countries
+COUNTRY_ALIASES = {
+    "usa": ("us", "united states", "united states of america", "america"),
+    "uk": ("united kingdom", "great britain", "britain", "england"),
+}
+
+# "Rome, Georgia" or "Paris, TX": a US state after the comma places the city in the USA
+US_STATES = {
+    "al": "alabama", "ak": "alaska", "az": "arizona", "ar": "arkansas", "ca": "california",
+    "co": "colorado", "ct": "connecticut", "de": "delaware", "dc": "district of columbia",
+    "fl": "florida", "ga": "georgia", "hi": "hawaii", "id": "idaho", "il": "illinois",
+    "in": "indiana", "ia": "iowa", "ks": "kansas", "ky": "kentucky", "la": "louisiana",
+    "me": "maine", "md": "maryland", "ma": "massachusetts", "mi": "michigan", "mn": "minnesota",
+    "ms": "mississippi", "mo": "missouri", "mt": "montana", "ne": "nebraska", "nv": "nevada",
+    "nh": "new hampshire", "nj": "new jersey", "nm": "new mexico", "ny": "new york",
+    "nc": "north carolina", "nd": "north dakota", "oh": "ohio", "ok": "oklahoma", "or": "oregon",
+    "pa": "pennsylvania", "ri": "rhode island", "sc": "south carolina", "sd": "south dakota",
+    "tn": "tennessee", "tx": "texas", "ut": "utah", "vt": "vermont", "va": "virginia",
+    "wa": "washington", "wv": "west virginia", "wi": "wisconsin", "wy": "wyoming",
+}
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+_AIRPORT_CODE_RE = re.compile(r"[A-Z]{3}")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and apostrophes, and collapse everything else to single spaces."""
+    text = unicodedata.normalize('NFKD', text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = text.lower().replace("'", "").replace("’", "")
+    return _NON_ALNUM_RE.sub(" ", text).strip()
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of normalized text, padded so word starts and ends count."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def slugify(text: str) -> str:
+    return normalize_text(text).replace(" ", "-")
+
+
+def _words_line_up(words: Sequence[str], name_words: Sequence[str]) -> bool:
+    """Same number of words, each within MIN_LENGTH_RATIO of the other's length."""
+    return len(words) == len(name_words) and all(
+        min(len(a), len(b)) >= MIN_LENGTH_RATIO * max(len(a), len(b)) for a, b in zip(words, name_words)
+    )
+
+
+class Destination(NamedTuple):
+    id: str
+    name: str
+    airports: Tuple[str, ...]
+    hotel_locations: Tuple[str, ...]
+
+
+class DestinationNormalizer:
+    """
+    Maps free-text destinations ("NYC", "New York City", "new york") to a canonical
+    Destination. Names come from the airport cities and names and the hotel
+    catalog's locations; lookups are an exact match on normalized text first, then
+    the best match from a trigram index over all known names whose words line up
+    with the query's. Airport codes only match as written ("SEA", not "Sea").
+    """
+
+    def __init__(self, airports: Mapping[str, Mapping[str, Any]], hotel_locations: Sequence[str]):
+        self._names: List[str] = []
+        self._name_destination: List[str] = []
+        self._name_trigram_counts: List[int] = []
+        self._exact: Dict[str, str] = {}
+        self._codes: Dict[str, str] = {}
+        self._countries: Dict[str, Set[str]] = {}
+        self._regions: Dict[str, str] = {}
+        self._trigram_postings: Dict[str, List[int]] = {}
+        self._cache: Dict[str, Optional[str]] = {}
+
+        airports_by_id: Dict[str, List[str]] = {}
+        display: Dict[str, str] = {}
+
+        # 1. One destination per airport city, reachable by city, code and airport name
+        for code, details in airports.items():
+            city = details.get('city') or code
+            destination_id = slugify(city)
+            display.setdefault(destination_id, city)
+            airports_by_id.setdefault(destination_id, []).append(code.upper())
+            self._codes.setdefault(code.upper(), destination_id)
+            airport_name = " ".join(word for word in normalize_text(details.get('name') or '').split()
+                                    if word not in _AIRPORT_NAME_STOPWORDS)
+            for alias in (city, airport_name):
+                self._add_name(alias, destination_id)
+            country = normalize_text(details.get('country') or '')
+            if country:
+                self._countries.setdefault(destination_id, set()).add(country)
+                self._regions[country] = country
+                for alias in COUNTRY_ALIASES.get(country, ()):
+                    self._regions.setdefault(alias, country)
+        if "usa" in self._regions.values():
+            for abbreviation, state in US_STATES.items():
+                self._regions.setdefault(abbreviation, "usa")
+                self._regions.setdefault(state, "usa")
+        for abbreviation, city in ABBREVIATIONS.items():
+            destination_id = self._exact.get(normalize_text(city))
+            if destination_id:
+                self._add_name(abbreviation, destination_id)
+
+        # 2. Hotel locations join the destination they match, or become destinations of their own
+        locations_by_id: Dict[str, List[str]] = {}
+        for location in hotel_locations:
+            destination_id = self._match(normalize_text(location))
+            if destination_id is None:
+                destination_id = slugify(location)
+                display.setdefault(destination_id, location)
+                self._add_name(location, destination_id)
+            locations_by_id.setdefault(destination_id, []).append(location)
+
+        self.destinations: Dict[str, Destination] = {
+            destination_id: Destination(
+                id=destination_id,
+                name=name,
+                airports=tuple(airports_by_id.get(destination_id, ())),
+                hotel_locations=tuple(locations_by_id.get(destination_id, ()))
+            )
+            for destination_id, name in display.items()
+        }
+
+    def _add_name(self, name: str, destination_id: str) -> None:
+        key = normalize_text(name)
+        if not key or key in self._exact:
+            return
+        self._exact[key] = destination_id
+        name_id = len(self._names)
+        self._names.append(key)
+        self._name_destination.append(destination_id)
+        grams = trigrams(key)
+        self._name_trigram_counts.append(len(grams))
+        for gram in grams:
+            self._trigram_postings.setdefault(gram, []).append(name_id)
+
+    def _match(self, key: str) -> Optional[str]:
+        """
+        Destination id for normalized text: the exact name, with or without generic words
+        like "city", else the best trigram match above MIN_SIMILARITY that has the same
+        number of words, each of about the same length.
+        """
+        if not key:
+            return None
+        exact = self._exact.get(key)
+        if exact is not None:
+            return exact
+        words = [word for word in key.split() if word not in _GENERIC_WORDS]
+        key = " ".join(words)
+        if not key:
+            return None
+        exact = self._exact.get(key)
+        if exact is not None:
+            return exact
+
+        grams = trigrams(key)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigram_postings.get(gram, ()))
+        best_id, best_score = None, MIN_SIMILARITY
+        for name_id, count in shared.items():
+            score = count / (len(grams) + self._name_trigram_counts[name_id] - count)
+            if score >= best_score and _words_line_up(words, self._names[name_id].split()):
+                best_id, best_score = name_id, score
+        return self._name_destination[best_id] if best_id is not None else None
+
+    def _resolve(self, text: str) -> Optional[str]:
+        """Destination id for one place name; airport codes count only when written as codes."""
+        text = text.strip()
+        if _AIRPORT_CODE_RE.fullmatch(text) and text in self._codes:
+            return self._codes[text]
+        return self._match(normalize_text(text))
+
+    def _contradicts(self, destination_id: str, qualifier: str) -> bool:
+        """Whether the text after a comma places the destination somewhere else."""
+        key = normalize_text(qualifier)
+        if not key:
+            return False
+        country = self._regions.get(key)
+        if country is not None:
+            countries = self._countries.get(destination_id)
+            return bool(countries) and country not in countries
+        other = self._resolve(qualifier)
+        return other is not None and other != destination_id
+
+    def normalize(self, text: str) -> Optional[Destination]:
+        """Canonical destination for free text, or None if nothing matches closely enough."""
+        if not text:
+            return None
+        key = text.strip()
+        if key in self._cache:
+            destination_id = self._cache[key]
+        else:
+            # "Paris, France": the first part names the place, as long as the rest agrees
+            place, *qualifiers = key.split(',')
+            destination_id = self._resolve(place)
+            if destination_id and any(self._contradicts(destination_id, part) for part in qualifiers):
+                destination_id = None
+            if len(self._cache) >= _MAX_CACHED_QUERIES:
+                self._cache.clear()
+            self._cache[key] = destination_id
+        return self.destinations.get(destination_id) if destination_id else None
+
+    def canonical_key(self, text: str) -> str:
+        """Canonical destination id for cache keys, falling back to the normalized text."""
+        destination = self.normalize(text)
+        return destination.id if destination else normalize_text(text or '')
+
+    def canonical_name(self, text: str) -> str:
+        """Display name for text; every spelling with the same canonical_key gets the same name."""
+        destination = self.normalize(text)
+        return destination.name if destination else normalize_text(text or '').title()
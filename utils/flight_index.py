@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.flight_table import FlightTable
+
+RouteKey = Tuple[Optional[str], Optional[str]]
+
+
+class FlightIndex:
+    """
+    Route index over the flight catalog.
+
+    Every flight is posted under its (departure, arrival) pair plus the
+    origin-only (departure, None) and destination-only (None, arrival) keys.
+    Each posting list holds row ids sorted by price next to the matching
+    price column, so a budget cap is a bisect and the N cheapest flights
+    are a slice.
+    """
+
+    def __init__(self, table: FlightTable):
+        self._postings: Dict[RouteKey, Tuple[np.ndarray, np.ndarray]] = {}
+        n = len(table)
+        if not n:
+            return
+        airports = table.airports
+        # Rows ordered by price (then row id); every key grouping below is a stable sort of this order
+        by_price = np.lexsort((np.arange(n), table.price))
+        num_airports = len(airports)
+        groupings = [
+            (table.departure.astype(np.int64) * num_airports + table.arrival,
+             lambda key: (airports[key // num_airports], airports[key % num_airports])),
+            (table.departure, lambda key: (airports[key], None)),
+            (table.arrival, lambda key: (None, airports[key])),
+            (np.zeros(n, dtype=np.int64), lambda key: (None, None)),
+        ]
+        for keys, route_key in groupings:
+            order = by_price[np.argsort(keys[by_price], kind='stable')]
+            sorted_keys = keys[order]
+            bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+            for start, end in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [n]))):
+                rows = order[start:end]
+                self._postings[route_key(int(sorted_keys[start]))] = (table.price[rows], rows)
+
+    def routes(self) -> List[Tuple[str, str]]:
+        """All (departure, arrival) pairs present in the catalog."""
+        return [key for key in self._postings if key[0] and key[1]]
+
+    def count(self, departure: Optional[str] = None, arrival: Optional[str] = None, max_price: Optional[float] = None) -> int:
+        posting = self._postings.get(self._key(departure, arrival))
+        if posting is None:
+            return 0
+        prices, _ = posting
+        return len(prices) if max_price is None else int(np.searchsorted(prices, max_price, side='right'))
+
+    def lookup(
+        self,
+        departure: Optional[str] = None,
+        arrival: Optional[str] = None,
+        max_price: Optional[float] = None,
+        limit: Optional[int] = None
+    ) -> List[int]:
+        """Row ids of the cheapest flights on the route, optionally capped by price and count."""
+        _, rows = self.posting(departure, arrival, max_price=max_price)
+        return (rows if limit is None else rows[:limit]).tolist()
+
+    def posting(
+        self,
+        departure: Optional[str] = None,
+        arrival: Optional[str] = None,
+        max_price: Optional[float] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(prices, row ids) of the route's flights within `max_price`, cheapest first; views, not copies."""
+        posting = self._postings.get(self._key(departure, arrival))
+        if posting is None:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64)
+        prices, rows = posting
+        end = len(prices) if max_price is None else int(np.searchsorted(prices, max_price, side='right'))
+        return prices[:end], rows[:end]
+
+    @staticmethod
+    def _key(departure: Optional[str], arrival: Optional[str]) -> RouteKey:
+        return (departure.upper() if departure else None, arrival.upper() if arrival else None)
@@ -0,0 +1,124 @@
+import re
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+_DURATION_RE = re.compile(r"(?:(-?\d+)\s*h)?\s*(?:(-?\d+)\s*m)?")
+
+
+def parse_duration_minutes(duration: Any) -> int:
+    """Minutes in a duration like '7h 30m' (or a plain number of minutes, as SerpApi returns)."""
+    if isinstance(duration, (int, float)):
+        return int(duration)
+    match = _DURATION_RE.fullmatch(str(duration).strip())
+    if not match:
+        return 0
+    hours, minutes = match.groups()
+    return int(hours or 0) * 60 + int(minutes or 0)
+
+
+def select_best(prices: np.ndarray, stops: np.ndarray, max_price: float, stop_penalty: float = 0.1) -> int:
+    """
+    Position of the best flight priced at or under `max_price`, scoring each
+    flight as price * (1 + stop_penalty * stops). Returns -1 if none fits.
+    Ties go to the earliest position, like min() over a list.
+    """
+    if len(prices) == 0:
+        return -1
+    scores = np.where(prices <= max_price, prices * (1 + stop_penalty * stops), np.inf)
+    best = int(np.argmin(scores))
+    return best if np.isfinite(scores[best]) else -1
+
+
+class FlightTable:
+    """
+    Columnar copy of the flight catalog.
+
+    Airline names and airport codes are dictionary-encoded to integer ids
+    (see `airlines` / `airports`), so filtering and scoring a route's
+    candidates is a single vectorized pass over plain NumPy arrays.
+    """
+
+    def __init__(
+        self,
+        price: np.ndarray,
+        stops: np.ndarray,
+        duration_minutes: np.ndarray,
+        distance_km: np.ndarray,
+        airline: np.ndarray,
+        departure: np.ndarray,
+        arrival: np.ndarray,
+        airlines: Sequence[str],
+        airports: Sequence[str]
+    ):
+        self.price = price
+        self.stops = stops
+        self.duration_minutes = duration_minutes
+        self.distance_km = distance_km
+        self.airline = airline
+        self.departure = departure
+        self.arrival = arrival
+        self.airlines: Tuple[str, ...] = tuple(airlines)
+        self.airports: Tuple[str, ...] = tuple(airports)
+        self._airport_ids = {code: idx for idx, code in enumerate(self.airports)}
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Sequence[Mapping[str, Any]],
+        airline_ids: Optional[Dict[str, int]] = None,
+        airport_ids: Optional[Dict[str, int]] = None
+    ) -> "FlightTable":
+        """
+        Build the table from flight dicts. Passing the same `airline_ids` / `airport_ids`
+        to several calls encodes every chunk of a larger catalog with shared ids.
+        """
+        airline_ids = {} if airline_ids is None else airline_ids
+        airport_ids = {} if airport_ids is None else airport_ids
+        n = len(records)
+        price = np.empty(n, dtype=np.float64)
+        stops = np.empty(n, dtype=np.int8)
+        duration_minutes = np.empty(n, dtype=np.int32)
+        distance_km = np.empty(n, dtype=np.float32)
+        airline = np.empty(n, dtype=np.int32)
+        departure = np.empty(n, dtype=np.int32)
+        arrival = np.empty(n, dtype=np.int32)
+        for row, flight in enumerate(records):
+            price[row] = flight['price']
+            stops[row] = flight['stops']
+            duration_minutes[row] = parse_duration_minutes(flight['duration'])
+            distance = flight.get('distance_km')
+            distance_km[row] = np.nan if distance is None else distance
+            airline[row] = airline_ids.setdefault(flight['airline'], len(airline_ids))
+            departure[row] = airport_ids.setdefault(flight['departure'].upper(), len(airport_ids))
+            arrival[row] = airport_ids.setdefault(flight['arrival'].upper(), len(airport_ids))
+        return cls(price, stops, duration_minutes, distance_km, airline, departure, arrival, airline_ids, airport_ids)
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def airport_id(self, code: str) -> int:
+        """Integer id of an airport code, or -1 if it never appears in the catalog."""
+        return self._airport_ids.get(code.upper(), -1)
+
+    def route_mask(self, departure: Optional[str] = None, arrival: Optional[str] = None) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        if departure:
+            mask &= self.departure == self.airport_id(departure)
+        if arrival:
+            mask &= self.arrival == self.airport_id(arrival)
+        return mask
+
+    def best_flight(self, rows: np.ndarray, max_price: float, stop_penalty: float = 0.1) -> int:
+        """Catalog row of the best-scoring flight among `rows`, or -1 if none is within `max_price`."""
+        rows = np.asarray(rows, dtype=np.int64)
+        best = select_best(self.price[rows], self.stops[rows], max_price, stop_penalty)
+        return int(rows[best]) if best >= 0 else -1
+
+
+def flight_columns(flights: Iterable[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Price and stops columns for a list of FlightOption objects."""
+    flights = list(flights)
+    prices = np.fromiter((f.price for f in flights), dtype=np.float64, count=len(flights))
+    stops = np.fromiter((f.stops for f in flights), dtype=np.int64, count=len(flights))
+    return prices, stops
@@ -0,0 +1,80 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great circle distance in kilometers between points given in degrees.
+    Works element-wise on NumPy arrays (with broadcasting) as well as on scalars.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=np.float64)) for v in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+_KM_PER_DEGREE = 2 * np.pi * EARTH_RADIUS_KM / 360
+
+
+def geohash_encode(lat: float, lon: float, precision: int) -> str:
+    """Standard base32 geohash of a point."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate between longitude and latitude, starting with longitude
+        value, interval = (lon, lon_range) if even else (lat, lat_range)
+        mid = (interval[0] + interval[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            interval[0] = mid
+        else:
+            bits <<= 1
+            interval[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def geohash_cell_degrees(precision: int):
+    """(height, width) of a geohash cell in degrees."""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = (5 * precision) // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def geohash_center(geohash: str):
+    """(lat, lon) of the center of a geohash cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = _GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            interval = lon_range if even else lat_range
+            mid = (interval[0] + interval[1]) / 2
+            if (bits >> shift) & 1:
+                interval[0] = mid
+            else:
+                interval[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def geohash_half_diagonal_km(precision: int) -> float:
+    """Upper bound on the distance from any point of a cell to its center (cells are widest at the equator)."""
+    height, width = geohash_cell_degrees(precision)
+    return float(np.hypot(height, width) / 2 * _KM_PER_DEGREE)
+
+
+def geohash_precision_for_radius(radius_km: float, max_precision: int = 9) -> int:
+    """Coarsest geohash precision whose cells are no wider (diagonally) than `radius_km`."""
+    for precision in range(1, max_precision + 1):
+        if 2 * geohash_half_diagonal_km(precision) <= radius_km:
+            return precision
+    return max_precision
@@ -0,0 +1,134 @@
+import heapq
+import re
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from utils.hotel_table import NO_CATEGORY, HotelTable
+
+_TOKEN_RE = re.compile(r"\w+")
+_MAX_CACHED_DESTINATIONS = 4096
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of a location string."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class HotelIndex:
+    """
+    Inverted index over the hotel catalog.
+
+    Hotels are grouped by distinct location string and by category; each
+    (location, category) posting list holds row ids sorted by price next to
+    the matching price column. A token index over the distinct locations
+    narrows destination matching to a handful of candidates, which are then
+    checked with the same case-insensitive substring test the loader has
+    always used, so results do not change.
+    """
+
+    def __init__(self, table: HotelTable):
+        n = len(table)
+        self._locations_lower: List[str] = [location.lower() for location in table.locations]
+        self._location_ids: Dict[str, int] = {location: loc_id for loc_id, location in enumerate(table.locations)}
+        self._postings: Dict[Tuple[int, Optional[str]], Tuple[np.ndarray, np.ndarray]] = {}
+        self._location_categories: Dict[int, List[Optional[str]]] = {}
+        # Catalog-wide postings per category, used when no destination is given
+        self._category_postings: Dict[Optional[str], Tuple[np.ndarray, np.ndarray]] = {}
+        if n:
+            # Rows ordered by price (then row id); each grouping below is a stable sort of this order
+            by_price = np.lexsort((np.arange(n), table.price))
+            category = table.category.astype(np.int64) - NO_CATEGORY
+            num_categories = len(table.categories) + 1
+            for (loc_id, category_id), posting in self._group(table, by_price, table.location.astype(np.int64) * num_categories + category, num_categories):
+                self._postings[(loc_id, table.category_name(category_id))] = posting
+                self._location_categories.setdefault(loc_id, []).append(table.category_name(category_id))
+            for (_, category_id), posting in self._group(table, by_price, category, num_categories):
+                self._category_postings[table.category_name(category_id)] = posting
+
+        self._token_locations: Dict[str, Set[int]] = {}
+        for loc_id, location in enumerate(self._locations_lower):
+            for token in tokenize(location):
+                self._token_locations.setdefault(token, set()).add(loc_id)
+        self._destination_cache: Dict[str, List[int]] = {}
+
+    @staticmethod
+    def _group(table: HotelTable, by_price: np.ndarray, keys: np.ndarray, num_categories: int) -> Iterator[Tuple[Tuple[int, int], Tuple[np.ndarray, np.ndarray]]]:
+        """Split price-ordered rows into runs of equal (location * num_categories + category) key."""
+        order = by_price[np.argsort(keys[by_price], kind='stable')]
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for start, end in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(order)]))):
+            key = int(sorted_keys[start])
+            rows = order[start:end]
+            yield (key // num_categories, key % num_categories + NO_CATEGORY), (table.price[rows], rows)
+
+    @property
+    def categories(self) -> List[Optional[str]]:
+        return list(self._category_postings)
+
+    def match_locations(self, destination: str) -> List[int]:
+        """Ids of the distinct locations that contain `destination` (case-insensitive substring)."""
+        needle = destination.lower()
+        cached = self._destination_cache.get(needle)
+        if cached is not None:
+            return cached
+
+        tokens = tokenize(needle)
+        if tokens:
+            # Every word of the needle sits inside some word of a matching location,
+            # so only locations owning a token that contains the longest needle word qualify.
+            longest = max(tokens, key=len)
+            candidates: Set[int] = set()
+            for token, loc_ids in self._token_locations.items():
+                if longest in token:
+                    candidates |= loc_ids
+        else:
+            candidates = set(range(len(self._locations_lower)))
+        matches = sorted(loc_id for loc_id in candidates if needle in self._locations_lower[loc_id])
+
+        if len(self._destination_cache) >= _MAX_CACHED_DESTINATIONS:
+            self._destination_cache.clear()
+        self._destination_cache[needle] = matches
+        return matches
+
+    def location_ids(self, locations: Sequence[str]) -> List[int]:
+        """Ids of the given exact location strings (unknown ones are skipped)."""
+        return sorted(self._location_ids[location] for location in set(locations) if location in self._location_ids)
+
+    def _posting_lists(self, categories: Sequence[Optional[str]], location_ids: Optional[Sequence[int]]) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        if location_ids is None:
+            for category in categories:
+                if category in self._category_postings:
+                    yield self._category_postings[category]
+            return
+        for loc_id in location_ids:
+            for category in self._location_categories.get(loc_id, ()):
+                if category in categories:
+                    yield self._postings[(loc_id, category)]
+
+    def count(self, categories: Sequence[Optional[str]], max_price: Optional[float] = None, location_ids: Optional[Sequence[int]] = None) -> int:
+        """Number of hotels in the given categories (and locations) at or under `max_price`."""
+        return sum(
+            len(prices) if max_price is None else int(np.searchsorted(prices, max_price, side='right'))
+            for prices, _ in self._posting_lists(categories, location_ids)
+        )
+
+    def rows(self, categories: Sequence[Optional[str]], max_price: Optional[float] = None, location_ids: Optional[Sequence[int]] = None) -> List[int]:
+        """Row ids of matching hotels in catalog order."""
+        result: List[int] = []
+        for prices, rows in self._posting_lists(categories, location_ids):
+            end = len(prices) if max_price is None else int(np.searchsorted(prices, max_price, side='right'))
+            result.extend(rows[:end].tolist())
+        result.sort()
+        return result
+
+    def iter_by_price(self, categories: Sequence[Optional[str]], max_price: Optional[float] = None, location_ids: Optional[Sequence[int]] = None) -> Iterator[Tuple[float, int]]:
+        """Lazily merge matching postings into one (price, row) stream in ascending price order."""
+        streams = []
+        for prices, rows in self._posting_lists(categories, location_ids):
+            end = len(prices) if max_price is None else int(np.searchsorted(prices, max_price, side='right'))
+            if end:
+                streams.append(islice(zip(prices, rows), end))
+        return heapq.merge(*streams)
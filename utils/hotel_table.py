@@ -0,0 +1,62 @@
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+NO_CATEGORY = -1
+
+
+class HotelTable:
+    """
+    Columnar copy of the hotel catalog.
+
+    Locations and categories are dictionary-encoded to integer ids (see
+    `locations` / `categories`); hotels without a category get NO_CATEGORY.
+    """
+
+    def __init__(
+        self,
+        price: np.ndarray,
+        rating: np.ndarray,
+        location: np.ndarray,
+        category: np.ndarray,
+        locations: Sequence[str],
+        categories: Sequence[str]
+    ):
+        self.price = price
+        self.rating = rating
+        self.location = location
+        self.category = category
+        self.locations: Tuple[str, ...] = tuple(locations)
+        self.categories: Tuple[str, ...] = tuple(categories)
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Sequence[Mapping[str, Any]],
+        location_ids: Optional[Dict[str, int]] = None,
+        category_ids: Optional[Dict[str, int]] = None
+    ) -> "HotelTable":
+        """
+        Build the table from hotel dicts. Passing the same `location_ids` / `category_ids`
+        to several calls encodes every chunk of a larger catalog with shared ids.
+        """
+        location_ids = {} if location_ids is None else location_ids
+        category_ids = {} if category_ids is None else category_ids
+        n = len(records)
+        price = np.empty(n, dtype=np.float64)
+        rating = np.empty(n, dtype=np.float64)
+        location = np.empty(n, dtype=np.int32)
+        category = np.empty(n, dtype=np.int32)
+        for row, hotel in enumerate(records):
+            price[row] = hotel['price_per_night']
+            rating[row] = hotel['rating']
+            location[row] = location_ids.setdefault(hotel['location'], len(location_ids))
+            name = hotel.get('category')
+            category[row] = NO_CATEGORY if name is None else category_ids.setdefault(name, len(category_ids))
+        return cls(price, rating, location, category, location_ids, category_ids)
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    def category_name(self, category_id: int) -> Optional[str]:
+        return None if category_id == NO_CATEGORY else self.categories[category_id]
@@ -0,0 +1,19 @@
+from typing import Any
+
+import pydantic_core
+from fastapi.responses import Response
+
+
+class ModelJSONResponse(Response):
+    """
+    JSON response for content built from already-validated models.
+
+    Models, and dicts and lists of them, are serialized straight to bytes by
+    pydantic's Rust serializer (with field aliases, like response_model), so
+    there is no second validation against response_model, no model_dump()
+    copies and no jsonable_encoder pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content, by_alias=True)
@@ -2,11 +2,11 @@ import json
 import os
 from typing import List, Dict, Any
 from models.schemas import FlightOption, HotelOption, Activity, DayPlan, ItineraryResponse
+from utils.catalog_store import get_catalog_store
+import heapq
 import random
 
 class MockDataLoader:
-    _airport_details_map: Dict[str, Dict[str, Any]] = {}
-    
     # List of major airlines for flight generation
     _airlines = [
         "Air France", "British Airways", "Lufthansa", "Delta Air Lines",
@@ -20,47 +20,30 @@ class MockDataLoader:
         with open(file_path, 'r') as f:
             return json.load(f)
 
-    @staticmethod
-    def _load_airport_details_map():
-        if not MockDataLoader._airport_details_map:
-            MockDataLoader._airport_details_map = MockDataLoader._load_json_file('airport_details_map.json')
-
     @staticmethod
     def get_country_from_airport_code(airport_code: str) -> str | None:
-        MockDataLoader._load_airport_details_map()
-        return MockDataLoader._airport_details_map.get(airport_code.upper(), {}).get('country')
+        return get_catalog_store().airport_country(airport_code)
 
     @staticmethod
     def get_airport_fullname(airport_code: str) -> str | None:
-        MockDataLoader._load_airport_details_map()
-        return MockDataLoader._airport_details_map.get(airport_code.upper(), {}).get('name')
+        return get_catalog_store().airport_fullname(airport_code)
 
     @staticmethod
-    def _get_airport_code_for_city(city: str) -> str:
-        """Convert city name to primary airport code."""
-        city_to_airport = {
-            "NEW YORK": "JFK",
-            "PARIS": "CDG",
-            "LONDON": "LHR",
-            "TOKYO": "NRT",
-            "DUBAI": "DXB",
-            "SINGAPORE": "SIN",
-            "HONG KONG": "HKG",
-            "SYDNEY": "SYD",
-            "LOS ANGELES": "LAX",
-            "CHICAGO": "ORD",
-            "MIAMI": "MIA",
-            "TORONTO": "YYZ",
-            "VANCOUVER": "YVR",
-            "AMSTERDAM": "AMS",
-            "FRANKFURT": "FRA",
-            "ROME": "FCO",
-            "MADRID": "MAD",
-            "BARCELONA": "BCN",
-            "BERLIN": "BER",
-            "MUNICH": "MUC"
-        }
-        return city_to_airport.get(city.upper())
+    def _get_airport_code_for_city(city: str) -> str | None:
+        """Convert city name (or a spelling of it, e.g. "NYC") to primary airport code."""
+        catalog = get_catalog_store()
+        code = catalog.airport_locator.code_for_city(city)
+        if code:
+            return code
+        destination = catalog.destinations.normalize(city)
+        return destination.airports[0] if destination and destination.airports else None
+
+    @staticmethod
+    def _resolve_airport_code(city: str) -> str | None:
+        """Airport code for a city name, falling back to the input itself (it may already be a code)."""
+        if not city:
+            return None
+        return MockDataLoader._get_airport_code_for_city(city) or city
 
     @staticmethod
     def get_mock_flights(origin: str = None, destination: str = None, budget: float = None, return_flight: bool = True) -> Dict[str, List[FlightOption]]:
@@ -68,9 +51,6 @@ class MockDataLoader:
         Get flights for both outbound and return journeys.
         Returns a dictionary with 'outbound' and 'return' flights.
         """
-        data = MockDataLoader._load_json_file('flights.json')
-        all_flights_raw = [FlightOption(**flight) for flight in data['flights']]
-        
         # Split budget between outbound and return if needed
         flight_budget = budget * 0.5 if budget and return_flight else budget
         
@@ -87,28 +67,25 @@ class MockDataLoader:
             else:
                 price = round(random.uniform(300, 1200), 2)
             
-            duration_hours = random.randint(6, 15)
-            duration_mins = random.choice([0, 15, 30, 45])
-            duration = f"{duration_hours}h {duration_mins}m"
-            
             # Convert city names to airport codes
-            departure_code = (
-                "JFK" if from_city.upper() == "NEW YORK" else
-                "CDG" if from_city.upper() == "PARIS" else
-                MockDataLoader._get_airport_code_for_city(from_city) or from_city
-            )
+            departure_code = MockDataLoader._resolve_airport_code(from_city)
+            arrival_code = MockDataLoader._resolve_airport_code(to_city)
+            stops = random.randint(0, 2)
             
-            arrival_code = (
-                "JFK" if to_city.upper() == "NEW YORK" else
-                "CDG" if to_city.upper() == "PARIS" else
-                MockDataLoader._get_airport_code_for_city(to_city) or to_city
-            )
+            # Estimate the duration from the airport matrix when both airports are known
+            estimate = get_catalog_store().airport_matrix.duration_minutes(departure_code, arrival_code, stops)
+            if estimate is not None:
+                duration = f"{estimate // 60}h {estimate % 60}m"
+            else:
+                duration_hours = random.randint(6, 15)
+                duration_mins = random.choice([0, 15, 30, 45])
+                duration = f"{duration_hours}h {duration_mins}m"
             
             return FlightOption(
                 airline=random.choice(MockDataLoader._airlines),
                 price=price,
                 duration=duration,
-                stops=random.randint(0, 2),
+                stops=stops,
                 departure=departure_code,
                 arrival=arrival_code,
                 departure_fullname=(
@@ -125,22 +102,28 @@ class MockDataLoader:
                 )
             )
         
-        # Generate outbound flights
-        outbound_flights = []
-        for _ in range(5):
-            flight = generate_flight(origin, destination, flight_budget)
-            outbound_flights.append(flight)
-        
-        # Sort outbound flights by price
-        outbound_flights.sort(key=lambda x: x.price)
-        # Generate return flights if requested
-        return_flights = []
-        if return_flight:
-            for _ in range(5):
-                flight = generate_flight(destination, origin, flight_budget)
-                return_flights.append(flight)
-            # Sort return flights by price
-            return_flights.sort(key=lambda x: x.price)
+        catalog = get_catalog_store()
+
+        def route_flights(from_city: str, to_city: str) -> List[FlightOption]:
+            """Cheapest catalog flights on the route within budget, topped up with generated ones"""
+            departure_code = MockDataLoader._resolve_airport_code(from_city)
+            arrival_code = MockDataLoader._resolve_airport_code(to_city)
+            flights = catalog.find_flights(departure_code, arrival_code, max_price=flight_budget, limit=10)
+            if len(flights) == 10:
+                # Make sure the best fewer-stops option survives the cut to the 10 cheapest
+                best = catalog.best_flight(departure_code, arrival_code, max_price=flight_budget)
+                if best is not None and best not in flights:
+                    flights[-1] = best
+            if from_city and to_city:
+                while len(flights) < 5:
+                    flights.append(generate_flight(from_city, to_city, flight_budget))
+            # Sort flights by price
+            flights.sort(key=lambda x: x.price)
+            return flights
+
+        outbound_flights = route_flights(origin, destination)
+        # Look up return flights if requested
+        return_flights = route_flights(destination, origin) if return_flight else []
         
         return {
             "outbound": outbound_flights[:10],
@@ -149,10 +132,7 @@ class MockDataLoader:
 
     @staticmethod
     def get_mock_hotels(destination: str = None, budget: float = None, mood: str = "cultural") -> List[HotelOption]:
-        data = MockDataLoader._load_json_file('hotels.json')
-        all_hotels = [HotelOption(**hotel) for hotel in data['hotels']]
-
-        matching_hotels = []
+        catalog = get_catalog_store()
 
         # Define hotel categories based on mood
         mood_categories = {
@@ -167,35 +147,76 @@ class MockDataLoader:
         # Get appropriate categories for the mood
         target_categories = mood_categories.get(mood.lower(), ["midscale"])
 
-        # 1. First filter by category and budget
-        budget_filtered = []
-        for hotel in all_hotels:
-            if hasattr(hotel, 'category') and hotel.category in target_categories:
-                if budget is None or hotel.price_per_night <= budget:
-                    budget_filtered.append(hotel)
+        index = catalog.hotel_index
+        mood_key = mood.lower()
+
+        # Minimum rating for hotels outside the preferred categories, and for the final list
+        if mood_key == "luxury":
+            min_rating = 4.5
+        elif mood_key in ["romantic", "relaxation"]:
+            min_rating = 4.0
+        else:
+            min_rating = None
+
+        def sort_key(price: float, rating: float) -> float:
+            if mood_key == "luxury":
+                # For luxury, prioritize higher-rated hotels when prices are similar
+                return -(rating / 5.0) * 0.7 + (price / budget if budget else 0) * 0.3
+            # For other moods, sort primarily by price
+            return price
 
-        # If we don't have enough hotels in the preferred categories, include hotels from adjacent categories
-        if len(budget_filtered) < 5:
-            # Add hotels from other categories based on rating and price
-            for hotel in all_hotels:
-                if hotel not in budget_filtered:
-                    if budget is None or hotel.price_per_night <= budget:
-                        if mood.lower() == "luxury" and hotel.rating >= 4.5:
-                            budget_filtered.append(hotel)
-                        elif mood.lower() in ["romantic", "relaxation"] and hotel.rating >= 4.0:
-                            budget_filtered.append(hotel)
+        def lowest_possible_key(price: float) -> float:
+            """Lower bound of sort_key for any hotel at this price (ratings never exceed 5)."""
+            if mood_key == "luxury":
+                return -0.7 + (price / budget if budget else 0) * 0.3
+            return price
 
-        # 2. Then filter by destination
-        if destination:
-            for hotel in budget_filtered:
-                if destination.lower() in hotel.location.lower():
-                    matching_hotels.append(hotel)
+        # 1. Category and budget filter. If we don't have enough hotels in the preferred categories,
+        # include well-rated hotels from adjacent categories
+        include_other_categories = min_rating is not None and index.count(target_categories, budget) < 5
+        other_categories = [c for c in index.categories if c not in target_categories]
+
+        # 2. Destination filter: the hotel locations of the canonical destination, or a
+        # substring match over the distinct catalog locations for unrecognized text
+        canonical = catalog.destinations.normalize(destination) if destination else None
+        if canonical and canonical.hotel_locations:
+            location_ids = index.location_ids(canonical.hotel_locations)
         else:
-            matching_hotels = budget_filtered
+            location_ids = index.match_locations(destination) if destination else None
+
+        if not destination or index.count(target_categories, budget, location_ids) >= 5:
+            # Enough catalog matches, nothing to generate: walk the matches cheapest first and keep
+            # the 10 best by sort key, stopping once no cheaper-keyed hotel can follow.
+            # Ties keep catalog order, preferred categories first.
+            streams = [((price, 0, row) for price, row in index.iter_by_price(target_categories, budget, location_ids))]
+            if include_other_categories:
+                streams.append(((price, 1, row) for price, row in index.iter_by_price(other_categories, budget, location_ids)))
+            best = []  # max-heap of the 10 best (key, group, row), stored negated
+            for price, group, row in heapq.merge(*streams):
+                if len(best) == 10 and lowest_possible_key(price) > -best[0][0]:
+                    break
+                rating = catalog.hotel_table.rating[row]
+                if min_rating is not None and rating < min_rating:
+                    continue
+                entry = (-sort_key(price, rating), -group, -row)
+                if len(best) < 10:
+                    heapq.heappush(best, entry)
+                elif entry > best[0]:
+                    heapq.heapreplace(best, entry)
+            return [catalog.hotel(-row) for _, _, row in sorted(best, reverse=True)]
+
+        matching_rows = index.rows(target_categories, budget, location_ids)
+        if include_other_categories:
+            matching_rows += [
+                row for row in index.rows(other_categories, budget, location_ids)
+                if catalog.hotel_table.rating[row] >= min_rating
+            ]
+        matching_hotels = [catalog.hotel(row) for row in matching_rows]
 
         # 3. If we have fewer than 5 matches and have a destination, generate additional hotels
         if len(matching_hotels) < 5 and destination:
             num_to_generate = 5 - len(matching_hotels)
+            destination_name = canonical.name if canonical else destination
             for _ in range(num_to_generate):
                 if budget:
                     # Simple range from 40% to 95% of budget
@@ -212,27 +233,20 @@ class MockDataLoader:
                            "Parking", "Airport Shuttle", "Concierge", "24/7 Front Desk"]
 
                 new_hotel = HotelOption(
-                    name=f"{random.choice(hotel_names)} {destination}",
+                    name=f"{random.choice(hotel_names)} {destination_name}",
                     price_per_night=price,
                     rating=round(random.uniform(3.5, 5.0), 1),
-                    location=f"{destination} City Center",
+                    location=f"{destination_name} City Center",
                     amenities=random.sample(amenities, random.randint(3, 6))
                 )
                 matching_hotels.append(new_hotel)
 
         # 4. Apply final quality filters based on mood
-        if mood.lower() == "luxury":
-            matching_hotels = [h for h in matching_hotels if h.rating >= 4.5]
-        elif mood.lower() in ["romantic", "relaxation"]:
-            matching_hotels = [h for h in matching_hotels if h.rating >= 4.0]
+        if min_rating is not None:
+            matching_hotels = [h for h in matching_hotels if h.rating >= min_rating]
 
         # 5. Sort hotels optimally based on mood
-        if mood.lower() == "luxury":
-            # For luxury, prioritize higher-rated hotels when prices are similar
-            matching_hotels.sort(key=lambda x: (-(x.rating / 5.0) * 0.7 + (x.price_per_night / budget if budget else 0) * 0.3))
-        else:
-            # For other moods, sort primarily by price
-            matching_hotels.sort(key=lambda x: x.price_per_night)
+        matching_hotels.sort(key=lambda x: sort_key(x.price_per_night, x.rating))
 
         result = matching_hotels[:10]
         return result
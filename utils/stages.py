@@ -0,0 +1,57 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, NamedTuple, Optional
+
+from config.settings import get_settings
+
+
+class StageError(Exception):
+    """A pipeline stage failed or timed out and had no fallback."""
+
+    def __init__(self, stage: str, error: BaseException):
+        self.stage = stage
+        self.error = error
+        reason = "timed out" if isinstance(error, TimeoutError) else f"failed: {error}"
+        super().__init__(f"{stage} stage {reason}")
+
+
+class Stage(NamedTuple):
+    run: Callable[[], Awaitable[Any]]
+    timeout: Optional[float] = None  # Seconds; None waits indefinitely
+    # Result to use if the stage fails or times out; stages without one are fatal
+    fallback: Optional[Callable[[], Any]] = None
+
+
+async def run_stages(stages: Dict[str, Stage]) -> Dict[str, Any]:
+    """
+    Run independent stages concurrently and return their results by name.
+
+    Total latency is that of the slowest stage. A stage that fails or times out
+    uses its fallback if it has one; otherwise, or if the fallback fails too, the
+    remaining stages are cancelled and a StageError is raised.
+    """
+    async def run_stage(name: str, stage: Stage):
+        try:
+            async with asyncio.timeout(stage.timeout):
+                return await stage.run()
+        except Exception as e:
+            if stage.fallback is None:
+                raise StageError(name, e) from e
+            print(f"Stage '{name}' failed ({e!r}), using fallback")
+            try:
+                return stage.fallback()
+            except Exception as fallback_error:
+                raise StageError(name, fallback_error) from fallback_error
+
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = {name: group.create_task(run_stage(name, stage)) for name, stage in stages.items()}
+    except* StageError as errors:
+        # The task group has already cancelled the other stages; report the first failure
+        raise errors.exceptions[0] from None
+    return {name: task.result() for name, task in tasks.items()}
+
+
+def stage_timeout(stage: str) -> float:
+    """Timeout for a named stage, from Settings."""
+    settings = get_settings()
+    return settings.STAGE_TIMEOUTS.get(stage, settings.STAGE_TIMEOUT)